@@ -2,18 +2,22 @@
 Main Flask Application Entry Point
 Coordinates all API blueprints and database initialization
 """
+import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from src.api_server_v2.init_db import init_all_tables
 from src.api_server_v2.sequence.sequence import sequence_api_blueprint
 from src.api_server_v2.groups_items.groups_items import groups_items_api_blueprint
 from src.api_server_v2.containers_zones.containers_zones import containers_zones_api_blueprint
+from src.api_server_v2.metrics.metrics import metrics_api_blueprint, install_request_metrics
+from src.api_server_v2.revisions.revisions import revisions_api_blueprint
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+install_request_metrics(app)  # Per-route latency / in-flight tracking
 
 # ========== DATABASE INITIALIZATION ==========
-# Initialize all database tables on startup (reset data)
+# Apply pending schema migrations on startup (no-op when the schema is current)
 print("\n" + "=" * 60)
 print("  STARTING 3D PACKING API SERVER")
 print("=" * 60)
@@ -29,6 +33,8 @@ except Exception as e:
 app.register_blueprint(sequence_api_blueprint, url_prefix='/api/sequence')
 app.register_blueprint(groups_items_api_blueprint, url_prefix='/api')
 app.register_blueprint(containers_zones_api_blueprint, url_prefix='/api')
+app.register_blueprint(revisions_api_blueprint, url_prefix='/api')
+app.register_blueprint(metrics_api_blueprint)
 
 print("\n📋 Registered API Blueprints:")
 print("   - /api/sequence/*        (Packing sequence operations)")
@@ -37,6 +43,8 @@ print("   - /api/items/*           (Item management)")
 print("   - /api/containers/*      (Container configuration)")
 print("   - /api/zones/*           (Zone management)")
 print("   - /api/zone-assignments/* (Zone-Group assignments)")
+print("   - /api/changes           (Change feed / revisions)")
+print("   - /metrics               (Prometheus metrics)")
 print("=" * 60 + "\n")
 
 # ========== STATUS ENDPOINT ==========
@@ -51,8 +59,12 @@ def health():
     })
 
 # ========== SERVER EXECUTION ==========
+# Development server. For multi-worker serving use: python -m src.api_server_v2.serve
+# BACKEND_PORT picks the port (start_servers.py runs extra workers on 8889, ...);
+# BACKEND_RELOADER=0 turns the debug reloader off when a supervisor restarts us instead
 if __name__ == '__main__':
-    print("🚀 Server starting on http://0.0.0.0:8888")
+    port = int(os.getenv('BACKEND_PORT') or 8888)
+    print(f"🚀 Server starting on http://0.0.0.0:{port}")
     print("   Press CTRL+C to stop")
     print("=" * 60 + "\n")
-    app.run(host='0.0.0.0', port=8888, debug=True)
+    app.run(host='0.0.0.0', port=port, debug=True, use_reloader=os.getenv('BACKEND_RELOADER', '1') == '1')
@@ -3,7 +3,8 @@ Containers and Zones API Blueprint
 Handles container configuration and zone management
 """
 from flask import Blueprint, jsonify, request
-from src.api_server_v2.db_config import get_db_connection
+from src.api_server_v2.db_config import get_db_connection, apply_item_order, sync_zones, sync_zone_assignments
+from src.api_server_v2.revisions.revisions import conditional_get, with_etag
 import json
 
 # Create Blueprint
@@ -38,9 +39,12 @@ def save_container():
 
 @containers_zones_api_blueprint.route('/containers/latest', methods=['GET'])
 def get_latest_container():
-    """Get latest container configuration"""
+    """Get latest container configuration (ETag / If-None-Match aware)"""
     conn = get_db_connection()
     try:
+        etag, not_modified = conditional_get(conn, ('containers',))
+        if not_modified:
+            return not_modified
         container = conn.execute(
             'SELECT * FROM containers ORDER BY created_at DESC LIMIT 1'
         ).fetchone()
@@ -53,7 +57,7 @@ def get_latest_container():
         if result.get('parameters'):
             result['parameters'] = json.loads(result['parameters'])
         
-        return jsonify(result), 200
+        return with_etag(jsonify(result), etag), 200
     finally:
         conn.close()
 
@@ -61,7 +65,11 @@ def get_latest_container():
 
 @containers_zones_api_blueprint.route('/zones', methods=['POST'])
 def save_zones():
-    """Batch save/update zones"""
+    """
+    Batch save/update zones.
+    The posted list is the full set of zones; only the differences are written and
+    existing zones (matched by id, else label) keep their ids. Returns the changes.
+    """
     data = request.get_json()
     
     if not data or 'zones' not in data:
@@ -71,28 +79,9 @@ def save_zones():
     
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        # Clear existing zones
-        cursor.execute('DELETE FROM zones')
-        
-        # Insert new zones
-        for zone in zones_data:
-            cursor.execute('''
-                INSERT INTO zones (label, length, width, height, x, y, rotation)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                zone.get('label', ''),
-                zone.get('length', 0),
-                zone.get('width', 0),
-                zone.get('height', 0),
-                zone.get('x', 0),
-                zone.get('y', 0),
-                zone.get('rotation', 0)
-            ))
-        
+        changes = sync_zones(conn, zones_data)
         conn.commit()
-        return jsonify({'message': f'Saved {len(zones_data)} zones successfully'}), 201
+        return jsonify({'message': f'Saved {len(zones_data)} zones successfully', 'changes': changes}), 201
     except Exception as e:
         conn.rollback()
         return jsonify({'error': str(e)}), 500
@@ -101,11 +90,14 @@ def save_zones():
 
 @containers_zones_api_blueprint.route('/zones', methods=['GET'])
 def get_zones():
-    """Get all zones"""
+    """Get all zones (ETag / If-None-Match aware)"""
     conn = get_db_connection()
     try:
+        etag, not_modified = conditional_get(conn, ('zones',))
+        if not_modified:
+            return not_modified
         zones = conn.execute('SELECT * FROM zones ORDER BY label').fetchall()
-        return jsonify([dict(row) for row in zones])
+        return with_etag(jsonify([dict(row) for row in zones]), etag)
     finally:
         conn.close()
 
@@ -132,7 +124,7 @@ def delete_zone(zone_id):
 
 @containers_zones_api_blueprint.route('/zone-assignments', methods=['POST'])
 def save_zone_assignments():
-    """Save zone-group assignments"""
+    """Save zone-group assignments (full set; only added/removed pairs are written). Returns the changes."""
     data = request.get_json()
     
     if not data or 'assignments' not in data:
@@ -142,21 +134,13 @@ def save_zone_assignments():
     
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        # Clear existing assignments
-        cursor.execute('DELETE FROM zone_assignments')
-        
-        # Insert new assignments
-        for zone_id, group_ids in assignments.items():
-            for group_id in group_ids:
-                cursor.execute('''
-                    INSERT INTO zone_assignments (zone_id, group_id)
-                    VALUES (?, ?)
-                ''', (int(zone_id), int(group_id)))
-        
+        changes = sync_zone_assignments(conn, [
+            (zone_id, group_id)
+            for zone_id, group_ids in assignments.items()
+            for group_id in group_ids
+        ])
         conn.commit()
-        return jsonify({'message': 'Assignments saved successfully'}), 201
+        return jsonify({'message': 'Assignments saved successfully', 'changes': changes}), 201
     except Exception as e:
         conn.rollback()
         return jsonify({'error': str(e)}), 500
@@ -165,13 +149,57 @@ def save_zone_assignments():
 
 @containers_zones_api_blueprint.route('/zone-assignments', methods=['GET'])
 def get_zone_assignments():
-    """Get all zone assignments"""
+    """Get all zone assignments (ETag / If-None-Match aware)"""
     conn = get_db_connection()
     try:
+        etag, not_modified = conditional_get(conn, ('zone_assignments',))
+        if not_modified:
+            return not_modified
         assignments = conn.execute(
             'SELECT * FROM zone_assignments'
         ).fetchall()
-        return jsonify([dict(row) for row in assignments])
+        return with_etag(jsonify([dict(row) for row in assignments]), etag)
+    finally:
+        conn.close()
+
+# ========== ASSIGNMENT PAGE ENDPOINT ==========
+
+@containers_zones_api_blueprint.route('/assignment-data', methods=['GET'])
+def get_assignment_data():
+    """
+    Everything the space-cutting / assignment page loads at once (ETag / If-None-Match aware):
+    latest container, zones with their assigned group ids (comma-separated), items and groups
+    """
+    conn = get_db_connection()
+    try:
+        etag, not_modified = conditional_get(conn, ('containers', 'zones', 'zone_assignments', 'items', 'groups'))
+        if not_modified:
+            return not_modified
+        
+        container = conn.execute('SELECT * FROM containers ORDER BY id DESC LIMIT 1').fetchone()
+        container_data = dict(container) if container else None
+        if container_data and container_data.get('parameters'):
+            container_data['parameters'] = json.loads(container_data['parameters'])
+        
+        zones = conn.execute("""
+            SELECT z.*, GROUP_CONCAT(za.group_id) AS assigned_group_ids
+            FROM zones z
+            LEFT JOIN (SELECT DISTINCT zone_id, group_id FROM zone_assignments) za ON z.id = za.zone_id
+            GROUP BY z.id
+            ORDER BY CAST(z.label AS INTEGER), z.id
+        """).fetchall()
+        items = conn.execute('SELECT * FROM items ORDER BY group_id, id').fetchall()
+        groups = conn.execute('SELECT * FROM groups ORDER BY id').fetchall()
+        
+        return with_etag(jsonify({
+            'container': container_data,
+            'zones': [dict(row) for row in zones],
+            'items': [dict(row) for row in items],
+            'groups': [dict(row) for row in groups]
+        }), etag), 200
+    except Exception as e:
+        print(f"Error fetching assignment data: {e}")
+        return jsonify({'error': 'Failed to fetch assignment data', 'details': str(e)}), 500
     finally:
         conn.close()
 
@@ -179,26 +207,33 @@ def get_zone_assignments():
 
 @containers_zones_api_blueprint.route('/items/reorder', methods=['POST'])
 def reorder_items():
-    """Update item_order for multiple items"""
+    """
+    Update item_order for multiple items in one set-based statement.
+    Body: { items: [{ id: 1, item_order: 0 }, ...] } (full list or only moved items)
+       or { order: [id1, id2, ...] } (complete sequence, order = list index)
+    """
     data = request.get_json()
     
-    if not data or 'items' not in data:
+    if not data or ('items' not in data and 'order' not in data):
         return jsonify({'error': 'Missing items array'}), 400
     
-    items = data['items']  # Format: [{ id: 1, item_order: 0 }, ...]
+    try:
+        if 'order' in data:
+            order_pairs = [(int(item_pk), index) for index, item_pk in enumerate(data['order'])]
+        else:
+            # Format: [{ id: 1, item_order: 0 }, ...]
+            order_pairs = [(int(item['id']), int(item['item_order'])) for item in data['items']]
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid items format: {e}'}), 400
     
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        for item in items:
-            cursor.execute(
-                'UPDATE items SET item_order = ? WHERE id = ?',
-                (item['item_order'], item['id'])
-            )
-        
+        changed = apply_item_order(conn, order_pairs)
         conn.commit()
-        return jsonify({'message': f'Reordered {len(items)} items successfully'}), 200
+        return jsonify({
+            'message': f'Reordered {len(order_pairs)} items successfully',
+            'changed': changed
+        }), 200
     except Exception as e:
         conn.rollback()
         return jsonify({'error': str(e)}), 500
@@ -209,7 +244,7 @@ def reorder_items():
 
 @containers_zones_api_blueprint.route('/v2/cutting/jobs', methods=['POST'])
 def save_cutting_job():
-    """Save cutting job with zones"""
+    """Save cutting job with zones (delta update like POST /zones; zone ids are preserved)"""
     data = request.get_json()
     
     if not data or 'zones' not in data:
@@ -219,31 +254,13 @@ def save_cutting_job():
     
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        # Clear existing zones
-        cursor.execute('DELETE FROM zones')
-        
-        # Insert new zones from cutting job
-        for zone in zones_data:
-            cursor.execute('''
-                INSERT INTO zones (label, length, width, height, x, y, rotation)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                zone.get('label', ''),
-                zone.get('length', 0),
-                zone.get('width', 0),
-                zone.get('height', 0),
-                zone.get('x', 0),
-                zone.get('y', 0),
-                zone.get('rotation', 0)
-            ))
-        
+        changes = sync_zones(conn, zones_data)
         conn.commit()
         return jsonify({
             'success': True,
             'message': f'Saved cutting job with {len(zones_data)} zones successfully',
-            'zones_count': len(zones_data)
+            'zones_count': len(zones_data),
+            'changes': changes
         }), 201
     except Exception as e:
         conn.rollback()
@@ -1,15 +1,239 @@
 import sqlite3
 import os
+import time
 
 # Path relative to the project root (where start_servers.py is run)
 DB_PATH = 'src/db_v2/session_data.db'
 
+# Seconds a connection waits for another process's write lock before failing
+DB_BUSY_TIMEOUT_S = float(os.getenv('DB_BUSY_TIMEOUT_S') or 10)
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports every statement's duration to the metrics registry"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_query(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_query(time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are timed"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _record_query(duration_s):
+    # Imported lazily so db_config stays importable without Flask
+    from src.api_server_v2.metrics.metrics import record_db_query
+    record_db_query(duration_s)
+
+
 def get_db_connection():
     # Helper to ensure DB directory exists
     db_dir = os.path.dirname(DB_PATH)
     if db_dir and not os.path.exists(db_dir):
         os.makedirs(db_dir)
-        
-    conn = sqlite3.connect(DB_PATH)
+
+    # Several server processes share this file (see serve.py): implicit transactions
+    # start with BEGIN IMMEDIATE, so writers queue on the write lock (up to
+    # DB_BUSY_TIMEOUT_S) instead of failing mid-transaction; WAL (set by init_db)
+    # keeps readers from blocking on them.
+    conn = sqlite3.connect(DB_PATH, factory=TimedConnection, timeout=DB_BUSY_TIMEOUT_S, isolation_level='IMMEDIATE')
     conn.row_factory = sqlite3.Row
-    return conn
\ No newline at end of file
+    conn.execute("PRAGMA synchronous = NORMAL")  # durable enough under WAL, far fewer fsyncs
+    return conn
+
+
+def begin_write(conn):
+    """
+    Take the write lock now (BEGIN IMMEDIATE) so a read-modify-write cannot interleave
+    with another process's writes. No-op if a transaction is already open.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+# Tables whose changes are counted in the revisions table (see init_db.ensure_revision_tracking)
+REVISIONED_TABLES = ('groups', 'items', 'containers', 'zones', 'zone_assignments', 'packing_results')
+
+
+def get_revisions(conn, entities=REVISIONED_TABLES):
+    """
+    Revision of each entity: the session-wide change sequence number of its last change.
+    Numbers only grow, so max() over several entities is a valid cache validator.
+    Returns {} on databases created before revision tracking existed.
+    """
+    placeholders = ','.join('?' * len(entities))
+    try:
+        rows = conn.execute(
+            f'SELECT entity, revision FROM revisions WHERE entity IN ({placeholders})', tuple(entities)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {row[0]: row[1] for row in rows}
+
+
+def revision_etag(conn, entities):
+    """ETag value (unquoted) for a response built from `entities`, or None without revision tracking"""
+    revisions = get_revisions(conn, entities)
+    if not revisions:
+        return None
+    return f"rev-{max(revisions.values())}"
+
+
+def apply_item_order(conn, order_pairs):
+    """
+    Set item_order for many items with a single set-based UPDATE.
+    order_pairs: iterable of (items.id, item_order); items not listed keep their order,
+    so callers may send either the full sequence or only the moved items (delta).
+    Returns the number of rows whose order actually changed.
+    """
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS item_order_updates (
+            id INTEGER PRIMARY KEY,
+            item_order INTEGER NOT NULL
+        )
+    """)
+    conn.execute("DELETE FROM item_order_updates")
+    conn.executemany(
+        "INSERT OR REPLACE INTO item_order_updates (id, item_order) VALUES (?, ?)",
+        order_pairs
+    )
+    cursor = conn.execute("""
+        UPDATE items
+        SET item_order = (SELECT u.item_order FROM item_order_updates u WHERE u.id = items.id)
+        WHERE id IN (
+            SELECT u.id FROM item_order_updates u
+            JOIN items i ON i.id = u.id
+            WHERE i.item_order IS NOT u.item_order
+        )
+    """)
+    changed = cursor.rowcount
+    conn.execute("DELETE FROM item_order_updates")
+    return changed
+
+
+# Zone columns written by the zone editors, with their defaults
+ZONE_FIELDS = (
+    ('label', ''),
+    ('length', 0),
+    ('width', 0),
+    ('height', 0),
+    ('x', 0),
+    ('y', 0),
+    ('rotation', 0),
+    ('max_payload', None),
+)
+
+
+def sync_zones(conn, zones_data):
+    """
+    Make the zones table match zones_data while keeping the ids of zones that still exist.
+    A zone is matched by its 'id' when given, else by label; matched zones are updated only
+    if one of the fields it carries changed (absent fields are left as stored), unmatched
+    ones inserted with ZONE_FIELDS defaults for absent fields, and zones missing from
+    zones_data deleted together with their assignments. Does not commit.
+    Returns {'inserted': [ids], 'updated': [ids], 'deleted': [ids], 'unchanged': count}.
+    """
+    begin_write(conn)
+    names = [name for name, _ in ZONE_FIELDS]
+    existing = {
+        row['id']: row for row in conn.execute(f"SELECT id, {', '.join(names)} FROM zones ORDER BY id").fetchall()
+    }
+    by_label = {}
+    for zone_id, row in existing.items():
+        by_label.setdefault(row['label'], []).append(zone_id)
+    
+    matched = set()
+    inserts = []
+    updates = {}  # posted field names -> [(values..., zone_id)], one UPDATE statement per shape
+    for zone in zones_data:
+        zone_id = zone.get('id')
+        zone_id = int(zone_id) if zone_id is not None and int(zone_id) in existing else None
+        if zone_id is None or zone_id in matched:
+            candidates = [i for i in by_label.get(zone.get('label', ''), []) if i not in matched]
+            zone_id = candidates[0] if candidates else None
+        if zone_id is None:
+            # Defaults only fill in new rows
+            inserts.append(tuple(zone.get(name, default) for name, default in ZONE_FIELDS))
+            continue
+        matched.add(zone_id)
+        # Fields left out of the posted zone keep their stored value (e.g. max_payload set via the API)
+        fields = tuple(name for name in names if name in zone)
+        if any(existing[zone_id][name] != zone[name] for name in fields):
+            updates.setdefault(fields, []).append(tuple(zone[name] for name in fields) + (zone_id,))
+    deleted = [zone_id for zone_id in existing if zone_id not in matched]
+    
+    if deleted:
+        conn.executemany('DELETE FROM zone_assignments WHERE zone_id = ?', [(i,) for i in deleted])
+        conn.executemany('DELETE FROM zones WHERE id = ?', [(i,) for i in deleted])
+    for fields, rows in updates.items():
+        conn.executemany(
+            f"UPDATE zones SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+            rows
+        )
+    updated = sorted(row[-1] for rows in updates.values() for row in rows)
+    inserted = []
+    if inserts:
+        # AUTOINCREMENT ids only grow, so the new rows are exactly those above the previous maximum
+        previous_max = conn.execute('SELECT COALESCE(MAX(id), 0) FROM zones').fetchone()[0]
+        conn.executemany(
+            f"INSERT INTO zones ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            inserts
+        )
+        inserted = [row[0] for row in conn.execute('SELECT id FROM zones WHERE id > ? ORDER BY id', (previous_max,))]
+    
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'deleted': deleted,
+        'unchanged': len(matched) - len(updated)
+    }
+
+
+def sync_zone_assignments(conn, pairs):
+    """
+    Make zone_assignments hold exactly the given (zone_id, group_id) pairs, touching only
+    rows that differ; surviving assignments keep their ids. Duplicate rows are removed.
+    Does not commit. Returns {'added': [[zone_id, group_id], ...], 'removed': [...], 'unchanged': count}.
+    """
+    wanted = {(int(zone_id), int(group_id)) for zone_id, group_id in pairs}
+    begin_write(conn)
+    kept = {}
+    extra_ids = []
+    for row in conn.execute('SELECT id, zone_id, group_id FROM zone_assignments ORDER BY id').fetchall():
+        pair = (row['zone_id'], row['group_id'])
+        if pair in wanted and pair not in kept:
+            kept[pair] = row['id']
+        else:
+            extra_ids.append((row['id'], pair))
+    added = sorted(wanted - set(kept))
+    
+    if extra_ids:
+        conn.executemany('DELETE FROM zone_assignments WHERE id = ?', [(i,) for i, _ in extra_ids])
+    if added:
+        conn.executemany('INSERT INTO zone_assignments (zone_id, group_id) VALUES (?, ?)', added)
+    
+    return {
+        'added': [list(pair) for pair in added],
+        'removed': [list(pair) for pair in sorted({pair for _, pair in extra_ids} - set(kept))],
+        'unchanged': len(kept)
+    }
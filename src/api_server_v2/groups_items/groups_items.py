@@ -4,6 +4,7 @@ Handles CRUD operations for groups and items
 """
 from flask import Blueprint, jsonify, request
 from src.api_server_v2.db_config import get_db_connection
+from src.api_server_v2.revisions.revisions import conditional_get, with_etag
 
 # Create Blueprint
 groups_items_api_blueprint = Blueprint('groups_items_api', __name__)
@@ -12,11 +13,38 @@ groups_items_api_blueprint = Blueprint('groups_items_api', __name__)
 
 @groups_items_api_blueprint.route('/groups', methods=['GET'])
 def get_groups():
-    """Get all groups"""
+    """Get all groups (ETag / If-None-Match aware)"""
     conn = get_db_connection()
     try:
+        etag, not_modified = conditional_get(conn, ('groups',))
+        if not_modified:
+            return not_modified
         groups = conn.execute('SELECT * FROM groups ORDER BY created_at DESC').fetchall()
-        return jsonify([dict(row) for row in groups])
+        return with_etag(jsonify([dict(row) for row in groups]), etag)
+    finally:
+        conn.close()
+
+@groups_items_api_blueprint.route('/groups/aggregates', methods=['GET'])
+def get_group_aggregates():
+    """
+    Get item count, total volume and total weight of every group (ETag / If-None-Match aware).
+    Read from group_aggregates, which triggers keep current, so the cost does not grow with items.
+    """
+    conn = get_db_connection()
+    try:
+        etag, not_modified = conditional_get(conn, ('groups', 'items'))
+        if not_modified:
+            return not_modified
+        rows = conn.execute('''
+            SELECT g.id AS group_id, g.name,
+                   COALESCE(a.item_count, 0) AS item_count,
+                   COALESCE(a.total_volume, 0) AS total_volume,
+                   COALESCE(a.total_weight, 0) AS total_weight
+            FROM groups g
+            LEFT JOIN group_aggregates a ON a.group_id = g.id
+            ORDER BY g.id
+        ''').fetchall()
+        return with_etag(jsonify([dict(row) for row in rows]), etag)
     finally:
         conn.close()
 
@@ -107,11 +135,14 @@ def update_group(group_id):
 
 @groups_items_api_blueprint.route('/items', methods=['GET'])
 def get_items():
-    """Get all items"""
+    """Get all items (ETag / If-None-Match aware)"""
     conn = get_db_connection()
     try:
+        etag, not_modified = conditional_get(conn, ('items',))
+        if not_modified:
+            return not_modified
         items = conn.execute('SELECT * FROM items ORDER BY created_at DESC').fetchall()
-        return jsonify([dict(row) for row in items])
+        return with_etag(jsonify([dict(row) for row in items]), etag)
     finally:
         conn.close()
 
@@ -139,15 +170,16 @@ def create_item():
             return jsonify({'error': 'Item ID already exists'}), 409
         
         cursor.execute('''
-            INSERT INTO items (item_id, group_id, length, width, height, weight)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO items (item_id, group_id, length, width, height, weight, max_load)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
             data['item_id'],
             data['group_id'],
             data['length'],
             data['width'],
             data['height'],
-            data.get('weight', 0)
+            data.get('weight', 0),
+            data.get('max_load')
         ))
         conn.commit()
         
@@ -180,7 +212,7 @@ def delete_item(item_id):
 
 @groups_items_api_blueprint.route('/items/<int:item_id>', methods=['PUT'])
 def update_item(item_id):
-    """Update item dimensions"""
+    """Update item dimensions and weight limits"""
     data = request.get_json()
     
     if not data:
@@ -199,10 +231,12 @@ def update_item(item_id):
         length = data.get('length', item['length'])
         width = data.get('width', item['width'])
         height = data.get('height', item['height'])
+        weight = data.get('weight', item['weight'])
+        max_load = data.get('max_load', item['max_load'])
         
         cursor.execute(
-            'UPDATE items SET length = ?, width = ?, height = ? WHERE id = ?',
-            (length, width, height, item_id)
+            'UPDATE items SET length = ?, width = ?, height = ?, weight = ?, max_load = ? WHERE id = ?',
+            (length, width, height, weight, max_load, item_id)
         )
         conn.commit()
         
@@ -211,6 +245,8 @@ def update_item(item_id):
             'length': length,
             'width': width,
             'height': height,
+            'weight': weight,
+            'max_load': max_load,
             'message': 'Item updated successfully'
         }), 200
     except Exception as e:
@@ -269,6 +305,7 @@ def create_items_bulk():
                 item.get('width', 0),
                 item.get('height', 0),
                 item.get('weight', 0),
+                item.get('max_load'),
                 item.get('item_order', 0)
             ))
         
@@ -277,8 +314,8 @@ def create_items_bulk():
         
         # 🚀 Bulk insert using executemany (10-100x faster than individual inserts!)
         cursor.executemany("""
-            INSERT INTO items (item_id, group_id, length, width, height, weight, item_order)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO items (item_id, group_id, length, width, height, weight, max_load, item_order)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, insert_data)
         
         conn.commit()
@@ -1,42 +1,108 @@
 """
-Database initialization and table creation
-Tables are created only if they don't exist - data persists across restarts
+Database initialization and schema migrations
+The schema version is kept in PRAGMA user_version; startup only applies the
+migrations a database is missing, so data persists across restarts
 Use RESET_DB=1 environment variable to force database reset
 """
-from src.api_server_v2.db_config import get_db_connection
+from src.api_server_v2.db_config import get_db_connection, REVISIONED_TABLES
 import os
 
-def init_all_tables(reset_db=False):
+def ensure_column(cursor, table, column, declaration):
+    """Add a column to an existing table if it is missing (keeps old databases usable)"""
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+        print(f"✓ Column added: {table}.{column}")
+
+
+def ensure_revision_tracking(cursor):
     """
-    Initialize all database tables
-    Args:
-        reset_db: If True, drop all tables before recreating (清空資料庫)
-                  If False, only create tables if they don't exist (保留資料)
+    Create the revisions table and the triggers that keep it current.
+    Every insert/update/delete on a tracked table sets that table's revision to the
+    next value of one session-wide sequence. The table survives RESET_DB, so revisions
+    (and the ETags built from them) never repeat.
     """
-    print("=" * 50)
-    print("Initializing Database Tables...")
-    
-    # Check environment variable
-    if os.getenv('RESET_DB') == '1':
-        reset_db = True
-        print("⚠️  RESET_DB=1 detected - will clear all data")
-    
-    print("=" * 50)
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if reset_db:
-        print("🗑️  Dropping all existing tables...")
-        # Drop all tables
-        cursor.execute("DROP TABLE IF EXISTS items")
-        cursor.execute("DROP TABLE IF EXISTS groups")
-        cursor.execute("DROP TABLE IF EXISTS packing_results")
-        cursor.execute("DROP TABLE IF EXISTS zone_assignments")
-        cursor.execute("DROP TABLE IF EXISTS zones")
-        cursor.execute("DROP TABLE IF EXISTS containers")
-        print("✓ All tables dropped")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS revisions (
+            entity TEXT PRIMARY KEY,
+            revision INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO revisions (entity, revision) VALUES (?, 0)",
+        [(table,) for table in REVISIONED_TABLES]
+    )
+    for table in REVISIONED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS revision_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE revisions
+                    SET revision = (SELECT MAX(revision) FROM revisions) + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE entity = '{table}';
+                END
+            """)
+    print(f"✓ Revision tracking ready: {', '.join(REVISIONED_TABLES)}")
+
+
+def ensure_group_aggregates(cursor):
+    """
+    Create group_aggregates (item count, total volume and weight per group) and the
+    triggers on items/groups that keep it current, then rebuild it from items so it
+    is exact after schema changes or edits made while the triggers did not exist.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS group_aggregates (
+            group_id INTEGER PRIMARY KEY,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            total_volume REAL NOT NULL DEFAULT 0,
+            total_weight REAL NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("DELETE FROM group_aggregates")
+    cursor.execute("""
+        INSERT INTO group_aggregates (group_id, item_count, total_volume, total_weight)
+        SELECT group_id, COUNT(*), SUM(length * width * height), SUM(COALESCE(weight, 0))
+        FROM items
+        GROUP BY group_id
+    """)
     
+    add_new = """
+        INSERT OR IGNORE INTO group_aggregates (group_id) VALUES (NEW.group_id);
+        UPDATE group_aggregates
+        SET item_count = item_count + 1,
+            total_volume = total_volume + NEW.length * NEW.width * NEW.height,
+            total_weight = total_weight + COALESCE(NEW.weight, 0)
+        WHERE group_id = NEW.group_id;
+    """
+    remove_old = """
+        UPDATE group_aggregates
+        SET item_count = item_count - 1,
+            total_volume = total_volume - OLD.length * OLD.width * OLD.height,
+            total_weight = total_weight - COALESCE(OLD.weight, 0)
+        WHERE group_id = OLD.group_id;
+    """
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS group_aggregates_item_insert AFTER INSERT ON items BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS group_aggregates_item_delete AFTER DELETE ON items BEGIN {remove_old} END")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS group_aggregates_item_update
+        AFTER UPDATE OF group_id, length, width, height, weight ON items
+        BEGIN {remove_old} {add_new} END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS group_aggregates_group_delete AFTER DELETE ON groups
+        BEGIN
+            DELETE FROM group_aggregates WHERE group_id = OLD.id;
+        END
+    """)
+    print("✓ Table ready: group_aggregates (maintained by triggers)")
+
+
+def migrate_base_tables(cursor):
+    """Schema v1: the core tables (plus columns added to them since)"""
     # Create groups table (only if not exists)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS groups (
@@ -58,6 +124,7 @@ def init_all_tables(reset_db=False):
             width REAL NOT NULL,
             height REAL NOT NULL,
             weight REAL DEFAULT 0,
+            max_load REAL,
             item_order INTEGER DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (group_id) REFERENCES groups(id) ON DELETE CASCADE
@@ -86,6 +153,7 @@ def init_all_tables(reset_db=False):
             x REAL DEFAULT 0,
             y REAL DEFAULT 0,
             rotation REAL DEFAULT 0,
+            max_payload REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
@@ -123,22 +191,127 @@ def init_all_tables(reset_db=False):
     """)
     print("✓ Table ready: packing_results")
     
-    # Show current data counts
-    groups_count = cursor.execute("SELECT COUNT(*) FROM groups").fetchone()[0]
-    items_count = cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0]
-    zones_count = cursor.execute("SELECT COUNT(*) FROM zones").fetchone()[0]
-    
-    print()
-    print(f"📊 Current Data:")
-    print(f"   Groups: {groups_count}")
-    print(f"   Items: {items_count}")
-    print(f"   Zones: {zones_count}")
+    # Add columns introduced after the tables were first created
+    ensure_column(cursor, 'items', 'max_load', 'REAL')
+    ensure_column(cursor, 'zones', 'max_payload', 'REAL')
+
+
+def migrate_indexes(cursor):
+    """Schema v2: indexes for the per-zone item join used by the packing pipeline"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_zone_assignments_zone ON zone_assignments (zone_id, group_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_group_order ON items (group_id, item_order)")
+    print("✓ Indexes ready: zone_assignments(zone_id, group_id), items(group_id, item_order)")
+
+
+def migrate_running_jobs(cursor):
+    """Schema v5: packing jobs in progress, shared by all server processes (see sequence/jobs.py)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS running_jobs (
+            job_id TEXT PRIMARY KEY,
+            pid INTEGER NOT NULL,
+            started_at REAL NOT NULL,
+            deadline REAL,
+            heartbeat_at REAL NOT NULL,
+            cancel_requested INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    print("✓ Table ready: running_jobs")
+
+
+# Ordered forward migrations: (version, description, function).
+# Each one is idempotent, so databases created before versioning (user_version 0)
+# are brought up to date safely. Append new steps here; never edit shipped ones.
+MIGRATIONS = [
+    (1, 'base tables', migrate_base_tables),
+    (2, 'packing indexes', migrate_indexes),
+    (3, 'revision tracking', ensure_revision_tracking),
+    (4, 'group aggregates', ensure_group_aggregates),
+    (5, 'running jobs', migrate_running_jobs),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Tables cleared by RESET_DB (revisions is kept so ETags never repeat)
+DATA_TABLES = ['items', 'groups', 'packing_results', 'zone_assignments', 'zones', 'containers', 'group_aggregates',
+               'running_jobs']
+
+
+def get_schema_version(conn):
+    """Schema version stored in the database file (PRAGMA user_version)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_all_tables(reset_db=False):
+    """
+    Bring the database schema up to date.
+    The schema version lives in PRAGMA user_version; when it already matches
+    SCHEMA_VERSION nothing is executed beyond that one read, so restarts are cheap.
+    Otherwise the pending MIGRATIONS run in a single write transaction.
+    Args:
+        reset_db: If True, drop all data tables and rebuild the schema (清空資料庫)
+                  If False, keep data and only apply missing migrations (保留資料)
+    """
+    # Check environment variable
+    if os.getenv('RESET_DB') == '1':
+        reset_db = True
     
-    conn.commit()
-    conn.close()
+    conn = get_db_connection()
+    try:
+        # WAL lets the server processes read while one of them writes (persists in the file)
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != 'wal':
+            conn.execute("PRAGMA journal_mode = WAL")
+            print("✓ Journal mode: WAL")
+        version = get_schema_version(conn)
+        if version == SCHEMA_VERSION and not reset_db:
+            print(f"✓ Database schema up to date (v{SCHEMA_VERSION})")
+            return
+        if version > SCHEMA_VERSION and not reset_db:
+            print(f"⚠️  Database schema v{version} is newer than this server (v{SCHEMA_VERSION}); leaving it unchanged")
+            return
+        
+        print("=" * 50)
+        print("Initializing Database Tables...")
+        if reset_db:
+            print("⚠️  RESET_DB=1 detected - will clear all data")
+        print("=" * 50)
+        
+        cursor = conn.cursor()
+        # Take the write lock first so concurrently starting workers migrate once
+        cursor.execute("BEGIN IMMEDIATE")
+        version = get_schema_version(conn)
+        
+        if reset_db:
+            print("🗑️  Dropping all existing tables...")
+            for table in DATA_TABLES:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            print("✓ All tables dropped")
+            version = 0
+        
+        for target, description, migrate in MIGRATIONS:
+            if target > version:
+                print(f"🔧 Migrating schema v{target - 1} → v{target}: {description}")
+                migrate(cursor)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        
+        # Show current data counts
+        groups_count = cursor.execute("SELECT COUNT(*) FROM groups").fetchone()[0]
+        items_count = cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        zones_count = cursor.execute("SELECT COUNT(*) FROM zones").fetchone()[0]
+        
+        print()
+        print(f"📊 Current Data:")
+        print(f"   Groups: {groups_count}")
+        print(f"   Items: {items_count}")
+        print(f"   Zones: {zones_count}")
+        
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     print("=" * 50)
-    print("Database initialization complete!")
+    print(f"Database initialization complete! (schema v{SCHEMA_VERSION})")
     if reset_db:
         print("✓ Database was reset (all data cleared)")
     else:
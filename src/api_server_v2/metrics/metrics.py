@@ -0,0 +1,288 @@
+"""
+Metrics API Blueprint
+Collects request, database, packing and cache metrics in-process
+and exposes them in the Prometheus text exposition format at /metrics
+"""
+import threading
+import time
+from flask import Blueprint, Response, request
+
+# Create Blueprint
+metrics_api_blueprint = Blueprint('metrics_api', __name__)
+
+# Default latency buckets in seconds (same as the Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label used for work done outside of a Flask request (startup, workers)
+NO_ROUTE = 'none'
+
+_route_context = threading.local()
+
+
+# ========== METRIC TYPES ==========
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + body + '}'
+
+
+class _Metric:
+    """Base class for a labelled metric family"""
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}'
+        ]
+        with self._lock:
+            samples = list(self._values.items())
+        for key, value in sorted(samples):
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f'{self.name}{_format_labels(self.label_names, key)} {value}']
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def _render_sample(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['counts']):
+            cumulative += count
+            labels = _format_labels(self.label_names, key, ('le', repr(float(bound))))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.label_names, key, ('le', '+Inf'))
+        lines.append(f'{self.name}_bucket{labels} {state["count"]}')
+        labels = _format_labels(self.label_names, key)
+        lines.append(f'{self.name}_sum{labels} {state["sum"]}')
+        lines.append(f'{self.name}_count{labels} {state["count"]}')
+        return lines
+
+
+# ========== REGISTRY ==========
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route.',
+    ('method', 'route', 'status')
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being served.',
+    ('route',)
+)
+DB_QUERIES = Counter(
+    'sqlite_queries_total',
+    'SQLite statements executed by route.',
+    ('route',)
+)
+DB_QUERY_DURATION = Histogram(
+    'sqlite_query_duration_seconds',
+    'SQLite statement execution time by route.',
+    ('route',),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+PACKING_DURATION = Histogram(
+    'packing_job_duration_seconds',
+    'Packing algorithm wall time per zone.',
+    ('zone',),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by cache name and result (hit/miss).',
+    ('cache', 'result')
+)
+PACKING_ADMISSION = Gauge(
+    'packing_admission_runs',
+    'Packing runs holding a slot (running) or waiting for one (queued).',
+    ('state',)
+)
+PACKING_REJECTED = Counter(
+    'packing_admission_rejected_total',
+    'Packing requests turned away because the queue was full.',
+    ('priority',)
+)
+
+REGISTRY = [
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    DB_QUERIES,
+    DB_QUERY_DURATION,
+    PACKING_DURATION,
+    CACHE_REQUESTS,
+    PACKING_ADMISSION,
+    PACKING_REJECTED,
+]
+
+
+def current_route():
+    """Route label of the request being served on this thread"""
+    return getattr(_route_context, 'route', NO_ROUTE)
+
+
+def record_db_query(duration_s):
+    """Record one SQLite statement against the current route"""
+    route = current_route()
+    DB_QUERIES.inc(route=route)
+    DB_QUERY_DURATION.observe(duration_s, route=route)
+
+
+def record_packing(zone_label, duration_s):
+    """Record the packing wall time of a single zone"""
+    PACKING_DURATION.observe(duration_s, zone=zone_label)
+
+
+def record_admission(running, queued):
+    """Record the packing admission state after a change"""
+    PACKING_ADMISSION.set(running, state='running')
+    PACKING_ADMISSION.set(queued, state='queued')
+
+
+def record_admission_rejected(priority):
+    """Record a packing request rejected with 429"""
+    PACKING_REJECTED.inc(priority=priority)
+
+
+def record_cache(cache_name, hit):
+    """Record a cache lookup; hit ratios are derived in render_metrics()"""
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+
+def _render_cache_ratios():
+    with CACHE_REQUESTS._lock:
+        samples = dict(CACHE_REQUESTS._values)
+    caches = sorted({cache for cache, _ in samples})
+    lines = [
+        '# HELP cache_hit_ratio Fraction of cache lookups that were hits.',
+        '# TYPE cache_hit_ratio gauge'
+    ]
+    for cache in caches:
+        hits = samples.get((cache, 'hit'), 0)
+        total = hits + samples.get((cache, 'miss'), 0)
+        ratio = hits / total if total else 0.0
+        lines.append(f'cache_hit_ratio{_format_labels(("cache",), (cache,))} {ratio}')
+    return lines
+
+
+def render_metrics():
+    """Render every registered metric in Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_render_cache_ratios())
+    return '\n'.join(lines) + '\n'
+
+
+# ========== REQUEST INSTRUMENTATION ==========
+
+def install_request_metrics(app):
+    """Attach latency and in-flight tracking hooks to a Flask app"""
+
+    @app.before_request
+    def _start_request_timer():
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        _route_context.route = route
+        _route_context.start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc(route=route)
+
+    @app.teardown_request
+    def _finish_request_timer(exc):
+        route = getattr(_route_context, 'route', None)
+        start = getattr(_route_context, 'start', None)
+        if route is None or start is None:
+            return
+        status = getattr(_route_context, 'status', None) or (500 if exc else 200)
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method, route=route, status=status
+        )
+        REQUESTS_IN_FLIGHT.dec(route=route)
+        _route_context.route = NO_ROUTE
+        _route_context.start = None
+        _route_context.status = None
+
+    @app.after_request
+    def _capture_status(response):
+        _route_context.status = response.status_code
+        return response
+
+
+# ========== METRICS ENDPOINT ==========
+
+@metrics_api_blueprint.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,62 @@
+"""
+Revisions API Blueprint
+Conditional GET helpers (ETag / 304) for read endpoints and a change feed,
+both driven by the revisions table maintained by database triggers
+"""
+from flask import Blueprint, Response, jsonify, request
+from src.api_server_v2.db_config import get_db_connection, get_revisions, revision_etag, REVISIONED_TABLES
+from src.api_server_v2.metrics.metrics import record_cache
+
+# Create Blueprint
+revisions_api_blueprint = Blueprint('revisions_api', __name__)
+
+
+# ========== CONDITIONAL GET HELPERS ==========
+
+def conditional_get(conn, entities):
+    """
+    ETag for a response built from `entities` and, when the client already holds
+    that version (If-None-Match), the 304 response to return instead.
+    Returns (etag, not_modified_response_or_None).
+    """
+    etag = revision_etag(conn, entities)
+    if etag is None:
+        return None, None
+    # The client's copy is the cache: a 304 is a hit, anything else a miss
+    hit = request.if_none_match.contains(etag)
+    record_cache('http_etag', hit)
+    if hit:
+        return etag, with_etag(Response(status=304), etag)
+    return etag, None
+
+
+def with_etag(response, etag):
+    """Attach the ETag; no-cache makes browsers revalidate (cheaply) on every fetch"""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+# ========== CHANGE FEED ENDPOINT ==========
+
+@revisions_api_blueprint.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Lightweight change feed.
+    Query param: since (a revision from an earlier call, default 0).
+    Returns the current revision and every entity changed after `since`, with its revision;
+    poll with since=<revision> and refetch only the entities listed.
+    """
+    since = request.args.get('since', default=0, type=int)
+    conn = get_db_connection()
+    try:
+        revisions = get_revisions(conn, REVISIONED_TABLES)
+        current = max(revisions.values(), default=0)
+        return jsonify({
+            'revision': current,
+            'since': since,
+            'changed': {entity: revision for entity, revision in revisions.items() if revision > since}
+        }), 200
+    finally:
+        conn.close()
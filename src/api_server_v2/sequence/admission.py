@@ -0,0 +1,139 @@
+"""
+Admission control for packing runs.
+At most PACKING_MAX_CONCURRENT runs pack at once; up to PACKING_MAX_QUEUED more
+wait for a slot, interactive runs ahead of batch runs. Anything beyond that is
+turned away with a Retry-After estimate, so CPU-heavy jobs cannot starve the
+CRUD endpoints served by the same process.
+"""
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+# Lower value is served first
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+
+class AdmissionRejected(Exception):
+    """The packing queue is full; retry after `retry_after_s` seconds"""
+
+    def __init__(self, retry_after_s):
+        super().__init__(f"Packing queue is full; retry after {retry_after_s}s")
+        self.retry_after_s = retry_after_s
+
+
+class PackingAdmission:
+    """Bounded, priority-ordered gate in front of packing runs"""
+
+    def __init__(self, max_concurrent, max_queued):
+        # None = size to the packing pool, resolved on first use so importing
+        # this module (at server start) does not pull in multiprocessing
+        self._max_concurrent = None if max_concurrent is None else max(1, int(max_concurrent))
+        self.max_queued = max(0, int(max_queued))
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting = []  # heap of (priority, arrival, threading.Event)
+        self._arrivals = itertools.count()
+        # Moving average of run time, for Retry-After
+        self._avg_run_s = 5.0
+
+    @property
+    def max_concurrent(self):
+        if self._max_concurrent is None:
+            self._max_concurrent = max(1, int(_default_concurrency()))
+        return self._max_concurrent
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': self._running,
+                'queued': len(self._waiting),
+                'max_concurrent': self.max_concurrent,
+                'max_queued': self.max_queued
+            }
+
+    def _retry_after_s(self):
+        """Seconds until a queue position is likely to free up (at least 1)"""
+        backlog = len(self._waiting) + 1
+        return max(1, math.ceil(self._avg_run_s * backlog / self.max_concurrent))
+
+    def acquire(self, priority='interactive'):
+        """Block until a slot is free; raises AdmissionRejected when the queue is full"""
+        rank = PRIORITIES.get(priority)
+        if rank is None:
+            raise ValueError(f"Unknown priority '{priority}'. Available: {sorted(PRIORITIES)}")
+        with self._lock:
+            if self._running < self.max_concurrent and not self._waiting:
+                self._running += 1
+                _record(self._running, len(self._waiting))
+                return time.perf_counter()
+            if len(self._waiting) >= self.max_queued:
+                _record_rejection(priority)
+                raise AdmissionRejected(self._retry_after_s())
+            turn = threading.Event()
+            heapq.heappush(self._waiting, (rank, next(self._arrivals), turn))
+            _record(self._running, len(self._waiting))
+        turn.wait()  # release() hands this slot over already counted as running
+        return time.perf_counter()
+
+    def release(self, started_at=None):
+        """Free a slot, handing it to the first waiter in priority order"""
+        with self._lock:
+            if started_at is not None:
+                self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * (time.perf_counter() - started_at)
+            if self._waiting:
+                _, _, turn = heapq.heappop(self._waiting)
+                turn.set()
+            else:
+                self._running -= 1
+            _record(self._running, len(self._waiting))
+
+    def slot(self, priority='interactive'):
+        """Context manager holding one slot for the duration of a run"""
+        return _Slot(self, priority)
+
+
+class _Slot:
+    def __init__(self, admission, priority):
+        self.admission = admission
+        self.priority = priority
+        self.started_at = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def acquire(self):
+        self.started_at = self.admission.acquire(self.priority)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def release(self):
+        """Idempotent, so it can also be bound to a streamed response's close"""
+        if self.started_at is not None:
+            started_at, self.started_at = self.started_at, None
+            self.admission.release(started_at)
+
+
+def _record(running, queued):
+    from src.api_server_v2.metrics.metrics import record_admission
+    record_admission(running, queued)
+
+
+def _record_rejection(priority):
+    from src.api_server_v2.metrics.metrics import record_admission_rejected
+    record_admission_rejected(priority)
+
+
+def _default_concurrency():
+    from src.py_packer_v2.parallel import worker_count
+    return worker_count()
+
+
+packing_admission = PackingAdmission(
+    max_concurrent=os.getenv('PACKING_MAX_CONCURRENT') or None,
+    max_queued=int(os.getenv('PACKING_MAX_QUEUED') or 8)
+)
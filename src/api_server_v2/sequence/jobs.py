@@ -0,0 +1,151 @@
+"""
+Registry of running packing jobs, shared by every server process.
+Jobs are rows of the running_jobs table in the session DB, so any worker (see
+serve.py / start_servers.py --workers) can list or cancel a job another one is
+running. Each process keeps the CancellationToken of its own jobs; a watcher
+thread refreshes their heartbeats and turns cancel requests stored in the DB
+into token.cancel() within JOB_POLL_S. Rows whose heartbeat stops (the worker
+died) are dropped after JOB_STALE_S.
+"""
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from src.api_server_v2.db_config import get_db_connection
+from src.py_packer_v2.cancellation import CancellationToken
+
+JOB_POLL_S = float(os.getenv('JOB_POLL_S') or 0.5)
+JOB_STALE_S = float(os.getenv('JOB_STALE_S') or 10)
+
+# job_id -> CancellationToken for the jobs running in this process
+_local_jobs = {}
+_local_lock = threading.Lock()
+_watcher = None
+_sequence = itertools.count(1)
+
+
+def new_job_id():
+    """Job id unique across processes: start time, process id and a per-process counter"""
+    return f"job_{int(time.time())}_{os.getpid()}_{next(_sequence)}"
+
+
+def _drop_stale(conn, now):
+    conn.execute('DELETE FROM running_jobs WHERE heartbeat_at < ?', (now - JOB_STALE_S,))
+
+
+def start_job(requested_id, time_limit_s):
+    """Register a running job and return (job_id, token); raises KeyError if a requested id is running already"""
+    global _watcher
+    job_id = str(requested_id) if requested_id else new_job_id()
+    token = CancellationToken(time_limit_s)
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        _drop_stale(conn, now)
+        conn.execute(
+            'INSERT INTO running_jobs (job_id, pid, started_at, deadline, heartbeat_at) VALUES (?, ?, ?, ?, ?)',
+            (job_id, os.getpid(), now, None if time_limit_s is None else now + time_limit_s, now)
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        raise KeyError(job_id)
+    finally:
+        conn.close()
+
+    with _local_lock:
+        _local_jobs[job_id] = token
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, name='packing-jobs', daemon=True)
+            _watcher.start()
+    return job_id, token
+
+
+def finish_job(job_id):
+    with _local_lock:
+        _local_jobs.pop(job_id, None)
+    conn = get_db_connection()
+    try:
+        conn.execute('DELETE FROM running_jobs WHERE job_id = ?', (job_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def cancel_job(job_id):
+    """Flag a running job (in any process) for cancellation; False if no such job is running"""
+    conn = get_db_connection()
+    try:
+        _drop_stale(conn, time.time())
+        cancelled = conn.execute(
+            'UPDATE running_jobs SET cancel_requested = 1 WHERE job_id = ?', (job_id,)
+        ).rowcount > 0
+        conn.commit()
+    finally:
+        conn.close()
+    with _local_lock:
+        token = _local_jobs.get(job_id)
+    if token is not None:
+        token.cancel()  # No need to wait for the watcher in the owning process
+    return cancelled
+
+
+def list_jobs():
+    """Running jobs of every process, with the seconds left before their deadline"""
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            'SELECT job_id, pid, deadline, cancel_requested FROM running_jobs WHERE heartbeat_at >= ? ORDER BY started_at, job_id',
+            (now - JOB_STALE_S,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            "job_id": row['job_id'],
+            "pid": row['pid'],
+            "cancelled": bool(row['cancel_requested']),
+            "remaining_s": None if row['deadline'] is None else max(0.0, row['deadline'] - now)
+        }
+        for row in rows
+    ]
+
+
+def _poll(job_ids):
+    """Refresh the heartbeats of this process's jobs; returns the ids flagged for cancellation"""
+    placeholders = ','.join('?' * len(job_ids))
+    conn = get_db_connection()
+    try:
+        conn.execute(f'UPDATE running_jobs SET heartbeat_at = ? WHERE job_id IN ({placeholders})',
+                     (time.time(), *job_ids))
+        conn.commit()
+        return [row[0] for row in conn.execute(
+            f'SELECT job_id FROM running_jobs WHERE cancel_requested = 1 AND job_id IN ({placeholders})', job_ids
+        ).fetchall()]
+    finally:
+        conn.close()
+
+
+def _watch():
+    """Watcher thread: runs while this process has jobs, then exits (start_job starts a new one)"""
+    global _watcher
+    while True:
+        time.sleep(JOB_POLL_S)
+        with _local_lock:
+            if not _local_jobs:
+                _watcher = None
+                return
+            job_ids = list(_local_jobs)
+        try:
+            cancelled = _poll(job_ids)
+        except sqlite3.Error as e:
+            print(f"⚠️  Job watcher could not reach the database: {e}")
+            continue
+        with _local_lock:
+            for job_id in cancelled:
+                token = _local_jobs.get(job_id)
+                if token is not None:
+                    token.cancel()
@@ -1,12 +1,19 @@
 from flask import Blueprint, jsonify, request
+import itertools
 import json
+import os
+import threading
 from datetime import datetime
 
 # --- Blueprint Setup ---
 sequence_api_blueprint = Blueprint('sequence_api', __name__)
 
 # --- Use the shared database configuration ---
-from src.api_server_v2.db_config import get_db_connection
+from src.api_server_v2.db_config import get_db_connection, apply_item_order, begin_write
+from src.api_server_v2.metrics.metrics import record_packing, record_cache
+from src.api_server_v2.sequence.admission import packing_admission, AdmissionRejected, PRIORITIES
+from src.api_server_v2.sequence import jobs
+from src.api_server_v2.revisions.revisions import conditional_get, with_etag
 
 # --- Database Initialization ---
 
@@ -53,19 +60,23 @@ def save_sequence():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        cursor.execute("BEGIN TRANSACTION;")
-        
+        order_pairs = []
         for item in sequence:
             if not all(k in item for k in ('item_id', 'order')):
                 raise ValueError("Each object in 'sequence' must contain 'item_id' and 'order'")
-            
-            cursor.execute(
-                "UPDATE items SET item_order = ? WHERE id = ?",
-                (item['order'], item['item_id'])
-            )
+            order_pairs.append((int(item['item_id']), int(item['order'])))
+        
+        begin_write(conn)
+        
+        # One set-based UPDATE; unchanged rows are not rewritten
+        changed = apply_item_order(conn, order_pairs)
         
         conn.commit()
-        return jsonify({"success": True, "message": f"Successfully updated order for {len(sequence)} items."}), 200
+        return jsonify({
+            "success": True,
+            "message": f"Successfully updated order for {len(sequence)} items.",
+            "changed": changed
+        }), 200
 
     except (ValueError, TypeError) as e:
         if conn:
@@ -81,40 +92,479 @@ def save_sequence():
             conn.close()
 
 
+def _load_zone_jobs(conn):
+    """
+    Loads groups and every zone with assigned groups, with its item count.
+    Returns (groups_data, [zone_dict, ...]); fetch the items with _iter_zone_items().
+    """
+    groups_data = [dict(row) for row in conn.execute('SELECT * FROM groups').fetchall()]
+    zones = [dict(row) for row in conn.execute('''
+        SELECT z.id, z.label, z.length, z.width, z.height, z.x, z.y, z.max_payload,
+               COUNT(i.id) AS item_count
+        FROM zones z
+        INNER JOIN (SELECT DISTINCT zone_id, group_id FROM zone_assignments) za ON z.id = za.zone_id
+        LEFT JOIN items i ON i.group_id = za.group_id
+        GROUP BY z.id
+        ORDER BY z.id
+    ''').fetchall()]
+    return groups_data, zones
+
+
+def _iter_zone_items(conn, zones):
+    """
+    Yields (zone_dict, zone_items) for the given zones (ordered by id, as returned by
+    _load_zone_jobs), one zone at a time. All items come from a single join over
+    zone_assignments and items, read from the cursor as each zone is consumed.
+    """
+    if not zones:
+        return
+    placeholders = ','.join('?' * len(zones))
+    rows = conn.execute(f'''
+        SELECT za.zone_id AS assigned_zone_id, i.*
+        FROM (SELECT DISTINCT zone_id, group_id FROM zone_assignments) za
+        INNER JOIN items i ON i.group_id = za.group_id
+        WHERE za.zone_id IN ({placeholders})
+        ORDER BY za.zone_id, i.item_order, i.id
+    ''', [zone['id'] for zone in zones])
+    
+    by_zone = itertools.groupby(rows, key=lambda row: row['assigned_zone_id'])
+    zone_id, zone_rows = next(by_zone, (None, ()))
+    for zone in zones:
+        zone_items = []
+        if zone_id == zone['id']:
+            for row in zone_rows:
+                item = dict(row)
+                del item['assigned_zone_id']
+                zone_items.append(item)
+            zone_id, zone_rows = next(by_zone, (None, ()))
+        yield zone, zone_items
+
+
+# Items whose footprint fits the zone in neither Y-axis rotation, or that are too tall
+# (same axes as _zone_container: length -> X, height -> Y, width -> Z)
+_OVERSIZED_ITEM = '''
+    i.height > z.height + 1e-6
+    OR NOT ((i.length <= z.length + 1e-6 AND i.width <= z.width + 1e-6)
+            OR (i.width <= z.length + 1e-6 AND i.length <= z.width + 1e-6))
+'''
+
+
+def _zone_feasibility(conn, pairs=None, max_listed=20):
+    """
+    Necessary conditions for every assigned zone to hold its groups, computed in SQL:
+    total item volume vs. zone volume, total weight vs. max_payload, and items that fit
+    in no orientation. pairs: proposed (zone_id, group_id) list; None checks the saved
+    assignments. Passing all checks does not guarantee that the packer places everything.
+    """
+    if pairs is None:
+        assignments_cte = 'SELECT DISTINCT zone_id, group_id FROM zone_assignments'
+        params = []
+    elif not pairs:
+        return []
+    else:
+        assignments_cte = 'SELECT DISTINCT column1, column2 FROM (VALUES ' + ','.join('(?, ?)' for _ in pairs) + ')'
+        params = [int(value) for pair in pairs for value in pair]
+    
+    totals = conn.execute(f'''
+        WITH za(zone_id, group_id) AS ({assignments_cte})
+        SELECT z.id, z.label, z.length, z.width, z.height, z.max_payload,
+               COUNT(za.group_id) AS group_count,
+               COALESCE(SUM(a.item_count), 0) AS item_count,
+               COALESCE(SUM(a.total_volume), 0) AS total_volume,
+               COALESCE(SUM(a.total_weight), 0) AS total_weight
+        FROM zones z
+        INNER JOIN za ON za.zone_id = z.id
+        LEFT JOIN group_aggregates a ON a.group_id = za.group_id
+        GROUP BY z.id
+        ORDER BY z.id
+    ''', params).fetchall()
+    
+    oversized = {}
+    for row in conn.execute(f'''
+        WITH za(zone_id, group_id) AS ({assignments_cte})
+        SELECT za.zone_id, i.id, i.item_id, i.length, i.width, i.height
+        FROM za
+        INNER JOIN zones z ON z.id = za.zone_id
+        INNER JOIN items i ON i.group_id = za.group_id
+        WHERE {_OVERSIZED_ITEM}
+        ORDER BY za.zone_id, i.item_order, i.id
+    ''', params):
+        oversized.setdefault(row['zone_id'], []).append({
+            'id': row['id'], 'item_id': row['item_id'],
+            'length': row['length'], 'width': row['width'], 'height': row['height']
+        })
+    
+    report = []
+    for row in totals:
+        zone_volume = row['length'] * row['width'] * row['height']
+        zone_oversized = oversized.get(row['id'], [])
+        reasons = []
+        if row['total_volume'] > zone_volume + 1e-6:
+            reasons.append('volume')
+        if row['max_payload'] is not None and row['total_weight'] > row['max_payload'] + 1e-6:
+            reasons.append('weight')
+        if zone_oversized:
+            reasons.append('oversized_items')
+        report.append({
+            'zone_id': row['id'],
+            'zone_label': row['label'],
+            'group_count': row['group_count'],
+            'item_count': row['item_count'],
+            'total_volume': row['total_volume'],
+            'zone_volume': zone_volume,
+            'volume_ratio': row['total_volume'] / zone_volume if zone_volume > 0 else None,
+            'total_weight': row['total_weight'],
+            'max_payload': row['max_payload'],
+            'oversized_count': len(zone_oversized),
+            'oversized_items': zone_oversized[:max_listed],
+            'possible': not reasons,
+            'reasons': reasons
+        })
+    return report
+
+
+def _zone_container(zone):
+    """Create container data using zone dimensions"""
+    return {
+        'parameters': {
+            'widthX': zone['length'],
+            'heightY': zone['height'],
+            'depthZ': zone['width']
+        }
+    }
+
+
+def _zone_options(zone, mode, options):
+    """Engine options for one zone; weighted mode picks up the zone's payload limit"""
+    if mode == 'weighted' and zone.get('max_payload') is not None and 'max_payload' not in options:
+        return {**options, 'max_payload': zone['max_payload']}
+    return options
+
+
+def _store_zone_result(cursor, job_id, result):
+    """Insert one zone's packing result into packing_results"""
+    cursor.execute("""
+        INSERT INTO packing_results 
+        (job_id, zone_id, zone_label, result_json, success, message, packed_count, unpacked_count, volume_utilization, execution_time_ms)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        job_id,
+        result['zone_id'],
+        result['zone_label'],
+        json.dumps(result),
+        result['success'],
+        result['message'],
+        result['packed_count'],
+        result['unpacked_count'],
+        result['volume_utilization'],
+        result['execution_time_ms']
+    ))
+
+
+def _packing_mode_args(params):
+    """
+    Reads the packing engine selection from request params.
+    mode: 'grid' (default), 'heightmap', 'weighted', 'optimize', 'sequence', 'ems' or 'multistart'; options: engine keyword arguments.
+    For query strings, options may be passed flat
+    (resolution, min_support, time_budget_s, door, strict, fixed_point, unit_scale).
+    """
+    from src.py_packer_v2.main import get_packing_engine
+    from src.py_packer_v2.sequenced import DOORS
+    
+    mode = params.get('mode') or 'grid'
+    get_packing_engine(mode)  # Raises ValueError for unknown modes
+    options = params.get('options')
+    if not isinstance(options, dict):
+        options = {}
+        for key in ('resolution', 'min_support', 'max_payload', 'time_budget_s'):
+            if params.get(key) is not None:
+                options[key] = float(params.get(key))
+        if params.get('door'):
+            options['door'] = params.get('door')
+        for key in ('strict', 'fixed_point'):
+            if params.get(key) is not None:
+                options[key] = str(params.get(key)).lower() not in ('0', 'false', 'no')
+        if params.get('unit_scale') is not None:
+            options['unit_scale'] = int(params.get('unit_scale'))
+    if mode == 'sequence' and options.get('door', '+x') not in DOORS:
+        raise ValueError(f"Unknown door '{options['door']}'. Available: {list(DOORS)}")
+    return mode, options
+
+
+# --- Running Jobs (deadline / cancellation) ---
+# Registered in the shared DB (see jobs.py), so any server process can list or cancel them
+
+
+def _time_limit_s(params):
+    """
+    Job time limit from the request's time_limit_ms, else the PACKING_TIME_LIMIT_MS
+    environment default. Returns seconds, or None for no limit.
+    """
+    value = params.get('time_limit_ms') or os.getenv('PACKING_TIME_LIMIT_MS')
+    if value in (None, ''):
+        return None
+    value = float(value)
+    if value <= 0:
+        raise ValueError("time_limit_ms must be positive")
+    return value / 1000.0
+
+
+def _priority(params, default='interactive'):
+    """Admission priority from the request: 'interactive' or 'batch'"""
+    priority = params.get('priority') or default
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}'. Available: {sorted(PRIORITIES)}")
+    return priority
+
+
+def _queue_full(error):
+    """(body, status, headers) for a request turned away by admission control"""
+    return (
+        {"success": False, "error": "Packing queue is full", "retry_after_s": error.retry_after_s},
+        429,
+        {'Retry-After': str(error.retry_after_s)}
+    )
+
+
+@sequence_api_blueprint.route('/feasibility', methods=['GET', 'POST'])
+def check_feasibility():
+    """
+    Fast pre-check of whether each zone can possibly hold its assigned groups.
+    GET checks the saved assignments; POST checks proposed ones without saving:
+    { "assignments": { zoneId: [groupId, ...], ... } } (same format as POST /zone-assignments).
+    Per zone: volume, weight (vs. max_payload) and items fitting in no orientation,
+    with possible=false and the failed checks in reasons.
+    """
+    conn = None
+    try:
+        pairs = None
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            assignments = data.get('assignments')
+            if not isinstance(assignments, dict):
+                return jsonify({"success": False, "error": "'assignments' must map zone ids to group id lists"}), 400
+            try:
+                pairs = [(int(zone_id), int(group_id))
+                         for zone_id, group_ids in assignments.items() for group_id in group_ids]
+            except (TypeError, ValueError) as e:
+                return jsonify({"success": False, "error": "Invalid assignments", "details": str(e)}), 400
+        
+        conn = get_db_connection()
+        zones = _zone_feasibility(conn, pairs)
+        return jsonify({
+            "success": True,
+            "possible": all(zone['possible'] for zone in zones),
+            "zones": zones
+        }), 200
+    except Exception as e:
+        print(f"Feasibility check error: {e}")
+        return jsonify({"success": False, "error": "Feasibility check failed", "details": str(e)}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
+@sequence_api_blueprint.route('/jobs', methods=['GET'])
+def list_running_jobs():
+    """
+    Lists packing jobs currently running in any server process, with the seconds left
+    before their deadline, and this process's admission queue
+    """
+    return jsonify({"success": True, "jobs": jobs.list_jobs(), "admission": packing_admission.stats()}), 200
+
+
+@sequence_api_blueprint.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    Requests cancellation of a running job, whichever server process runs it. The packer
+    stops at its next check (within jobs.JOB_POLL_S for another process's job) and the
+    partial result is stored and returned flagged truncated.
+    """
+    if not jobs.cancel_job(job_id):
+        return jsonify({"success": False, "error": f"Job {job_id} is not running"}), 404
+    print(f"🛑 Cancellation requested for {job_id}")
+    return jsonify({"success": True, "job_id": job_id, "message": "Cancellation requested"}), 202
+
+
+# --- Single-flight execution ---
+# input revision -> _Flight for every /execute run in progress; identical requests join it
+_flights = {}
+_flights_lock = threading.Lock()
+
+# A joined run that has not landed within its time limit plus this margin (queueing,
+# storing results) is left behind and the request packs on its own; runs without a
+# time limit are waited for at most PACKING_FLIGHT_WAIT_S
+FLIGHT_WAIT_MARGIN_S = float(os.getenv('PACKING_FLIGHT_MARGIN_S') or 10)
+FLIGHT_MAX_WAIT_S = float(os.getenv('PACKING_FLIGHT_WAIT_S') or 120)
+
+
+class _Flight:
+    """One in-progress /execute computation and, once landed, its response"""
+
+    def __init__(self):
+        self.landed = threading.Event()
+        self.response = None  # (body, status, headers)
+
+
+# Item dims and zone bounds are compared to a thousandth of a unit (a micrometre):
+# float noise does not split flights, any real edit does
+_DIGEST_UNIT_SCALE = 1000
+
+
+def _input_revision(mode, options, time_limit_s, packed_zones, job_id=None, priority='interactive'):
+    """
+    Fingerprint of everything an /execute run depends on: engine selection and, per zone,
+    the zone and its items (fixedpoint.input_digest of the packer's own Items and bounds).
+    The requested job_id and priority are part of it, so only callers asking for the
+    same job (or all leaving job_id out) share one run and its stored results.
+    """
+    import hashlib
+    from src.py_packer_v2.main import build_items, parse_container_bounds
+    from src.py_packer_v2.fixedpoint import input_digest
+    
+    zones = [
+        (zone['id'], zone['label'], _zone_options(zone, mode, options),
+         input_digest(build_items(zone_items), parse_container_bounds(_zone_container(zone)), _DIGEST_UNIT_SCALE))
+        for zone, zone_items in packed_zones
+    ]
+    payload = json.dumps([mode, options, time_limit_s, zones, job_id, priority], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _flight_wait_s(time_limit_s):
+    """How long a duplicate request waits for the run it joined"""
+    if time_limit_s is None:
+        return FLIGHT_MAX_WAIT_S
+    return time_limit_s + FLIGHT_WAIT_MARGIN_S
+
+
+def _join_flight(revision):
+    """Returns (flight, leader): the caller computes when leader, else waits for flight.landed"""
+    with _flights_lock:
+        flight = _flights.get(revision)
+        # Joining a running identical job counts as a hit of the single-flight cache
+        record_cache('packing_single_flight', flight is not None)
+        if flight is not None:
+            return flight, False
+        flight = _flights[revision] = _Flight()
+        return flight, True
+
+
+def _land_flight(revision, flight, response):
+    """Publish the leader's response to every waiting caller and close the flight"""
+    with _flights_lock:
+        _flights.pop(revision, None)
+    flight.response = response
+    flight.landed.set()
+
+
 @sequence_api_blueprint.route('/execute', methods=['POST'])
 def execute_packing():
     """
     Executes the packing algorithm for ALL assigned zones and stores results in the database.
-    Each zone with assigned groups will be packed separately.
+    Each zone with assigned groups will be packed separately; with several pool
+    workers (PACKING_WORKERS) zones are packed in parallel.
+    Optional body: { "mode": "grid" | "heightmap" | "weighted" | "optimize" | "sequence" | "ems" | "multistart",
+                     "options": { "resolution": 10 },
+                     "time_limit_ms": 5000, "job_id": "my_job", "priority": "interactive" | "batch" }
+    time_limit_ms bounds the whole job (all zones); the job can also be stopped via
+    POST /jobs/<job_id>/cancel. Either way the partial result is stored with truncated=true.
+    Runs wait for a packing slot (see admission.py); a full queue answers 429 with Retry-After.
+    Requests arriving while an identical one (same options, zone/item data, job_id and
+    priority) is running share its computation and response, including its job_id (the one
+    generated for requests without a job_id, too), and are marked coalesced=true. Waiting
+    takes no packing slot; if the run has not finished within its time limit plus
+    FLIGHT_WAIT_MARGIN_S, the request packs on its own, through admission control.
     """
-    import time
-    
     conn = None
     try:
-        conn = get_db_connection()
+        data = request.get_json(silent=True) or {}
+        try:
+            mode, options = _packing_mode_args(data)
+            time_limit_s = _time_limit_s(data)
+            priority = _priority(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "error": "Invalid packing options", "details": str(e)}), 400
         
-        # 1. Fetch all groups and items
-        groups_data = [dict(row) for row in conn.execute('SELECT * FROM groups').fetchall()]
-        all_items = [dict(row) for row in conn.execute('SELECT * FROM items ORDER BY item_order').fetchall()]
+        conn = get_db_connection()
         
-        # 2. Find all zones that have assigned groups
-        assigned_zones = conn.execute('''
-            SELECT DISTINCT z.id, z.label, z.length, z.width, z.height
-            FROM zones z
-            INNER JOIN zone_assignments za ON z.id = za.zone_id
-        ''').fetchall()
+        # 1-2. Fetch groups, the zones with assigned groups and their items
+        groups_data, zones = _load_zone_jobs(conn)
         
-        if not assigned_zones:
+        if not zones:
             return jsonify({
                 "success": False,
                 "error": "No zones with assigned groups found"
             }), 400
         
-        # 3. Generate a shared job_id for this batch
-        job_id = f"job_{int(time.time())}"
+        packed_zones = list(_iter_zone_items(conn, [zone for zone in zones if zone['item_count']]))  # Skip zones with no items
         
-        # 4. Execute packing for each zone
-        from src.py_packer_v2.main import execute_packing as run_packing
+        # 3. Join an identical run already in flight instead of packing again
+        requested_job_id = data.get('job_id')
+        revision = _input_revision(mode, options, time_limit_s, packed_zones, requested_job_id, priority)
+        flight, leader = _join_flight(revision)
+        if not leader:
+            conn.close()
+            conn = None
+            print(f"🔗 Joining in-flight packing run {revision[:12]}")
+            if flight.landed.wait(_flight_wait_s(time_limit_s)):
+                body, status, headers = flight.response
+                return jsonify({**body, "coalesced": True}), status, headers
+            print(f"⌛ In-flight packing run {revision[:12]} did not finish in time; packing separately")
+            conn = get_db_connection()
+        
+        response = ({"success": False, "error": "Packing execution failed"}, 500, {})
+        try:
+            with packing_admission.slot(priority):
+                body, status = _run_zones(conn, requested_job_id, mode, options, time_limit_s,
+                                          groups_data, packed_zones)
+            response = (body, status, {})
+        except AdmissionRejected as e:
+            response = _queue_full(e)
+        except Exception as e:
+            response = ({"success": False, "error": "Packing execution failed", "details": str(e)}, 500, {})
+            raise
+        finally:
+            if leader:
+                _land_flight(revision, flight, response)
+        
+        body, status, headers = response
+        return jsonify(body), status, headers
+        
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"Packing execution error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": "Packing execution failed", "details": str(e)}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
+def _run_zones(conn, requested_job_id, mode, options, time_limit_s, groups_data, packed_zones):
+    """Pack and store every zone of one /execute run; returns (response body, status)"""
+    # Register a shared job_id (and its cancellation token) for this batch
+    try:
+        job_id, cancel_token = jobs.start_job(requested_job_id, time_limit_s)
+    except KeyError:
+        return {"success": False, "error": f"Job {requested_job_id} is already running"}, 409
+    
+    try:
+        # Execute packing for each zone (zones run in parallel when the pool has several workers)
+        from src.py_packer_v2.main import execute_packing_zones
+        
+        for zone, zone_items in packed_zones:
+            print(f"📦 Packing zone {zone['label']}: {len(zone_items)} items, bounds={_zone_container(zone)['parameters']}")
+        
+        results = execute_packing_zones(
+            [
+                {'items': zone_items, 'container': _zone_container(zone), 'options': _zone_options(zone, mode, options)}
+                for zone, zone_items in packed_zones
+            ],
+            groups_data, mode=mode, cancel_token=cancel_token
+        )
         
         all_results = []
         total_packed = 0
@@ -123,60 +573,16 @@ def execute_packing():
         
         cursor = conn.cursor()
         
-        for zone_row in assigned_zones:
-            zone = dict(zone_row)
-            zone_id = zone['id']
-            zone_label = zone['label']
-            
-            # Get groups assigned to this zone
-            assigned_group_ids = conn.execute(
-                'SELECT group_id FROM zone_assignments WHERE zone_id = ?',
-                (zone_id,)
-            ).fetchall()
-            assigned_group_ids = [row['group_id'] for row in assigned_group_ids]
-            
-            # Filter items belonging to these groups
-            zone_items = [item for item in all_items if item['group_id'] in assigned_group_ids]
-            
-            if not zone_items:
-                continue  # Skip zones with no items
-            
-            # Create container data using zone dimensions
-            zone_container = {
-                'parameters': {
-                    'widthX': zone['length'],
-                    'heightY': zone['height'],
-                    'depthZ': zone['width']
-                }
-            }
-            
-            print(f"📦 Packing zone {zone_label}: {len(zone_items)} items, bounds={zone_container['parameters']}")
-            
-            # Execute packing for this zone
-            result = run_packing(zone_items, groups_data, zone_container)
+        for (zone, _), result in zip(packed_zones, results):
+            record_packing(zone['label'], result['execution_time_ms'] / 1000)
             
             # Add zone info to result
-            result['zone_id'] = zone_id
-            result['zone_label'] = zone_label
+            result['zone_id'] = zone['id']
+            result['zone_label'] = zone['label']
             result['job_id'] = job_id  # Use shared job_id
             
             # Store result in database
-            cursor.execute("""
-                INSERT INTO packing_results 
-                (job_id, zone_id, zone_label, result_json, success, message, packed_count, unpacked_count, volume_utilization, execution_time_ms)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                job_id,
-                zone_id,
-                zone_label,
-                json.dumps(result),
-                result['success'],
-                result['message'],
-                result['packed_count'],
-                result['unpacked_count'],
-                result['volume_utilization'],
-                result['execution_time_ms']
-            ))
+            _store_zone_result(cursor, job_id, result)
             
             all_results.append(result)
             total_packed += result['packed_count']
@@ -185,21 +591,238 @@ def execute_packing():
         
         conn.commit()
         
-        # 5. Return summary response
-        return jsonify({
+        # Summary response
+        return {
             "success": True,
             "job_id": job_id,
             "zones_packed": len(all_results),
             "packed_count": total_packed,
             "unpacked_count": total_unpacked,
             "execution_time_ms": total_execution_time,
-            "message": f"Successfully packed {len(all_results)} zones"
-        }), 200
+            "truncated": cancel_token.truncated,
+            "truncated_reason": cancel_token.reason,
+            "message": f"Successfully packed {len(all_results)} zones" if not cancel_token.truncated
+                       else f"Packing stopped early ({cancel_token.reason}); partial results stored for {len(all_results)} zones"
+        }, 200
+    finally:
+        jobs.finish_job(job_id)
+
+
+def _sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@sequence_api_blueprint.route('/stream', methods=['GET'])
+def stream_packing():
+    """
+    Executes packing for ALL assigned zones and streams placements as server-sent events.
+    Query params: batch_size (placements per event, default 50), mode, resolution, min_support,
+    time_limit_ms, job_id, priority. The job can be stopped via POST /jobs/<job_id>/cancel.
+    Events: job_start, zone_start, placements, zone_complete, done, error.
+    Results are stored in packing_results exactly like /execute.
+    The stream starts once a packing slot is free; a full queue answers 429 with Retry-After.
+    """
+    import time
+    from flask import Response, stream_with_context
+    from src.py_packer_v2.main import stream_packing as run_stream
+    
+    batch_size = request.args.get('batch_size', default=50, type=int)
+    try:
+        mode, options = _packing_mode_args(request.args)
+        time_limit_s = _time_limit_s(request.args)
+        priority = _priority(request.args)
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": "Invalid packing options", "details": str(e)}), 400
+    requested_job_id = request.args.get('job_id')
+    
+    slot = packing_admission.slot(priority)
+    try:
+        slot.acquire()
+    except AdmissionRejected as e:
+        body, status, headers = _queue_full(e)
+        return jsonify(body), status, headers
+    
+    def generate():
+        conn = None
+        job_id = None
+        try:
+            conn = get_db_connection()
+            groups_data, zones = _load_zone_jobs(conn)
+            
+            if not zones:
+                yield _sse_event('error', {"error": "No zones with assigned groups found"})
+                return
+            
+            try:
+                job_id, cancel_token = jobs.start_job(requested_job_id, time_limit_s)
+            except KeyError:
+                yield _sse_event('error', {"error": f"Job {requested_job_id} is already running"})
+                return
+            zones = [zone for zone in zones if zone['item_count']]  # Skip zones with no items
+            yield _sse_event('job_start', {"job_id": job_id, "zones": len(zones)})
+            
+            cursor = conn.cursor()
+            zones_packed = 0
+            total_packed = 0
+            total_unpacked = 0
+            
+            # Each zone's items are read from the join only when that zone is packed
+            for zone, zone_items in _iter_zone_items(conn, zones):
+                zone_container = _zone_container(zone)
+                yield _sse_event('zone_start', {
+                    "zone_id": zone['id'],
+                    "zone_label": zone['label'],
+                    "item_count": len(zone_items),
+                    "x": zone['x'],
+                    "y": zone['y'],
+                    "container": zone_container['parameters']
+                })
+                
+                zone_start = time.perf_counter()
+                for event in run_stream(zone_items, groups_data, zone_container, batch_size,
+                                        mode, _zone_options(zone, mode, options), cancel_token):
+                    if event['type'] == 'placements':
+                        yield _sse_event('placements', {"zone_id": zone['id'], "items": event['items']})
+                        continue
+                    
+                    result = event['result']
+                    result['zone_id'] = zone['id']
+                    result['zone_label'] = zone['label']
+                    result['job_id'] = job_id
+                    _store_zone_result(cursor, job_id, result)
+                    conn.commit()
+                    zones_packed += 1
+                    total_packed += result['packed_count']
+                    total_unpacked += result['unpacked_count']
+                    yield _sse_event('zone_complete', {
+                        "zone_id": zone['id'],
+                        "packed_count": result['packed_count'],
+                        "unpacked_count": result['unpacked_count'],
+                        "volume_utilization": result['volume_utilization'],
+                        "execution_time_ms": result['execution_time_ms'],
+                        "truncated": result['truncated'],
+                        "bounds": result['bounds'],
+                        "stats": result['stats']
+                    })
+                record_packing(zone['label'], time.perf_counter() - zone_start)
+            
+            yield _sse_event('done', {
+                "job_id": job_id,
+                "zones_packed": zones_packed,
+                "packed_count": total_packed,
+                "unpacked_count": total_unpacked,
+                "truncated": cancel_token.truncated,
+                "truncated_reason": cancel_token.reason
+            })
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            print(f"Packing stream error: {e}")
+            yield _sse_event('error', {"error": "Packing execution failed", "details": str(e)})
+        finally:
+            # Also reached when the client disconnects mid-stream
+            if job_id:
+                jobs.finish_job(job_id)
+            if conn:
+                conn.close()
+            slot.release()
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(slot.release)  # Also frees the slot if the stream never started
+    return response
+
+
+def _load_manifest(conn, data):
+    """Items to pack: body 'items' (inline manifest) or DB items, optionally filtered by 'group_ids'"""
+    if data.get('items'):
+        manifest = []
+        for index, item in enumerate(data['items']):
+            manifest.append({
+                'id': item.get('id', item.get('item_id', index)),
+                'group_id': item.get('group_id', 0),
+                'length': item['length'],
+                'width': item['width'],
+                'height': item['height'],
+                'weight': item.get('weight', 0),
+                'max_load': item.get('max_load'),
+                'item_order': item.get('item_order', index)
+            })
+        return manifest
+    
+    group_ids = data.get('group_ids')
+    if group_ids:
+        placeholders = ','.join('?' * len(group_ids))
+        rows = conn.execute(
+            f'SELECT * FROM items WHERE group_id IN ({placeholders}) ORDER BY item_order',
+            [int(g) for g in group_ids]
+        ).fetchall()
+    else:
+        rows = conn.execute('SELECT * FROM items ORDER BY item_order').fetchall()
+    return [dict(row) for row in rows]
+
+
+@sequence_api_blueprint.route('/multi-bin', methods=['POST'])
+def execute_multibin_packing():
+    """
+    Packs a manifest into as many containers as needed in one run.
+    Body (all optional): {
+        "catalog": [container definitions, e.g. src/container_config.json],  # default: latest saved container
+        "items": [{ "length", "width", "height", "weight" }, ...],           # default: DB items
+        "group_ids": [1, 2],                                                  # optional DB filter
+        "max_bins": 50,
+        "mode": "heightmap" | "weighted",
+        "options": { "resolution": 10 },
+        "time_limit_ms": 5000,                                                # optional; partial result is truncated
+        "priority": "batch" | "interactive"                                   # admission priority, default batch
+    }
+    Results are returned directly and not stored in packing_results.
+    A full packing queue answers 429 with Retry-After.
+    """
+    from src.py_packer_v2.main import execute_multibin_packing as run_multibin
+    from src.py_packer_v2.cancellation import CancellationToken
+    
+    data = request.get_json(silent=True) or {}
+    conn = None
+    try:
+        conn = get_db_connection()
+        
+        catalog = data.get('catalog')
+        if not catalog:
+            container_row = conn.execute('SELECT parameters FROM containers ORDER BY id DESC LIMIT 1').fetchone()
+            if not container_row:
+                return jsonify({"success": False, "error": "No catalog given and no container saved"}), 400
+            catalog = [{'id': 'saved', 'parameters': json.loads(container_row['parameters'])}]
+        if not isinstance(catalog, list):
+            return jsonify({"success": False, "error": "'catalog' must be a list of container definitions"}), 400
+        
+        items = _load_manifest(conn, data)
         
+        if not items:
+            return jsonify({"success": False, "error": "No items to pack"}), 400
+        
+        time_limit_s = _time_limit_s(data)
+        with packing_admission.slot(_priority(data, default='batch')):
+            result = run_multibin(
+                items, catalog,
+                max_bins=int(data.get('max_bins', 50)),
+                mode=data.get('mode') or 'heightmap',
+                options=data.get('options') or {},
+                cancel_token=CancellationToken(time_limit_s) if time_limit_s is not None else None
+            )
+        return jsonify(result), 200
+    
+    except AdmissionRejected as e:
+        body, status, headers = _queue_full(e)
+        return jsonify(body), status, headers
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": "Invalid multi-bin request", "details": str(e)}), 400
     except Exception as e:
-        if conn:
-            conn.rollback()
-        print(f"Packing execution error: {e}")
+        print(f"Multi-bin packing error: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"success": False, "error": "Packing execution failed", "details": str(e)}), 500
@@ -208,16 +831,78 @@ def execute_packing():
             conn.close()
 
 
+@sequence_api_blueprint.route('/container-selection', methods=['POST'])
+def select_container_type():
+    """
+    Compares candidate container types for one manifest, evaluated in parallel.
+    Body: {
+        "candidates": [container definitions, same shape as src/container_config.json],
+        "items": [{ "length", "width", "height", "weight" }, ...],   # optional, default: DB items
+        "group_ids": [1, 2],                                         # optional DB filter
+        "max_bins": 50, "mode": "heightmap" | "weighted", "options": { ... },
+        "time_limit_ms": 5000,                                       # optional, per candidate
+        "priority": "batch" | "interactive"                          # admission priority, default batch
+    }
+    Returns containers needed and utilization per type plus a recommendation.
+    A full packing queue answers 429 with Retry-After.
+    """
+    from src.py_packer_v2.main import evaluate_container_catalog
+    
+    data = request.get_json(silent=True) or {}
+    candidates = data.get('candidates')
+    if not isinstance(candidates, list) or not candidates:
+        return jsonify({"success": False, "error": "'candidates' must be a non-empty list of container definitions"}), 400
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        items = _load_manifest(conn, data)
+        conn.close()
+        conn = None
+        
+        if not items:
+            return jsonify({"success": False, "error": "No items to pack"}), 400
+        
+        with packing_admission.slot(_priority(data, default='batch')):
+            result = evaluate_container_catalog(
+                items, candidates,
+                max_bins=int(data.get('max_bins', 50)),
+                mode=data.get('mode') or 'heightmap',
+                options=data.get('options') or {},
+                time_limit_s=_time_limit_s(data)
+            )
+        return jsonify(result), 200
+    
+    except AdmissionRejected as e:
+        body, status, headers = _queue_full(e)
+        return jsonify(body), status, headers
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": "Invalid container selection request", "details": str(e)}), 400
+    except Exception as e:
+        print(f"Container selection error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": "Container selection failed", "details": str(e)}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
 @sequence_api_blueprint.route('/latest-result', methods=['GET'])
 def get_latest_result():
     """
     Retrieves the latest packing results for ALL zones from the database.
     Returns a list of space results that can be switched in the frontend.
+    Answers 304 when If-None-Match matches (no result, zone or container change since).
     """
     conn = None
     try:
         conn = get_db_connection()
         
+        etag, not_modified = conditional_get(conn, ('packing_results', 'zones', 'containers'))
+        if not_modified:
+            return not_modified
+        
         # 1. Find the latest job_id
         latest_job = conn.execute('''
             SELECT job_id FROM packing_results 
@@ -226,14 +911,14 @@ def get_latest_result():
         
         if not latest_job:
             # 返回空的 mock 數據
-            return jsonify({
+            return with_etag(jsonify({
                 "job_id": None,
                 "success": False,
                 "message": "尚未執行過打包任務",
                 "spaces": [],
                 "total_packed": 0,
                 "total_unpacked": 0
-            }), 200
+            }), etag), 200
         
         job_id = latest_job['job_id']
         
@@ -285,13 +970,7 @@ def get_latest_result():
         container_row = conn.execute('SELECT * FROM containers ORDER BY id DESC LIMIT 1').fetchone()
         container_data = None
         if container_row:
-            params = json.loads(container_row['parameters'])
-            container_data = params
-            # DEBUG: Log container configuration
-            print(f"[sequence.py] Container ID: {container_row['id']}")
-            print(f"[sequence.py] Raw parameters: {container_row['parameters'][:200]}...")
-            print(f"[sequence.py] Parsed shape: {params.get('shape', 'NOT FOUND')}")
-            print(f"[sequence.py] Container keys: {list(params.keys())}")
+            container_data = json.loads(container_row['parameters'])
         
         # Fetch all zones for visualization
         zones_rows = conn.execute('SELECT * FROM zones').fetchall()
@@ -309,7 +988,7 @@ def get_latest_result():
             })
         
         # 4. Return combined response
-        return jsonify({
+        return with_etag(jsonify({
             "job_id": job_id,
             "success": True,
             "message": f"載入 {len(spaces)} 個空間的打包結果",
@@ -319,7 +998,7 @@ def get_latest_result():
             "total_packed": total_packed,
             "total_unpacked": total_unpacked,
             "total_execution_time": total_execution_time
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         print(f"Error fetching latest result: {e}")
@@ -0,0 +1,103 @@
+"""
+Production server entry point
+Serves the Flask app with several worker processes, each handling requests on a
+thread pool, all accepting on one listening socket. The app (and the schema
+migration in init_db) is loaded once in the parent and the workers are forked
+from it; they share the SQLite session DB, whose writes are serialized by
+SQLite's write lock (WAL + BEGIN IMMEDIATE + busy timeout, see db_config).
+
+Usage: python -m src.api_server_v2.serve [--workers N] [--threads T] [--bind HOST:PORT]
+Uses gunicorn when available; elsewhere (e.g. Windows) it falls back to a single
+multi-threaded Werkzeug process.
+"""
+import argparse
+import os
+
+
+def parse_args():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="3D Packing API production server")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SERVER_WORKERS') or cpus),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SERVER_THREADS') or 4),
+                        help="request threads per worker (default 4)")
+    parser.add_argument('--bind', default=os.getenv('SERVER_BIND') or f"0.0.0.0:{os.getenv('BACKEND_PORT') or 8888}",
+                        help="HOST:PORT to listen on (default 0.0.0.0:8888)")
+    parser.add_argument('--timeout', type=int, default=int(os.getenv('SERVER_TIMEOUT') or 300),
+                        help="seconds before a silent worker is restarted (packing runs can be long)")
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+    args.threads = max(1, args.threads)
+    return args
+
+
+def share_packing_cores(workers):
+    """
+    Every server worker gets its own packing process pool; unless configured,
+    size them so that together they use about one process per core.
+    Must run before the app (and the admission limits) are imported.
+    """
+    if not os.getenv('PACKING_WORKERS'):
+        os.environ['PACKING_WORKERS'] = str(max(1, (os.cpu_count() or 1) // workers))
+
+
+def serve_gunicorn(app, args):
+    from gunicorn.app.base import BaseApplication
+
+    class PackingServer(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    PackingServer(app, {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': 30,
+        'accesslog': '-',
+    }).run()
+
+
+def serve_werkzeug(app, args):
+    from werkzeug.serving import run_simple
+
+    host, _, port = args.bind.rpartition(':')
+    print("⚠️  gunicorn not available - serving with one multi-threaded process")
+    run_simple(host or '0.0.0.0', int(port), app, threaded=True, use_reloader=False, use_debugger=False)
+
+
+def main():
+    args = parse_args()
+    try:
+        import gunicorn  # noqa: F401
+        use_gunicorn = True
+    except ImportError:
+        use_gunicorn = False
+    if use_gunicorn:
+        share_packing_cores(args.workers)
+
+    # Loaded once here; gunicorn forks the workers from this process
+    from src.api_server_v2.app import app
+
+    print(f"🚀 Production server on http://{args.bind}")
+    if use_gunicorn:
+        print(f"   Workers: {args.workers} × {args.threads} threads (PACKING_WORKERS={os.environ['PACKING_WORKERS']})")
+        print("=" * 60 + "\n")
+        serve_gunicorn(app, args)
+    else:
+        serve_werkzeug(app, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ export const AssignSequencePage = {
   groups: [],
   currentZoneId: null,
   draggedItemIndex: null,
+  savedOrder: new Map(),
 
   async init() {
     console.log('AssignSequencePage init');
@@ -129,6 +130,9 @@ export const AssignSequencePage = {
             `;
     }).join('');
 
+    // Remember the persisted order so drags only send moved items
+    this.savedOrder = new Map(items.map(item => [item.id, item.item_order || 0]));
+
     // Add drag-drop event listeners
     this.attachDragListeners();
   },
@@ -196,10 +200,13 @@ export const AssignSequencePage = {
 
   async updateItemOrder() {
     const sortedItems = [...this.itemsContainer.querySelectorAll('.sortable-item')];
-    const updates = sortedItems.map((item, index) => ({
-      id: parseInt(item.dataset.itemId),
-      item_order: index
-    }));
+    // Delta mode: only send items whose position actually changed
+    const updates = sortedItems
+      .map((item, index) => ({
+        id: parseInt(item.dataset.itemId),
+        item_order: index
+      }))
+      .filter(update => this.savedOrder.get(update.id) !== update.item_order);
 
     // Update UI immediately
     sortedItems.forEach((item, index) => {
@@ -208,6 +215,8 @@ export const AssignSequencePage = {
       item.dataset.index = index;
     });
 
+    if (updates.length === 0) return;
+
     // Save to database
     try {
       const response = await fetch(`${this.API_BASE}/items/reorder`, {
@@ -220,7 +229,8 @@ export const AssignSequencePage = {
         throw new Error('Failed to save order');
       }
 
-      console.log('Item order saved successfully');
+      updates.forEach(update => this.savedOrder.set(update.id, update.item_order));
+      console.log(`Item order saved successfully (${updates.length} moved)`);
 
     } catch (error) {
       console.error('Failed to save order:', error);
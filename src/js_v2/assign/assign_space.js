@@ -5,8 +5,10 @@ export const AssignSpacePage = {
 
   state: {
     groups: [],
+    groupAggregates: {}, // group_id -> { item_count, total_volume, total_weight }
     zones: [],
     assignments: {}, // zone_id -> array of group_ids
+    feasibility: {}, // zone_id -> pre-check result from /sequence/feasibility
     draggedGroupId: null
   },
 
@@ -29,6 +31,7 @@ export const AssignSpacePage = {
 
     // Load data
     await this.loadGroups();
+    await this.loadGroupAggregates();
     await this.loadZones();
 
     this.render();
@@ -53,6 +56,20 @@ export const AssignSpacePage = {
     }
   },
 
+  async loadGroupAggregates() {
+    try {
+      const response = await fetch(`${this.API_BASE}/groups/aggregates`);
+      if (!response.ok) {
+        throw new Error('Failed to load group aggregates');
+      }
+      const aggregates = await response.json();
+      this.state.groupAggregates = Object.fromEntries(aggregates.map(a => [a.group_id, a]));
+    } catch (error) {
+      console.error('Error loading group aggregates:', error);
+      this.state.groupAggregates = {};
+    }
+  },
+
   async loadZones() {
     try {
       const response = await fetch(`${this.API_BASE}/zones`);
@@ -81,6 +98,41 @@ export const AssignSpacePage = {
     this.renderGroups();
   },
 
+  // Pre-check the current (unsaved) assignments; re-renders the zones when the answer arrives
+  async checkFeasibility() {
+    try {
+      const response = await fetch(`${this.API_BASE}/sequence/feasibility`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ assignments: this.state.assignments })
+      });
+      if (!response.ok) {
+        throw new Error('Failed to check feasibility');
+      }
+      const result = await response.json();
+      this.state.feasibility = Object.fromEntries(result.zones.map(z => [z.zone_id, z]));
+    } catch (error) {
+      console.error('Error checking feasibility:', error);
+      this.state.feasibility = {};
+    }
+    this.renderZones();
+  },
+
+  feasibilityHTML(zoneId) {
+    const check = this.state.feasibility[zoneId];
+    if (!check || check.group_count === 0) {
+      return '';
+    }
+    const labels = { volume: '體積超過', weight: '重量超過', oversized_items: `${check.oversized_count} 個物件放不下` };
+    const text = check.possible
+      ? `✅ 使用率 ${(check.volume_ratio * 100).toFixed(1)}%`
+      : `⚠️ ${check.reasons.map(r => labels[r] || r).join('、')}`;
+    return `
+            <div class="zone-stat">
+              <span>${text}</span>
+            </div>`;
+  },
+
   renderZones() {
     if (this.state.zones.length === 0) {
       this.zonesList.innerHTML = `
@@ -133,7 +185,7 @@ export const AssignSpacePage = {
             <div class="zone-stat">
               <span>👥</span>
               <span>已分配: ${assignedGroups.length}</span>
-            </div>
+            </div>${this.feasibilityHTML(zone.id)}
           </div>
         </div>
         <div class="zone-content" data-zone-id="${zone.id}">
@@ -182,8 +234,8 @@ export const AssignSpacePage = {
       groupCard.draggable = !isAssigned;
       groupCard.dataset.groupId = group.id;
 
-      // Count items in this group (would need API call in real implementation)
-      const itemCount = '?'; // Placeholder
+      const aggregate = this.state.groupAggregates[group.id];
+      const itemCount = aggregate ? aggregate.item_count : '?';
 
       groupCard.innerHTML = `
         <div class="group-name">${group.name}</div>
@@ -250,6 +302,7 @@ export const AssignSpacePage = {
 
     console.log('Assigned group', groupId, 'to zone', zoneId);
     this.render();
+    this.checkFeasibility();
   },
 
   unassignGroup(groupId, zoneId) {
@@ -257,6 +310,7 @@ export const AssignSpacePage = {
       this.state.assignments[zoneId] = this.state.assignments[zoneId].filter(id => id !== groupId);
       console.log('Unassigned group', groupId, 'from zone', zoneId);
       this.render();
+      this.checkFeasibility();
     }
   },
 
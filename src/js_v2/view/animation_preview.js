@@ -39,8 +39,13 @@ class AnimationPreview {
     // Setup event listeners
     this.setupEventListeners();
 
-    // Load packing data
-    await this.loadPackingData();
+    // Load packing data (?stream=1 packs live and renders as placements arrive)
+    const params = new URLSearchParams(window.location.search);
+    if (params.get('stream') === '1') {
+      await this.streamPackingData();
+    } else {
+      await this.loadPackingData();
+    }
 
     console.log('[AnimationPreview] Initialization complete');
   }
@@ -241,6 +246,66 @@ class AnimationPreview {
     }
   }
 
+  /**
+   * Runs packing through the SSE endpoint and feeds each placement batch
+   * straight into the viewer, so the first boxes appear before packing ends.
+   */
+  async streamPackingData() {
+    let container = {};
+    try {
+      const response = await fetch(`${this.API_BASE}/containers/latest`);
+      if (response.ok) {
+        const containerRow = await response.json();
+        container = containerRow.parameters || {};
+      }
+    } catch (error) {
+      console.warn('Container config unavailable, streaming without it:', error);
+    }
+
+    this.packingData = { container, zones: [], items: [], totalItems: 0, utilization: 0 };
+    if (this.viewer) this.viewer.loadAnimation(this.packingData);
+
+    const zoneOffsets = new Map();
+    const source = new EventSource(`${this.API_BASE}/sequence/stream?batch_size=50`);
+
+    source.addEventListener('zone_start', (e) => {
+      const zone = JSON.parse(e.data);
+      zoneOffsets.set(zone.zone_id, { x: zone.x || 0, y: zone.y || 0 });
+    });
+
+    source.addEventListener('placements', (e) => {
+      const batch = JSON.parse(e.data);
+      const zoneOffset = zoneOffsets.get(batch.zone_id) || { x: 0, y: 0 };
+      const items = batch.items.map(item => ({ ...item, zoneOffset }));
+      this.packingData.items.push(...items);
+      this.packingData.totalItems = this.packingData.items.length;
+      if (this.viewer) this.viewer.appendSteps(items);
+    });
+
+    source.addEventListener('zone_complete', (e) => {
+      const summary = JSON.parse(e.data);
+      if (!this.packingData.utilization) {
+        this.packingData.utilization = summary.volume_utilization || 0;
+      }
+      this.updateUI();
+    });
+
+    source.addEventListener('done', (e) => {
+      console.log('Packing stream complete:', JSON.parse(e.data));
+      source.close();
+      this.updateUI();
+    });
+
+    source.addEventListener('error', (e) => {
+      // Server-side errors carry a payload; transport errors do not
+      if (e.data) {
+        console.error('Packing stream error:', JSON.parse(e.data));
+        this.showError('打包串流失敗');
+      }
+      source.close();
+    });
+  }
+
   processPackingData(data) {
     // Collect all packed items from all spaces
     let allItems = [];
@@ -311,6 +311,34 @@ export class NewAnimationViewer {
     this.fitCamera(data.container);
   }
 
+  /**
+   * Appends newly streamed placements as additional steps.
+   * Steps already shown are kept; the scene renders new items immediately
+   * when `renderNow` is set (live streaming view).
+   */
+  appendSteps(items, renderNow = true) {
+    const startIndex = this.animationSteps.length;
+    items.forEach((item, offset) => {
+      this.animationSteps.push({
+        stepNumber: startIndex + offset + 1,
+        item: item,
+        position: this.calculatePosition(item),
+        size: this.calculateSize(item)
+      });
+    });
+    this.totalSteps = this.animationSteps.length;
+
+    if (renderNow && !this.isPlaying && this.currentStep === startIndex) {
+      for (let i = startIndex; i < this.totalSteps; i++) {
+        this.renderItemInstant(i);
+      }
+      this.currentStep = this.totalSteps;
+      this.requestRender();
+    }
+
+    this.emit('stepChange', { step: this.currentStep, total: this.totalSteps });
+  }
+
   calculatePosition(item) {
     if (!item.pose) return { x: 0, y: 0, z: 0 };
     const { min, max } = item.pose;
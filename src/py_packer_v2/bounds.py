@@ -0,0 +1,123 @@
+"""
+Lower bounds for container packing.
+L0 is the continuous volume bound; L1/L2 are the Martello-Pisinger-Vigo bounds
+for 3D bin packing. Items rotatable around Y are handled conservatively: an item
+only counts as "large" if it is large in every allowed orientation, which keeps
+every bound valid for the rotated instance.
+"""
+import math
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .types import Item, Box3
+from .utils import get_box_dims, EPS
+
+# Threshold candidates per axis; larger sets are thinned to quantiles
+MAX_THRESHOLDS = 64
+
+# (first footprint axis, second footprint axis, stacking axis) as indices into (x, y, z)
+AXIS_PAIRS = ((0, 1, 2), (0, 2, 1), (1, 2, 0))
+
+
+def _orientation_dims(items: List[Item]) -> np.ndarray:
+    """(n, 2, 3) array of item dims per allowed orientation (non-rotatable items repeat theirs)"""
+    dims = np.array([(i.dims.x, i.dims.y, i.dims.z) for i in items], dtype=np.float64).reshape(-1, 3)
+    rotated = dims[:, [2, 1, 0]]
+    rotatable = np.array([i.rotatable for i in items], dtype=bool)
+    rotated[~rotatable] = dims[~rotatable]
+    return np.stack([dims, rotated], axis=1)
+
+
+def _thresholds(values: np.ndarray, limit: float) -> np.ndarray:
+    """Candidate thresholds: 0 plus item sizes up to `limit`"""
+    candidates = np.unique(np.concatenate([[0.0], values[values <= limit + EPS]]))
+    if len(candidates) > MAX_THRESHOLDS:
+        candidates = np.unique(np.quantile(candidates, np.linspace(0, 1, MAX_THRESHOLDS)))
+    return candidates
+
+
+def _ceil(value: float) -> int:
+    return max(0, int(math.ceil(value - EPS)))
+
+
+def bound_1d(sizes: np.ndarray, capacity: float) -> int:
+    """Martello-Toth L2 bound for one-dimensional bin packing"""
+    sizes = sizes[sizes > EPS]
+    if not len(sizes) or capacity <= EPS:
+        return 0
+    half = capacity / 2
+    p = _thresholds(sizes, half)[:, None]
+    s = sizes[None, :]
+    big = s > capacity - p + EPS
+    medium = ~big & (s > half + EPS)
+    small = (s <= half + EPS) & (s >= p - EPS)
+    slack = medium.sum(axis=1) * capacity - (s * medium).sum(axis=1)
+    excess = ((s * small).sum(axis=1) - slack) / capacity
+    values = big.sum(axis=1) + medium.sum(axis=1) + np.maximum(0, np.ceil(excess - EPS))
+    return int(values.max())
+
+
+def _bound_l1_pair(orientations: np.ndarray, dims: np.ndarray, a: int, b: int, c: int) -> int:
+    """Items large in both a and b can never sit side by side, so they stack along c"""
+    large = ((orientations[:, :, a] > dims[a] / 2 + EPS) & (orientations[:, :, b] > dims[b] / 2 + EPS)).all(axis=1)
+    if not large.any():
+        return 0
+    return bound_1d(orientations[large][:, :, c].min(axis=1), dims[c])
+
+
+def _bound_l2_pair(orientations: np.ndarray, volumes: np.ndarray, dims: np.ndarray,
+                   a: int, b: int, c: int, l1: int) -> int:
+    """MPV L2 for one axis pair: L1 plus the volume of smaller items that cannot fit beside the large ones"""
+    A, B, C = dims[a], dims[b], dims[c]
+    wa, hb = orientations[:, :, a], orientations[:, :, b]
+    depth = orientations[:, :, c].min(axis=1)
+    large = ((wa > A / 2 + EPS) & (hb > B / 2 + EPS)).all(axis=1)
+    qs = _thresholds(hb.min(axis=1), B / 2)[None, None, :]
+    best = l1
+    for p in _thresholds(wa.min(axis=1), A / 2):
+        vertical = ((wa > A - p + EPS)[:, :, None] & (hb[:, :, None] > B - qs + EPS)).all(axis=1)
+        large_only = ~vertical & large[:, None]
+        small = ~(vertical | large_only) & ((wa >= p - EPS)[:, :, None] & (hb[:, :, None] >= qs - EPS)).all(axis=1)
+        free = (C * l1 - (depth[:, None] * vertical).sum(axis=0)) * A * B
+        excess = ((volumes[:, None] * (large_only | small)).sum(axis=0) - free) / (A * B * C)
+        best = max(best, l1 + int(np.maximum(0, np.ceil(excess - EPS)).max()))
+    return best
+
+
+def container_lower_bounds(items: List[Item], container_bounds: Box3) -> Dict[str, Any]:
+    """
+    Lower bounds on the number of containers needed for `items`, plus the
+    packed-volume upper bound for a single container.
+    Items that do not fit an empty container in any orientation are excluded
+    from the bounds and counted as 'oversized'.
+    """
+    size = get_box_dims(container_bounds)
+    dims = np.array([size.x, size.y, size.z], dtype=np.float64)
+    container_volume = float(np.prod(dims))
+    if not items or container_volume <= EPS:
+        return {'l0': 0, 'l1': 0, 'l2': 0, 'containers_lower_bound': 0,
+                'oversized': len(items), 'volume_upper_bound': 0.0}
+
+    orientations = _orientation_dims(items)
+    fits = (orientations <= dims + EPS).all(axis=2).any(axis=1)
+    orientations = orientations[fits]
+    volumes = orientations[:, 0, :].prod(axis=1)
+    total_volume = float(volumes.sum())
+
+    l0 = _ceil(total_volume / container_volume)
+    l1 = 0
+    l2 = 0
+    for a, b, c in AXIS_PAIRS:
+        pair_l1 = _bound_l1_pair(orientations, dims, a, b, c)
+        l1 = max(l1, pair_l1)
+        l2 = max(l2, _bound_l2_pair(orientations, volumes, dims, a, b, c, pair_l1))
+
+    return {
+        'l0': l0,
+        'l1': l1,
+        'l2': l2,
+        'containers_lower_bound': max(l0, l1, l2),
+        'oversized': int((~fits).sum()),
+        'volume_upper_bound': min(container_volume, total_volume)
+    }
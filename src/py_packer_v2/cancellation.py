@@ -0,0 +1,53 @@
+"""
+Cooperative cancellation for packing runs.
+A CancellationToken carries an optional deadline and an explicit cancel flag;
+engines poll it between placements and stop with a valid partial result,
+leaving the token marked as truncated.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class CancellationToken:
+    """Stop signal shared between a running packing job and whoever may cancel it"""
+
+    def __init__(self, time_limit_s: Optional[float] = None):
+        self._event = threading.Event()
+        self.deadline: Optional[float] = None
+        if time_limit_s is not None:
+            self.deadline = time.monotonic() + max(0.0, float(time_limit_s))
+        self.truncated = False
+        self.reason: Optional[str] = None  # 'cancelled' or 'deadline' once truncated
+
+    def cancel(self) -> None:
+        """Request the run to stop at its next check"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None when there is no deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        """True once cancelled or past the deadline; the first hit marks the run truncated"""
+        if self.truncated:
+            return True
+        if self._event.is_set():
+            self.reason = 'cancelled'
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = 'deadline'
+        else:
+            return False
+        self.truncated = True
+        return True
+
+
+def stop_requested(cancel_token: Optional[CancellationToken]) -> bool:
+    """Engine-side check; a missing token never stops"""
+    return cancel_token is not None and cancel_token.expired()
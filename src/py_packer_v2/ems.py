@@ -0,0 +1,216 @@
+"""
+Maximal empty-space (EMS) free-space management.
+Free space in a container is kept as the set of maximal empty cuboids. Each
+placement splits every cuboid it intersects into up to six sub-cuboids, then
+drops sub-cuboids that are contained in another one or too small for any
+remaining item. Cuboids are stored as NumPy arrays ordered by volume, so a
+query only scans spaces at least as large as the item.
+"""
+from typing import Generator, List, Optional, Tuple
+
+import numpy as np
+
+from .types import Item, Box3, Placement
+from .utils import vec3, box3, get_box_volume, EPS
+from .cancellation import CancellationToken, stop_requested
+
+
+class EmptySpaceManager:
+    """Maximal empty cuboids of one container, updated incrementally as boxes are placed"""
+
+    def __init__(self, container_bounds: Box3):
+        self.floor = container_bounds.min.y
+        # float64 throughout: bounds may be given as ints, and int arrays would
+        # truncate the fractional split planes written by place()
+        self.mins = np.array([[container_bounds.min.x, container_bounds.min.y, container_bounds.min.z]], dtype=np.float64)
+        self.maxs = np.array([[container_bounds.max.x, container_bounds.max.y, container_bounds.max.z]], dtype=np.float64)
+        self.volumes = np.prod(self.maxs - self.mins, axis=1)
+        # Placed boxes, used for the support test under a candidate corner
+        self.placed_mins = np.empty((0, 3), dtype=np.float64)
+        self.placed_maxs = np.empty((0, 3), dtype=np.float64)
+        # Spaces with any side below this can hold no remaining item
+        self.min_size = 0.0
+
+    def __len__(self) -> int:
+        return len(self.volumes)
+
+    def _set_spaces(self, mins: np.ndarray, maxs: np.ndarray) -> None:
+        """Store spaces sorted by volume (the index used by find())"""
+        volumes = np.prod(maxs - mins, axis=1)
+        order = np.argsort(volumes, kind='stable')
+        self.mins, self.maxs, self.volumes = mins[order], maxs[order], volumes[order]
+
+    def support(self, corner: np.ndarray, dx: float, dz: float) -> float:
+        """Fraction of a dx*dz footprint at `corner` resting on the floor or on placed tops"""
+        if corner[1] <= self.floor + EPS:
+            return 1.0
+        if not len(self.placed_maxs):
+            return 0.0
+        touching = np.abs(self.placed_maxs[:, 1] - corner[1]) <= EPS
+        if not touching.any():
+            return 0.0
+        lo, hi = self.placed_mins[touching], self.placed_maxs[touching]
+        overlap_x = np.clip(np.minimum(hi[:, 0], corner[0] + dx) - np.maximum(lo[:, 0], corner[0]), 0, None)
+        overlap_z = np.clip(np.minimum(hi[:, 2], corner[2] + dz) - np.maximum(lo[:, 2], corner[2]), 0, None)
+        return float((overlap_x * overlap_z).sum()) / (dx * dz)
+
+    def find(self, dims: Tuple[float, float, float],
+             min_support: float = 0.0) -> Optional[Tuple[int, float]]:
+        """
+        Best space for a box of `dims` placed at the space's min corner.
+        Lowest corner first, then the tightest fit (least spare volume), then back-left.
+        Returns (space index, spare volume) or None.
+        """
+        volume = dims[0] * dims[1] * dims[2]
+        start = int(np.searchsorted(self.volumes, volume - EPS))
+        if start >= len(self.volumes):
+            return None
+        mins, maxs = self.mins[start:], self.maxs[start:]
+        fits = ((maxs - mins) >= np.asarray(dims) - EPS).all(axis=1)
+        candidates = np.nonzero(fits)[0]
+        if not len(candidates):
+            return None
+
+        corners = mins[candidates]
+        spare = self.volumes[start:][candidates] - volume
+        order = np.lexsort((corners[:, 2], corners[:, 0], spare, corners[:, 1]))
+        for k in order:
+            corner = corners[k]
+            support = self.support(corner, dims[0], dims[2])
+            if support <= EPS or support + EPS < min_support:
+                continue
+            return start + int(candidates[k]), float(spare[k])
+        return None
+
+    def place(self, box_min: np.ndarray, box_max: np.ndarray) -> None:
+        """Carve a placed box out of the free space: split intersected spaces, prune the rest"""
+        self.placed_mins = np.vstack([self.placed_mins, box_min])
+        self.placed_maxs = np.vstack([self.placed_maxs, box_max])
+
+        hit = ((self.mins < box_max - EPS) & (self.maxs > box_min + EPS)).all(axis=1)
+        if not hit.any():
+            return
+        keep_mins, keep_maxs = self.mins[~hit], self.maxs[~hit]
+
+        new_mins, new_maxs = [], []
+        for space_min, space_max in zip(self.mins[hit], self.maxs[hit]):
+            for axis in range(3):
+                if box_min[axis] > space_min[axis] + EPS:
+                    upper = space_max.copy()
+                    upper[axis] = box_min[axis]
+                    new_mins.append(space_min)
+                    new_maxs.append(upper)
+                if box_max[axis] < space_max[axis] - EPS:
+                    lower = space_min.copy()
+                    lower[axis] = box_max[axis]
+                    new_mins.append(lower)
+                    new_maxs.append(space_max)
+
+        if new_mins:
+            new_mins, new_maxs = np.array(new_mins, dtype=np.float64), np.array(new_maxs, dtype=np.float64)
+            # Too thin for any remaining item
+            usable = ((new_maxs - new_mins) >= self.min_size - EPS).all(axis=1)
+            new_mins, new_maxs = new_mins[usable], new_maxs[usable]
+        else:
+            new_mins, new_maxs = np.empty((0, 3)), np.empty((0, 3))
+
+        if len(new_mins):
+            # Identical sub-spaces come from neighbouring splits; keep one of each
+            unique = np.unique(np.hstack([new_mins, new_maxs]), axis=0)
+            new_mins, new_maxs = unique[:, :3], unique[:, 3:]
+            # Drop new spaces contained in a kept space or in another new space
+            all_mins = np.vstack([keep_mins, new_mins])
+            all_maxs = np.vstack([keep_maxs, new_maxs])
+            contained = ((all_mins[None, :, :] <= new_mins[:, None, :] + EPS) &
+                         (all_maxs[None, :, :] >= new_maxs[:, None, :] - EPS)).all(axis=2)
+            contained[np.arange(len(new_mins)), len(keep_mins) + np.arange(len(new_mins))] = False
+            dominated = contained.any(axis=1)
+            new_mins, new_maxs = new_mins[~dominated], new_maxs[~dominated]
+
+        self._set_spaces(np.vstack([keep_mins, new_mins]), np.vstack([keep_maxs, new_maxs]))
+
+    def prune(self, min_size: float) -> None:
+        """Raise the minimum usable side and drop spaces below it"""
+        self.min_size = max(self.min_size, min_size)
+        usable = ((self.maxs - self.mins) >= self.min_size - EPS).all(axis=1)
+        if not usable.all():
+            self.mins, self.maxs, self.volumes = self.mins[usable], self.maxs[usable], self.volumes[usable]
+
+
+def iter_pack_items_ems(items: List[Item], container_bounds: Box3,
+                        min_support: float = 0.0,
+                        cancel_token: Optional[CancellationToken] = None) -> Generator[Placement, None, List[str]]:
+    """
+    Maximal empty-space packing that yields each placement as soon as it is made.
+
+    Strategy:
+    1. Sort items by volume (largest first)
+    2. For each item (and its Y-axis rotation if rotatable), pick the lowest,
+       tightest-fitting empty space whose corner is supported from below
+    3. Place the item at that corner and carve it out of the free space
+    4. Drop spaces too small for the smallest remaining item
+
+    Args:
+        items: List of items to pack
+        container_bounds: Container bounding box (Y is up)
+        min_support: Minimum fraction of the footprint resting on the floor or on
+                     item tops (any contact is always required)
+        cancel_token: Optional deadline/cancel signal, checked before each item
+
+    Yields:
+        Placement for every packed item, in placement order
+
+    Returns:
+        List of unplaced item ids (as the generator's StopIteration value)
+    """
+    if not items:
+        return []
+
+    sorted_items = sorted(items, key=lambda i: get_box_volume(box3(vec3(), i.dims)), reverse=True)
+    # Smallest side among items not yet processed, for pruning unusable spaces
+    smallest_remaining = np.minimum.accumulate(
+        np.array([min(i.dims.x, i.dims.y, i.dims.z) for i in sorted_items])[::-1]
+    )[::-1]
+
+    spaces = EmptySpaceManager(container_bounds)
+    unplaced_ids = []
+
+    for position, item in enumerate(sorted_items):
+        if stop_requested(cancel_token):
+            unplaced_ids.extend(i.id for i in sorted_items[position:])
+            break
+        spaces.prune(float(smallest_remaining[position]))
+
+        orientations = [(item.dims.x, item.dims.y, item.dims.z)]
+        if item.rotatable and abs(item.dims.x - item.dims.z) > EPS:
+            orientations.append((item.dims.z, item.dims.y, item.dims.x))
+
+        best = None
+        for dims in orientations:
+            found = spaces.find(dims, min_support)
+            if found is None:
+                continue
+            index, spare = found
+            corner = spaces.mins[index]
+            key = (corner[1], spare, corner[0], corner[2])
+            if best is None or key < best[0]:
+                best = (key, corner.copy(), dims)
+
+        if best is None:
+            unplaced_ids.append(item.id)
+            continue
+
+        _, corner, dims = best
+        box_max = corner + np.asarray(dims)
+        spaces.place(corner, box_max)
+        yield Placement(
+            item_id=item.id,
+            pose=box3(
+                min_vec=vec3(float(corner[0]), float(corner[1]), float(corner[2])),
+                max_vec=vec3(float(box_max[0]), float(box_max[1]), float(box_max[2]))
+            )
+        )
+
+    print(f"EMS packing complete: {len(sorted_items) - len(unplaced_ids)} placed, "
+          f"{len(unplaced_ids)} unplaced ({len(spaces)} free spaces left)")
+    return unplaced_ids
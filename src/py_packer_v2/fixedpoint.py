@@ -0,0 +1,143 @@
+"""
+Integer (fixed-point) coordinates for the packing engines.
+Inputs are converted to integer units at the boundary (millimetres by default,
+the unit of the UI), engines run on exact integers, and placements are
+converted back on output. Item sizes round up and the container rounds down,
+so converted-back placements can never overlap or leave the container.
+"""
+import dataclasses
+import hashlib
+import inspect
+import math
+from typing import Generator, List
+
+import numpy as np
+
+from .types import Item, Box3, Placement
+from .utils import vec3, box3, get_box_volume
+
+# Digits kept before rounding, so 0.3 * 10 becomes 3 and not 4
+ROUND_DIGITS = 6
+
+
+def _up(value: float, unit_scale: int) -> int:
+    return int(math.ceil(round(value * unit_scale, ROUND_DIGITS)))
+
+
+def _down(value: float, unit_scale: int) -> int:
+    return int(math.floor(round(value * unit_scale, ROUND_DIGITS)))
+
+
+def quantize_items(items: List[Item], unit_scale: int = 1) -> List[Item]:
+    """Items with dims rounded up to whole units"""
+    return [
+        dataclasses.replace(item, dims=vec3(_up(item.dims.x, unit_scale),
+                                            _up(item.dims.y, unit_scale),
+                                            _up(item.dims.z, unit_scale)))
+        for item in items
+    ]
+
+
+def quantize_bounds(container_bounds: Box3, unit_scale: int = 1) -> Box3:
+    """Container bounds shrunk to whole units"""
+    low, high = container_bounds.min, container_bounds.max
+    return box3(
+        min_vec=vec3(_up(low.x, unit_scale), _up(low.y, unit_scale), _up(low.z, unit_scale)),
+        max_vec=vec3(_down(high.x, unit_scale), _down(high.y, unit_scale), _down(high.z, unit_scale))
+    )
+
+
+def input_digest(items: List[Item], container_bounds: Box3, unit_scale: int = 1) -> str:
+    """
+    Exact hash of a quantized packing input (dims, rotatability and order per item
+    plus the container), stable across runs and float noise; usable as a cache key.
+    Ids, groups, weights and max loads (which the engines use as given) are hashed too.
+    """
+    quantized = quantize_items(items, unit_scale)
+    bounds = quantize_bounds(container_bounds, unit_scale)
+    rows = np.array(
+        [(i.dims.x, i.dims.y, i.dims.z, int(i.rotatable), i.order) for i in quantized],
+        dtype=np.int64
+    ).reshape(-1, 5)
+    loads = np.array(
+        [(i.weight, np.nan if i.max_load is None else i.max_load) for i in items],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    digest = hashlib.sha256()
+    digest.update(np.array([bounds.min.x, bounds.min.y, bounds.min.z,
+                            bounds.max.x, bounds.max.y, bounds.max.z, unit_scale], dtype=np.int64).tobytes())
+    digest.update(rows.tobytes())
+    digest.update(loads.tobytes())
+    digest.update('\0'.join(f"{i.id}\1{i.group_id}" for i in items).encode())
+    return digest.hexdigest()
+
+
+def _accepts(engine, name: str) -> bool:
+    parameters = inspect.signature(engine).parameters.values()
+    return any(p.name == name or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+def _dequantize(placement: Placement, item: Item, quantized: Item, unit_scale: int) -> Placement:
+    """Placement in input units, sized by the item's real dims in the orientation used"""
+    pose = placement.pose
+    rotated = pose.max.x - pose.min.x != quantized.dims.x and pose.max.x - pose.min.x == quantized.dims.z
+    dx, dz = (item.dims.z, item.dims.x) if rotated else (item.dims.x, item.dims.z)
+    low = vec3(pose.min.x / unit_scale, pose.min.y / unit_scale, pose.min.z / unit_scale)
+    return dataclasses.replace(
+        placement,
+        pose=box3(min_vec=low, max_vec=vec3(low.x + dx, low.y + item.dims.y, low.z + dz))
+    )
+
+
+def iter_pack_fixed_point(engine, items: List[Item], container_bounds: Box3,
+                          unit_scale: int = 1, **options) -> Generator[Placement, None, List[str]]:
+    """
+    Run a placement engine on integer coordinates.
+
+    Args:
+        engine: Any PACKING_MODES engine
+        items: List of items to pack (input units)
+        container_bounds: Container bounding box (input units)
+        unit_scale: Integer units per input unit (1 = whole millimetres, 10 = 0.1 mm)
+        options: Engine options; 'resolution' is in input units like everywhere else
+
+    Yields:
+        Placements converted back to input units
+
+    Returns:
+        List of unplaced item ids (as the generator's StopIteration value)
+    """
+    unit_scale = int(unit_scale)
+    if unit_scale < 1:
+        raise ValueError("unit_scale must be a positive integer")
+
+    quantized = quantize_items(items, unit_scale)
+    originals = {item.id: (item, q) for item, q in zip(items, quantized)}
+    bounds = quantize_bounds(container_bounds, unit_scale)
+
+    options = dict(options)
+    if options.get('resolution'):
+        options['resolution'] = max(1, _down(options['resolution'], unit_scale))
+    if _accepts(engine, 'exact'):
+        options['exact'] = True  # Integer kernels (heightmap family)
+    if 'item_volumes' in inspect.signature(engine).parameters:
+        # Engines that rank runs (multistart) score on the real, unrounded volumes
+        options['item_volumes'] = {item.id: item.dims.x * item.dims.y * item.dims.z for item in items}
+        options['container_volume'] = get_box_volume(container_bounds)
+
+    placement_iter = engine(quantized, bounds, **options)
+    while True:
+        try:
+            placement = next(placement_iter)
+        except StopIteration as stop:
+            return stop.value or []
+        item, q = originals[placement.item_id]
+        yield _dequantize(placement, item, q, unit_scale)
+
+
+def fixed_point_engine(engine, unit_scale: int = 1):
+    """Wrap an engine so it runs on integer coordinates (same call signature)"""
+    def run(items: List[Item], container_bounds: Box3, **options) -> Generator[Placement, None, List[str]]:
+        return iter_pack_fixed_point(engine, items, container_bounds, unit_scale, **options)
+    run.__wrapped__ = engine  # inspect.signature() reports the wrapped engine's options
+    return run
@@ -0,0 +1,314 @@
+"""
+Heightmap (skyline) packing for floor-loaded zones.
+Keeps a 2D NumPy height grid over the X-Z footprint and drops each item
+at the lowest position found with vectorized sliding-window max queries.
+With weight_aware=True, a SupportGraph enforces per-item max loads,
+heavy-on-bottom stacking and a zone payload limit.
+"""
+import math
+from typing import Callable, Generator, List, Optional, Tuple
+
+import numpy as np
+
+from .types import Item, Box3, Placement, Vec3
+from .utils import vec3, box3, get_box_dims, get_box_volume, EPS
+from .support import SupportGraph, Support
+from .cancellation import CancellationToken, stop_requested
+
+# Upper bound on grid cells per axis when the resolution is chosen automatically
+MAX_AUTO_CELLS = 512
+
+
+def auto_resolution(items: List[Item], container_bounds: Box3) -> float:
+    """
+    Pick a grid cell size: the smallest item footprint side, capped at MAX_AUTO_CELLS per axis.
+    Footprints round up to whole cells and the container rounds down, so the size is
+    divided further while that would lose an item that fits the empty container.
+    """
+    dims = get_box_dims(container_bounds)
+    min_side = min((min(item.dims.x, item.dims.z) for item in items), default=0)
+    finest = max(dims.x, dims.z, EPS) / MAX_AUTO_CELLS
+    base = max(min_side, finest, EPS)
+
+    # Footprint (x, z) per item in every allowed orientation that fits the container
+    footprints = np.array([(item.dims.x, item.dims.z) for item in items] +
+                          [(item.dims.z, item.dims.x) for item in items if item.rotatable], dtype=np.float64)
+    if not len(footprints):
+        return base
+    footprints = footprints[(footprints[:, 0] <= dims.x + EPS) & (footprints[:, 1] <= dims.z + EPS)]
+
+    divisor = 1
+    while True:
+        resolution = max(base / divisor, finest)
+        cells_x = np.maximum(1, np.ceil(footprints[:, 0] / resolution - EPS))
+        cells_z = np.maximum(1, np.ceil(footprints[:, 1] / resolution - EPS))
+        grid_x = math.floor(dims.x / resolution + EPS)
+        grid_z = math.floor(dims.z / resolution + EPS)
+        if resolution <= finest or ((cells_x <= grid_x) & (cells_z <= grid_z)).all():
+            return resolution
+        divisor += 1
+
+
+def _cells(length: float, resolution: float) -> int:
+    """Number of grid cells an extent occupies (rounded up, tolerant to float noise)"""
+    return max(1, int(math.ceil(length / resolution - EPS)))
+
+
+def _running_max(values: np.ndarray, window: int, axis: int) -> np.ndarray:
+    """
+    Max over every `window` consecutive entries along an axis in O(log window)
+    vectorized steps: each pass merges two overlapping spans already reduced.
+    """
+    result = values
+    span = 1
+    while span < window:
+        step = min(span, window - span)
+        if axis == 0:
+            result = np.maximum(result[:-step], result[step:])
+        else:
+            result = np.maximum(result[:, :-step], result[:, step:])
+        span += step
+    return result
+
+
+def window_max(height_map: np.ndarray, wx: int, wz: int) -> np.ndarray:
+    """
+    Maximum of every wx*wz window of the height map.
+    Separable: a max over X windows followed by a max over Z windows.
+    Result[i, j] is the resting height of a footprint whose min corner is cell (i, j).
+    """
+    return _running_max(_running_max(height_map, wx, 0), wz, 1)
+
+
+class HeightMap:
+    """
+    Height grid of a zone footprint; cell (i, j) covers X=[i*res, (i+1)*res), Z likewise.
+    With exact=True all inputs are integers (fixed-point units): heights are int64 and
+    comparisons use no tolerance.
+    """
+
+    def __init__(self, container_bounds: Box3, resolution: float, exact: bool = False):
+        dims = get_box_dims(container_bounds)
+        if exact:
+            resolution = max(1, int(resolution))
+        self.origin = container_bounds.min
+        self.resolution = resolution
+        self.max_height = dims.y
+        self.tol = 0 if exact else EPS
+        self.nx = int(math.floor(dims.x / resolution + EPS))
+        self.nz = int(math.floor(dims.z / resolution + EPS))
+        self.heights = np.zeros((max(self.nx, 0), max(self.nz, 0)), dtype=np.int64 if exact else np.float64)
+        # Index of the placement whose top surface forms each cell (-1 = floor)
+        self.owners = np.full(self.heights.shape, -1, dtype=np.int64)
+
+    def contacts(self, i: int, j: int, wx: int, wz: int, base: float) -> List[Support]:
+        """Placements an item resting at `base` touches, with their share of its contact area"""
+        if base <= self.tol:
+            return []
+        heights = self.heights[i:i + wx, j:j + wz]
+        owners = self.owners[i:i + wx, j:j + wz][heights >= base - self.tol]
+        owners = owners[owners >= 0]
+        if owners.size == 0:
+            return []
+        nodes, counts = np.unique(owners, return_counts=True)
+        total = counts.sum()
+        return [(int(node), float(count) / total) for node, count in zip(nodes, counts)]
+
+    def find_position(self, dx: float, dy: float, dz: float, min_support: float = 0.0,
+                      accept: Optional[Callable[[int, int, int, int, float], bool]] = None
+                      ) -> Optional[Tuple[int, int, float]]:
+        """
+        Lowest feasible (i, j, base_height) for a footprint of dx*dz and height dy.
+        Ties are broken by smallest X, then smallest Z (back-left-bottom).
+        `accept(i, j, wx, wz, base)` can veto candidates (e.g. load limits).
+        """
+        wx = _cells(dx, self.resolution)
+        wz = _cells(dz, self.resolution)
+        if wx > self.nx or wz > self.nz:
+            return None
+
+        bases = window_max(self.heights, wx, wz)
+        feasible = bases + dy <= self.max_height + self.tol
+        if not feasible.any():
+            return None
+
+        candidates = np.nonzero(feasible)
+        candidate_bases = bases[candidates]
+        order = np.lexsort((candidates[1], candidates[0], candidate_bases))
+
+        for k in order:
+            i, j = int(candidates[0][k]), int(candidates[1][k])
+            base = candidate_bases[k].item()
+            if min_support > 0 and base > self.tol:
+                footprint = self.heights[i:i + wx, j:j + wz]
+                support = np.count_nonzero(footprint >= base - self.tol) / footprint.size
+                if support + EPS < min_support:
+                    continue
+            if accept is not None and not accept(i, j, wx, wz, base):
+                continue
+            return i, j, base
+        return None
+
+    def place(self, i: int, j: int, dx: float, dz: float, top: float, owner: int = -1) -> None:
+        """Raise the footprint cells to the top of a newly placed item"""
+        wx = _cells(dx, self.resolution)
+        wz = _cells(dz, self.resolution)
+        self.heights[i:i + wx, j:j + wz] = top
+        self.owners[i:i + wx, j:j + wz] = owner
+
+
+class HeightmapPacker:
+    """
+    Incremental heightmap placement into one container.
+    Holds the height grid plus (when weight-aware) the support graph and payload,
+    so items can be offered one at a time, e.g. by the multi-bin packer.
+    """
+
+    def __init__(self, container_bounds: Box3, resolution: float,
+                 min_support: float = 0.0,
+                 weight_aware: bool = False,
+                 heavy_on_bottom: bool = True,
+                 max_payload: Optional[float] = None,
+                 exact: bool = False):
+        self.height_map = HeightMap(container_bounds, resolution, exact)
+        self.resolution = self.height_map.resolution
+        self.min_support = min_support
+        self.weight_aware = weight_aware
+        self.heavy_on_bottom = heavy_on_bottom
+        self.max_payload = max_payload
+        self.graph = SupportGraph()
+        self.payload = 0.0
+        self.used_volume = 0.0
+        self.total_volume = get_box_volume(container_bounds)
+
+    @property
+    def remaining_volume(self) -> float:
+        return self.total_volume - self.used_volume
+
+    def _accept_for(self, item: Item):
+        """Load-bearing veto for candidate positions (None when not weight-aware)"""
+        if not self.weight_aware:
+            return None
+        height_map, graph = self.height_map, self.graph
+
+        def accept(i, j, wx, wz, base):
+            supports = height_map.contacts(i, j, wx, wz, base)
+            if self.heavy_on_bottom and any(graph.weights[node] + EPS < item.weight for node, _ in supports):
+                return False
+            return graph.can_carry(supports, item.weight)
+        return accept
+
+    def try_place(self, item: Item) -> Optional[Placement]:
+        """Place an item at its lowest feasible position; None if it does not fit"""
+        if self.weight_aware and self.max_payload is not None and \
+                self.payload + item.weight > self.max_payload + EPS:
+            return None
+
+        height_map = self.height_map
+        accept = self._accept_for(item)
+        orientations = [(item.dims.x, item.dims.z)]
+        if item.rotatable and abs(item.dims.x - item.dims.z) > EPS:
+            orientations.append((item.dims.z, item.dims.x))
+
+        best = None
+        for dx, dz in orientations:
+            position = height_map.find_position(dx, item.dims.y, dz, self.min_support, accept)
+            if position is None:
+                continue
+            i, j, base = position
+            if best is None or (base, i, j) < (best[2], best[0], best[1]):
+                best = (i, j, base, dx, dz)
+
+        if best is None:
+            return None
+
+        i, j, base, dx, dz = best
+        min_x = height_map.origin.x + i * self.resolution
+        min_z = height_map.origin.z + j * self.resolution
+        min_y = height_map.origin.y + base
+        pose = box3(
+            min_vec=vec3(min_x, min_y, min_z),
+            max_vec=vec3(min_x + dx, min_y + item.dims.y, min_z + dz)
+        )
+        owner = -1
+        if self.weight_aware:
+            wx, wz = _cells(dx, self.resolution), _cells(dz, self.resolution)
+            owner = self.graph.add(item.weight, item.max_load, height_map.contacts(i, j, wx, wz, base))
+            self.payload += item.weight
+        height_map.place(i, j, dx, dz, base + item.dims.y, owner)
+        self.used_volume += item.dims.x * item.dims.y * item.dims.z
+        return Placement(item_id=item.id, pose=pose)
+
+
+def sort_for_heightmap(items: List[Item], weight_aware: bool = False) -> List[Item]:
+    """Volume-descending order; heaviest first when weight-aware"""
+    if weight_aware:
+        return sorted(
+            items,
+            key=lambda i: (i.weight, get_box_volume(Box3(min=Vec3(), max=i.dims))),
+            reverse=True
+        )
+    return sorted(items, key=lambda i: get_box_volume(Box3(min=Vec3(), max=i.dims)), reverse=True)
+
+
+def iter_pack_items_heightmap(items: List[Item], container_bounds: Box3,
+                              resolution: Optional[float] = None,
+                              min_support: float = 0.0,
+                              weight_aware: bool = False,
+                              heavy_on_bottom: bool = True,
+                              max_payload: Optional[float] = None,
+                              cancel_token: Optional[CancellationToken] = None,
+                              exact: bool = False) -> Generator[Placement, None, List[str]]:
+    """
+    Heightmap (skyline) packing that yields each placement as soon as it is made.
+
+    Strategy:
+    1. Sort items by volume (largest first); heaviest first when weight-aware
+    2. For each item (and its Y-axis rotation if rotatable), compute the resting
+       height of every footprint position via a sliding-window max
+    3. Place at the lowest feasible position and raise the height map
+
+    Args:
+        items: List of items to pack
+        container_bounds: Container bounding box (Y is up)
+        resolution: Grid cell size in container units (auto when None)
+        min_support: Minimum fraction of the footprint that must rest on the
+                     surface below (0 disables the check)
+        weight_aware: Enforce Item.max_load through a SupportGraph
+        heavy_on_bottom: (weight-aware) never rest an item on a lighter one
+        max_payload: (weight-aware) total weight limit of the zone
+        cancel_token: Optional deadline/cancel signal, checked before each item;
+                      items not reached are reported unplaced
+        exact: Integer (fixed-point) inputs; see fixedpoint.iter_pack_fixed_point
+
+    Yields:
+        Placement for every packed item, in placement order
+
+    Returns:
+        List of unplaced item ids (as the generator's StopIteration value)
+    """
+    if not items:
+        return []
+
+    if resolution is None or resolution <= 0:
+        resolution = auto_resolution(items, container_bounds)
+
+    packer = HeightmapPacker(container_bounds, resolution, min_support,
+                             weight_aware, heavy_on_bottom, max_payload, exact)
+    sorted_items = sort_for_heightmap(items, weight_aware)
+    unplaced_ids = []
+
+    for position, item in enumerate(sorted_items):
+        if stop_requested(cancel_token):
+            unplaced_ids.extend(i.id for i in sorted_items[position:])
+            break
+        placement = packer.try_place(item)
+        if placement is None:
+            unplaced_ids.append(item.id)
+            continue
+        yield placement
+
+    height_map = packer.height_map
+    print(f"Heightmap packing complete: {len(sorted_items) - len(unplaced_ids)} placed, "
+          f"{len(unplaced_ids)} unplaced (grid {height_map.nx}x{height_map.nz} @ {height_map.resolution})")
+    return unplaced_ids
@@ -4,29 +4,74 @@ Called by the API server to perform packing operations.
 """
 import time
 import dataclasses
-from typing import List, Dict, Any
+import functools
+import inspect
+from typing import List, Dict, Any, Iterator, Optional
 
-from .types import Item, Container, PackingResult, PackedObject, UnpackedObject, Vec3, Box3
-from .packer import pack_items_simple
+from .types import Item, Container, PackingResult, PackedObject, UnpackedObject, Placement, Vec3, Box3
+from .packer import iter_pack_items_simple, drain_placements
+from .heightmap import iter_pack_items_heightmap
+from .multibin import BinType, pack_items_multibin
+from .optimizer import iter_pack_items_optimized
+from .sequenced import iter_pack_items_sequenced
+from .ems import iter_pack_items_ems
+from .fixedpoint import fixed_point_engine
+from .multistart import iter_pack_items_multistart
+from .cancellation import CancellationToken
+from .bounds import container_lower_bounds
 from .utils import vec3, box3, get_box_volume
 
 
-def execute_packing(items_data: List[Dict], groups_data: List[Dict], container_data: Dict) -> Dict[str, Any]:
+# Placement engines selectable via the `mode` argument.
+# Each is a generator: engine(items, bounds, **options) yields Placements and returns unplaced ids.
+# Every engine accepts cancel_token=CancellationToken and stops early with a partial result;
+# engines with a `stats` parameter report run details into PackingResult.stats.
+PACKING_MODES = {
+    'grid': iter_pack_items_simple,
+    'heightmap': iter_pack_items_heightmap,
+    'weighted': functools.partial(iter_pack_items_heightmap, weight_aware=True),
+    # Simulated annealing over order/orientation with a wall-clock budget (time_budget_s)
+    'optimize': iter_pack_items_optimized,
+    # Keeps item_order as the loading sequence; every item reachable from the door (door, strict)
+    'sequence': iter_pack_items_sequenced,
+    # Maximal empty-space free-space model instead of the fixed slot grid
+    'ems': iter_pack_items_ems,
+    # Best of several sort strategies and random seeds, decoded in the process pool
+    'multistart': iter_pack_items_multistart,
+}
+
+
+def get_packing_engine(mode: str):
+    """Look up a placement engine by mode name"""
+    engine = PACKING_MODES.get(mode or 'grid')
+    if engine is None:
+        raise ValueError(f"Unknown packing mode '{mode}'. Available: {sorted(PACKING_MODES)}")
+    return engine
+
+
+def resolve_engine(mode: str, options: Optional[Dict[str, Any]] = None):
     """
-    Execute packing algorithm with data from database.
-    
-    Args:
-        items_data: List of item dictionaries from DB
-        groups_data: List of group dictionaries from DB
-        container_data: Container dictionary from DB
-        
-    Returns:
-        Dictionary containing PackingResult (serializable to JSON)
+    Engine and its keyword options for a run.
+    options['fixed_point'] runs the engine on integer units (options['unit_scale'] per mm, default 1).
     """
-    print(f"🚀 Starting packing execution with {len(items_data)} items")
-    start_time = time.perf_counter()
-    
-    # 1. Convert DB data to algorithm data structures
+    engine = get_packing_engine(mode)
+    options = dict(options or {})
+    unit_scale = options.pop('unit_scale', 1)
+    if options.pop('fixed_point', False):
+        engine = fixed_point_engine(engine, unit_scale)
+    return engine, options
+
+
+def _engine_stats(engine, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Hand the engine a stats dict if it reports run details; returns that dict"""
+    stats: Dict[str, Any] = {}
+    if 'stats' in inspect.signature(engine).parameters:
+        options['stats'] = stats
+    return stats
+
+
+def build_items(items_data: List[Dict]) -> List[Item]:
+    """Convert DB item rows to algorithm Items, sorted by user-defined order"""
     items = []
     for item_dict in items_data:
         item = Item(
@@ -39,14 +84,18 @@ def execute_packing(items_data: List[Dict], groups_data: List[Dict], container_d
             ),
             order=int(item_dict.get('item_order', 0)),
             rotatable=True,
-            weight=int(item_dict.get('weight', 0))
+            weight=float(item_dict.get('weight') or 0),
+            max_load=float(item_dict['max_load']) if item_dict.get('max_load') is not None else None
         )
         items.append(item)
     
     # Sort items by user-defined order
     items.sort(key=lambda x: x.order)
-    
-    # Parse container bounds
+    return items
+
+
+def parse_container_bounds(container_data: Dict) -> Box3:
+    """Parse container bounds from a container dictionary"""
     if container_data and 'parameters' in container_data:
         params = container_data['parameters']
         
@@ -65,12 +114,38 @@ def execute_packing(items_data: List[Dict], groups_data: List[Dict], container_d
         # Default container size
         container_bounds = box3(min_vec=vec3(0, 0, 0), max_vec=vec3(100, 50, 60))
     
-    container = Container(id="container_1", bounds=container_bounds)
+    return container_bounds
+
+
+def parse_container_definition(definition: Dict) -> Box3:
+    """
+    Parse a container definition into bounds. Accepts:
+    - DB rows / zone containers: {'parameters': {'widthX', 'heightY', 'depthZ'}}
+    - define_container.js configs: {'shape': 'rect', 'widthX', 'heightY', 'depthZ'}
+    - container_config.json: {'shape': 'cube', 'dimensions': {'width', 'height', 'depth'}}
+    Only box-shaped containers can be packed; U/T shapes raise ValueError.
+    """
+    if 'parameters' in definition:
+        return parse_container_bounds(definition)
     
-    # 2. Execute packing algorithm
-    placements, unplaced_ids = pack_items_simple(items, container.bounds)
+    shape = definition.get('shape', 'rect')
+    if shape not in ('rect', 'cube'):
+        raise ValueError(f"Container shape '{shape}' is not supported for packing (box shapes only)")
     
-    # 3. Calculate metrics
+    if 'dimensions' in definition:
+        dims = definition['dimensions']
+        return box3(
+            min_vec=vec3(0, 0, 0),
+            max_vec=vec3(float(dims['width']), float(dims['height']), float(dims['depth']))
+        )
+    return parse_container_bounds({'parameters': definition})
+
+
+def build_packing_result(items: List[Item], container: Container, placements: List[Placement],
+                         unplaced_ids: List[str], start_time: float,
+                         truncated: bool = False, with_bounds: bool = True,
+                         stats: Optional[Dict[str, Any]] = None) -> PackingResult:
+    """Calculate metrics and assemble the PackingResult for a finished run"""
     end_time = time.perf_counter()
     execution_time_ms = (end_time - start_time) * 1000
     
@@ -85,7 +160,14 @@ def execute_packing(items_data: List[Dict], groups_data: List[Dict], container_d
     
     volume_utilization = (used_volume / total_volume) if total_volume > 0 else 0
     
-    # 4. Build result objects
+    # How far the result is from optimal: packed volume vs. the packable upper bound
+    bounds = {}
+    if with_bounds:
+        bounds = container_lower_bounds(items, container.bounds)
+        upper = bounds['volume_upper_bound']
+        bounds['optimality_gap'] = (upper - used_volume) / upper if upper > 0 else 0.0
+    
+    # Build result objects
     packed_objects = [
         PackedObject(
             item_id=p.item_id,
@@ -100,22 +182,346 @@ def execute_packing(items_data: List[Dict], groups_data: List[Dict], container_d
         for item_id in unplaced_ids
     ]
     
+    status = "stopped early (partial result)" if truncated else "complete"
     result = PackingResult(
         job_id=f"job_{int(time.time())}",
         success=len(unpacked_objects) == 0,
-        message=f"Packing complete. {len(packed_objects)} items packed, {len(unpacked_objects)} unpacked.",
+        message=f"Packing {status}. {len(packed_objects)} items packed, {len(unpacked_objects)} unpacked.",
         total_volume=total_volume,
         used_volume=used_volume,
         volume_utilization=volume_utilization,
         execution_time_ms=execution_time_ms,
         packed_count=len(packed_objects),
         unpacked_count=len(unpacked_objects),
-        items=packed_objects + unpacked_objects
+        items=packed_objects + unpacked_objects,
+        truncated=truncated,
+        bounds=bounds,
+        stats=stats or {}
     )
     
-    print(f"✅ Packing execution complete in {execution_time_ms:.2f}ms")
+    print(f"✅ Packing execution {status} in {execution_time_ms:.2f}ms")
     print(f"   Packed: {len(packed_objects)}, Unpacked: {len(unpacked_objects)}")
     print(f"   Volume utilization: {volume_utilization*100:.2f}%")
+    if bounds:
+        print(f"   Bounds: >= {bounds['containers_lower_bound']} container(s), "
+              f"gap to packable volume {bounds['optimality_gap']*100:.2f}%")
+    
+    return result
+
+
+def execute_packing(items_data: List[Dict], groups_data: List[Dict], container_data: Dict,
+                    mode: str = 'grid', options: Optional[Dict[str, Any]] = None,
+                    cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+    """
+    Execute packing algorithm with data from database.
+    
+    Args:
+        items_data: List of item dictionaries from DB
+        groups_data: List of group dictionaries from DB
+        container_data: Container dictionary from DB
+        mode: Placement engine name (see PACKING_MODES)
+        options: Engine-specific keyword arguments (e.g. heightmap resolution);
+                 fixed_point/unit_scale select integer coordinates (see resolve_engine)
+        cancel_token: Optional deadline/cancel signal; on expiry the partial
+                      result is returned with truncated=True
+        
+    Returns:
+        Dictionary containing PackingResult (serializable to JSON)
+    """
+    print(f"🚀 Starting packing execution with {len(items_data)} items (mode={mode})")
+    engine, options = resolve_engine(mode, options)
+    stats = _engine_stats(engine, options)
+    start_time = time.perf_counter()
+    
+    # 1. Convert DB data to algorithm data structures
+    items = build_items(items_data)
+    container = Container(id="container_1", bounds=parse_container_bounds(container_data))
+    
+    # 2. Execute packing algorithm
+    placements, unplaced_ids = drain_placements(
+        engine(items, container.bounds, cancel_token=cancel_token, **options)
+    )
+    
+    # 3. Calculate metrics and build result
+    truncated = cancel_token is not None and cancel_token.truncated
+    result = build_packing_result(items, container, placements, unplaced_ids, start_time, truncated, stats=stats)
     
-    # 5. Convert to JSON-serializable dict
+    # 4. Convert to JSON-serializable dict
     return dataclasses.asdict(result)
+
+
+def execute_packing_zones(zone_jobs: List[Dict[str, Any]], groups_data: List[Dict],
+                          mode: str = 'grid', options: Optional[Dict[str, Any]] = None,
+                          cancel_token: Optional[CancellationToken] = None,
+                          workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Execute packing for several zones, in parallel when the pool has more than one worker.
+
+    Items go to the workers and placements come back through shared memory
+    (see sharedmem.pack_in_shared_memory), so large zones are not pickled.
+    With one worker or one zone, zones are packed in-process one after another.
+
+    Args:
+        zone_jobs: One dict per zone: {'items': item rows, 'container': container dict,
+                   'options': per-zone engine options (optional, override `options`)}
+        groups_data: List of group dictionaries from DB
+        mode: Placement engine name (see PACKING_MODES)
+        options: Engine options shared by all zones
+        cancel_token: Optional deadline/cancel signal covering all zones
+        workers: Zones packed at once (default: pool size)
+
+    Returns:
+        One PackingResult dict per zone, in zone_jobs order
+    """
+    from .parallel import worker_count
+    from .sharedmem import pack_in_shared_memory
+
+    get_packing_engine(mode)  # Fail fast on unknown modes, before any worker starts
+    workers = worker_count() if workers is None else max(1, int(workers))
+    zone_options = [{**(options or {}), **(job.get('options') or {})} for job in zone_jobs]
+
+    if workers == 1 or len(zone_jobs) < 2:
+        return [
+            execute_packing(job['items'], groups_data, job['container'], mode, opts, cancel_token)
+            for job, opts in zip(zone_jobs, zone_options)
+        ]
+
+    print(f"🚀 Starting parallel packing of {len(zone_jobs)} zones on {workers} workers (mode={mode})")
+    zone_items = [build_items(job['items']) for job in zone_jobs]
+    containers = [
+        Container(id="container_1", bounds=parse_container_bounds(job['container']))
+        for job in zone_jobs
+    ]
+    outcomes = pack_in_shared_memory(
+        [(items, container.bounds, opts) for items, container, opts in zip(zone_items, containers, zone_options)],
+        mode, workers=workers, cancel_token=cancel_token
+    )
+
+    results = []
+    for items, container, outcome in zip(zone_items, containers, outcomes):
+        result = build_packing_result(items, container, outcome['placements'], outcome['unplaced_ids'],
+                                      time.perf_counter() - outcome['elapsed_s'], outcome['truncated'],
+                                      stats=outcome['stats'])
+        results.append(dataclasses.asdict(result))
+    return results
+
+
+def stream_packing(items_data: List[Dict], groups_data: List[Dict], container_data: Dict,
+                   batch_size: int = 50, mode: str = 'grid',
+                   options: Optional[Dict[str, Any]] = None,
+                   cancel_token: Optional[CancellationToken] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Execute packing and yield placements in batches while the packer runs.
+    
+    Args:
+        items_data: List of item dictionaries from DB
+        groups_data: List of group dictionaries from DB
+        container_data: Container dictionary from DB
+        batch_size: Number of placements per 'placements' event
+        mode: Placement engine name (see PACKING_MODES)
+        options: Engine-specific keyword arguments
+        cancel_token: Optional deadline/cancel signal (see execute_packing)
+        
+    Yields:
+        {'type': 'placements', 'items': [PackedObject dicts]} for every batch,
+        then a final {'type': 'result', 'result': PackingResult dict}
+    """
+    print(f"🚀 Starting streamed packing with {len(items_data)} items (mode={mode})")
+    engine, options = resolve_engine(mode, options)
+    stats = _engine_stats(engine, options)
+    start_time = time.perf_counter()
+    batch_size = max(1, int(batch_size))
+    
+    items = build_items(items_data)
+    container = Container(id="container_1", bounds=parse_container_bounds(container_data))
+    
+    placements: List[Placement] = []
+    batch: List[Dict[str, Any]] = []
+    placement_iter = engine(items, container.bounds, cancel_token=cancel_token, **options)
+    while True:
+        try:
+            placement = next(placement_iter)
+        except StopIteration as stop:
+            unplaced_ids = stop.value or []
+            break
+        placements.append(placement)
+        batch.append(dataclasses.asdict(
+            PackedObject(item_id=placement.item_id, pose=placement.pose, zone_id=placement.zone_id)
+        ))
+        if len(batch) >= batch_size:
+            yield {'type': 'placements', 'items': batch}
+            batch = []
+    
+    if batch:
+        yield {'type': 'placements', 'items': batch}
+    
+    truncated = cancel_token is not None and cancel_token.truncated
+    result = build_packing_result(items, container, placements, unplaced_ids, start_time, truncated, stats=stats)
+    yield {'type': 'result', 'result': dataclasses.asdict(result)}
+
+
+def execute_multibin_packing(items_data: List[Dict], catalog_data: List[Dict], max_bins: int = 50,
+                             mode: str = 'heightmap',
+                             options: Optional[Dict[str, Any]] = None,
+                             cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+    """
+    Pack one manifest into as many containers as needed, in a single run.
+    
+    Args:
+        items_data: List of item dictionaries from DB
+        catalog_data: Container definitions (see parse_container_definition);
+                      overflow bins use the first type an item fits in
+        max_bins: Upper bound on containers opened
+        mode: 'heightmap' or 'weighted' (multi-bin needs an incremental engine)
+        options: Heightmap options (resolution, min_support, max_payload, ...)
+        cancel_token: Optional deadline/cancel signal; items not reached are unplaced
+        
+    Returns:
+        Dictionary with bins_used, per-bin PackingResult dicts and unplaced ids
+    """
+    if mode not in ('heightmap', 'weighted'):
+        raise ValueError(f"Multi-bin packing supports 'heightmap' and 'weighted' modes, not '{mode}'")
+    
+    print(f"🚀 Starting multi-bin packing with {len(items_data)} items, {len(catalog_data)} container types")
+    start_time = time.perf_counter()
+    
+    items = build_items(items_data)
+    catalog = [
+        BinType(id=str(definition.get('id', index)), bounds=parse_container_definition(definition))
+        for index, definition in enumerate(catalog_data)
+    ]
+    packer_options = dict(options or {})
+    if mode == 'weighted':
+        packer_options['weight_aware'] = True
+    
+    bins, unplaced_ids = pack_items_multibin(items, catalog, max_bins=max_bins,
+                                             cancel_token=cancel_token, **packer_options)
+    truncated = cancel_token is not None and cancel_token.truncated
+    
+    bin_results = []
+    for open_bin in bins:
+        placed_ids = {p.item_id for p in open_bin.placements}
+        bin_items = [item for item in items if item.id in placed_ids]
+        container = Container(id=f"bin_{open_bin.index}", bounds=open_bin.bin_type.bounds)
+        result = build_packing_result(bin_items, container, open_bin.placements, [], start_time,
+                                      truncated, with_bounds=False)
+        bin_results.append({
+            'bin_index': open_bin.index,
+            'container_type': open_bin.bin_type.id,
+            'container': {
+                'widthX': open_bin.bin_type.bounds.max.x - open_bin.bin_type.bounds.min.x,
+                'heightY': open_bin.bin_type.bounds.max.y - open_bin.bin_type.bounds.min.y,
+                'depthZ': open_bin.bin_type.bounds.max.z - open_bin.bin_type.bounds.min.z
+            },
+            'result': dataclasses.asdict(result)
+        })
+    
+    execution_time_ms = (time.perf_counter() - start_time) * 1000
+    packed_count = sum(len(b.placements) for b in bins)
+    return {
+        'success': not unplaced_ids,
+        'message': f"Packed {packed_count} items into {len(bins)} containers, {len(unplaced_ids)} unplaced.",
+        'bins_used': len(bins),
+        'packed_count': packed_count,
+        'unpacked_count': len(unplaced_ids),
+        'unplaced_ids': unplaced_ids,
+        'execution_time_ms': execution_time_ms,
+        'truncated': truncated,
+        'bins_lower_bound': _bins_lower_bound(items, catalog),
+        'bins': bin_results
+    }
+
+
+def _bins_lower_bound(items: List[Item], catalog: List[BinType]) -> int:
+    """
+    Containers needed at least. With one container type this is the L0/L1/L2 bound;
+    with a mixed catalog only the volume bound against the largest type is valid.
+    """
+    if not catalog:
+        return 0
+    if len(catalog) == 1:
+        return container_lower_bounds(items, catalog[0].bounds)['containers_lower_bound']
+    largest = max(get_box_volume(t.bounds) for t in catalog)
+    total = sum(get_box_volume(Box3(min=Vec3(), max=item.dims)) for item in items)
+    return int(-(-total // largest)) if largest > 0 else 0
+
+
+def _evaluate_container_type(args) -> Dict[str, Any]:
+    """Process-pool worker: pack the whole manifest into bins of one container type"""
+    items_data, definition, max_bins, mode, options, time_limit_s = args
+    # Tokens do not cross process boundaries; each worker enforces the remaining time itself
+    cancel_token = CancellationToken(time_limit_s) if time_limit_s is not None else None
+    result = execute_multibin_packing(items_data, [definition], max_bins=max_bins, mode=mode,
+                                      options=options, cancel_token=cancel_token)
+    bounds = parse_container_definition(definition)
+    container_volume = get_box_volume(bounds)
+    used_volume = sum(b['result']['used_volume'] for b in result['bins'])
+    bins_used = result['bins_used']
+    return {
+        'container_type': str(definition.get('id', definition.get('name', ''))),
+        'container': {
+            'widthX': bounds.max.x - bounds.min.x,
+            'heightY': bounds.max.y - bounds.min.y,
+            'depthZ': bounds.max.z - bounds.min.z
+        },
+        'containers_needed': bins_used,
+        'containers_lower_bound': result['bins_lower_bound'],
+        'packed_count': result['packed_count'],
+        'unpacked_count': result['unpacked_count'],
+        'volume_utilization': used_volume / (container_volume * bins_used) if bins_used and container_volume else 0,
+        'bin_utilization': [b['result']['volume_utilization'] for b in result['bins']],
+        'execution_time_ms': result['execution_time_ms'],
+        'truncated': result['truncated']
+    }
+
+
+def evaluate_container_catalog(items_data: List[Dict], candidates: List[Dict], max_bins: int = 50,
+                               mode: str = 'heightmap',
+                               options: Optional[Dict[str, Any]] = None,
+                               time_limit_s: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Evaluate several container types for one manifest concurrently.
+    Each candidate is packed with multi-bin packing in the shared process pool.
+    
+    Args:
+        items_data: List of item dictionaries (the manifest)
+        candidates: Container definitions (see parse_container_definition)
+        max_bins: Upper bound on containers per candidate
+        mode: 'heightmap' or 'weighted'
+        options: Heightmap options
+        time_limit_s: Optional per-candidate time limit; late candidates report truncated=True
+        
+    Returns:
+        Dictionary with per-type evaluations and the recommended type
+        (fewest containers with everything packed, then highest utilization)
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    from .parallel import get_process_pool, shutdown_process_pool
+    
+    # Validate up front so a bad definition fails fast instead of inside a worker
+    for definition in candidates:
+        parse_container_definition(definition)
+    
+    start_time = time.perf_counter()
+    named = [
+        {**definition, 'id': definition.get('id', definition.get('name', f"type_{index}"))}
+        for index, definition in enumerate(candidates)
+    ]
+    jobs = [(items_data, definition, max_bins, mode, options or {}, time_limit_s) for definition in named]
+    
+    try:
+        evaluations = list(get_process_pool().map(_evaluate_container_type, jobs))
+    except BrokenProcessPool:
+        shutdown_process_pool()  # Next call starts a fresh pool
+        raise
+    
+    complete = [e for e in evaluations if e['unpacked_count'] == 0]
+    ranked = sorted(complete or evaluations,
+                    key=lambda e: (e['unpacked_count'], e['containers_needed'], -e['volume_utilization']))
+    
+    return {
+        'success': bool(complete),
+        'evaluations': evaluations,
+        'recommended': ranked[0]['container_type'] if ranked else None,
+        'execution_time_ms': (time.perf_counter() - start_time) * 1000
+    }
@@ -0,0 +1,235 @@
+"""
+Multi-container (multi-bin) overflow packing.
+Opens additional container instances from a catalog as items overflow and
+packs everything in one pass on top of the incremental HeightmapPacker.
+"""
+import bisect
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .types import Item, Box3, Placement
+from .utils import get_box_dims, EPS
+from .heightmap import HeightmapPacker, auto_resolution, sort_for_heightmap
+from .cancellation import CancellationToken, stop_requested
+
+# Orientation set of an item: the (dx, dy, dz) footprints it may be placed in
+Orientations = Tuple[Tuple[float, float, float], ...]
+
+
+class FailureIndex:
+    """
+    Items that failed to fit in a bin, kept as a NumPy array so a new item can be
+    checked against all of them at once. Placements only ever consume space, so an
+    item at least as large (and heavy) as a failed one in every orientation fails too,
+    as long as fitting is monotone in size (see _failures_monotone).
+    Only the minimal failures are kept: a new failure drops every entry it undercuts.
+    """
+
+    def __init__(self):
+        self._array = np.empty((0, 2, 3), dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def add(self, orientations: Orientations, weight: float) -> None:
+        # Pad to two orientations so rows stack into one (k, 2, 3) array
+        row = np.array((orientations * 2)[:2], dtype=np.float64)
+        if len(self._weights):
+            # Old entry is redundant if each of its orientations covers one of the new ones
+            covers = (self._array[:, :, None, :] >= row[None, None, :, :] - EPS).all(axis=-1)
+            redundant = covers.any(axis=-1).all(axis=-1) & (self._weights >= weight - EPS)
+            keep = ~redundant
+            self._array = self._array[keep]
+            self._weights = self._weights[keep]
+        self._array = np.concatenate([self._array, row[None]])
+        self._weights = np.append(self._weights, weight)
+
+    def dominated(self, orientations: Orientations, weight: float) -> bool:
+        """True if some failed item is no larger than `orientations` in every orientation"""
+        if not len(self._weights):
+            return False
+        mask = self._weights <= weight + EPS
+        for candidate in orientations:
+            mask &= (np.asarray(candidate) >= self._array - EPS).all(axis=-1).any(axis=-1)
+            if not mask.any():
+                return False
+        return True
+
+
+@dataclass
+class BinType:
+    """One entry of the container catalog"""
+    id: str
+    bounds: Box3
+
+
+@dataclass
+class OpenBin:
+    """A container instance opened during the run"""
+    index: int
+    bin_type: BinType
+    packer: HeightmapPacker
+    placements: List[Placement] = field(default_factory=list)
+    # Items that failed here; dominated items skip this bin without probing
+    # (None when the packer's constraints make the shortcut unsound)
+    failed: Optional[FailureIndex] = field(default_factory=FailureIndex)
+
+
+def _failures_monotone(packer_options) -> bool:
+    """
+    Whether an item failing in a bin implies every larger (and heavier) item fails too.
+    True for plain lowest-fit. A support minimum breaks it: over column heights
+    [5, 4, 5] a 2-cell footprint gets 1/2 support but a 3-cell one 2/3. So do
+    weight-aware load limits, as a wider item spreads its weight over more supporters.
+    """
+    return not packer_options.get('min_support') and not packer_options.get('weight_aware')
+
+
+def _open_bin(index: int, bin_type: BinType, resolution: float, packer_options) -> OpenBin:
+    return OpenBin(
+        index=index,
+        bin_type=bin_type,
+        packer=HeightmapPacker(bin_type.bounds, resolution, **packer_options),
+        failed=FailureIndex() if _failures_monotone(packer_options) else None
+    )
+
+
+def _try_bin(open_bin: OpenBin, item: Item, orientations: Orientations) -> Optional[Placement]:
+    """Place an item in an open bin unless a failure it dominates already rules it out"""
+    failed = open_bin.failed
+    if failed is not None and failed.dominated(orientations, item.weight):
+        return None
+    placement = open_bin.packer.try_place(item)
+    if placement is None and failed is not None:
+        failed.add(orientations, item.weight)
+    return placement
+
+
+def _orientations(item: Item) -> Orientations:
+    dims = item.dims
+    if item.rotatable and abs(dims.x - dims.z) > EPS:
+        return ((dims.x, dims.y, dims.z), (dims.z, dims.y, dims.x))
+    return ((dims.x, dims.y, dims.z),)
+
+
+def _fits_empty(item: Item, bounds: Box3) -> bool:
+    dims = get_box_dims(bounds)
+    return any(
+        o[0] <= dims.x + EPS and o[1] <= dims.y + EPS and o[2] <= dims.z + EPS
+        for o in _orientations(item)
+    )
+
+
+class BinIndex:
+    """Open bins ordered by remaining volume, so an item only probes bins that could hold it"""
+
+    def __init__(self):
+        self._keys: List[Tuple[float, int]] = []
+
+    def add(self, open_bin: OpenBin) -> None:
+        bisect.insort(self._keys, (open_bin.packer.remaining_volume, open_bin.index))
+
+    def update(self, open_bin: OpenBin, old_remaining: float) -> None:
+        position = bisect.bisect_left(self._keys, (old_remaining, open_bin.index))
+        if position < len(self._keys) and self._keys[position] == (old_remaining, open_bin.index):
+            self._keys.pop(position)
+        self.add(open_bin)
+
+    def candidates(self, volume: float) -> List[int]:
+        """Indices (in opening order) of bins with at least `volume` remaining"""
+        start = bisect.bisect_left(self._keys, (volume - EPS, -1))
+        return sorted(index for _, index in self._keys[start:])
+
+
+def pack_items_multibin(items: List[Item], catalog: List[BinType],
+                        max_bins: int = 50,
+                        resolution: Optional[float] = None,
+                        cancel_token: Optional[CancellationToken] = None,
+                        **packer_options) -> Tuple[List[OpenBin], List[str]]:
+    """
+    First-fit-decreasing over an open set of bins.
+
+    Each item probes, in opening order, only the open bins whose remaining
+    volume can hold it and where no smaller item has already failed (when that
+    implies failure, see _failures_monotone). If none accepts it, a new bin is
+    opened from the first catalog type the item fits in (empty), up to max_bins.
+
+    Args:
+        items: Items to pack
+        catalog: Container types; new bins use the first type the item fits in
+        max_bins: Upper bound on opened bins
+        resolution: Heightmap cell size (auto from the items, per catalog type, when None)
+        cancel_token: Optional deadline/cancel signal, checked before each item;
+                      items not reached are reported unplaced
+        packer_options: Forwarded to HeightmapPacker (min_support, weight_aware, ...)
+
+    Returns:
+        Tuple of (opened bins with their placements, unplaced item ids)
+    """
+    if not items or not catalog:
+        return [], [item.id for item in items]
+
+    # Cell size per catalog position; auto sizes are fitted to each type's own bounds
+    if resolution is None or resolution <= 0:
+        resolutions = {}
+    else:
+        resolutions = {position: resolution for position in range(len(catalog))}
+
+    bins: List[OpenBin] = []
+    index = BinIndex()
+    unplaced_ids: List[str] = []
+
+    sorted_items = sort_for_heightmap(items, packer_options.get('weight_aware', False))
+    for position, item in enumerate(sorted_items):
+        if stop_requested(cancel_token):
+            unplaced_ids.extend(i.id for i in sorted_items[position:])
+            break
+        orientations = _orientations(item)
+        volume = item.dims.x * item.dims.y * item.dims.z
+        placed = False
+
+        for bin_index in index.candidates(volume):
+            open_bin = bins[bin_index]
+            old_remaining = open_bin.packer.remaining_volume
+            placement = _try_bin(open_bin, item, orientations)
+            if placement is None:
+                continue
+            placement.zone_id = str(open_bin.index)
+            open_bin.placements.append(placement)
+            index.update(open_bin, old_remaining)
+            placed = True
+            break
+
+        if placed:
+            continue
+
+        if len(bins) >= max_bins:
+            unplaced_ids.append(item.id)
+            continue
+
+        type_position = next((k for k, t in enumerate(catalog) if _fits_empty(item, t.bounds)), None)
+        if type_position is None:
+            unplaced_ids.append(item.id)
+            continue
+
+        bin_type = catalog[type_position]
+        if type_position not in resolutions:
+            resolutions[type_position] = auto_resolution(items, bin_type.bounds)
+        open_bin = _open_bin(len(bins), bin_type, resolutions[type_position], packer_options)
+        placement = open_bin.packer.try_place(item)
+        if placement is None:
+            # Fits dimensionally but not under the packer's constraints (e.g. payload)
+            unplaced_ids.append(item.id)
+            continue
+        placement.zone_id = str(open_bin.index)
+        open_bin.placements.append(placement)
+        bins.append(open_bin)
+        index.add(open_bin)
+
+    print(f"Multi-bin packing complete: {len(bins)} bins, "
+          f"{sum(len(b.placements) for b in bins)} placed, {len(unplaced_ids)} unplaced")
+    return bins, unplaced_ids
+
@@ -0,0 +1,194 @@
+"""
+Multi-start packing: best of N item orders.
+Several sort strategies (and randomly perturbed volume orders) are decoded with
+the heightmap packer concurrently in the shared process pool; the order with
+the highest utilization wins. At most `workers` runs are in flight at a time
+and runs still pending at the deadline are dropped.
+"""
+import random
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence, Tuple
+
+from .types import Item, Box3, Placement
+from .utils import get_box_volume
+from .heightmap import auto_resolution
+from .optimizer import FREE, decode
+from .cancellation import CancellationToken, stop_requested
+
+
+def _volume(item: Item) -> float:
+    return item.dims.x * item.dims.y * item.dims.z
+
+
+# Sort keys; items are taken in descending key order
+SORT_STRATEGIES: Dict[str, Callable[[Item], Any]] = {
+    'volume': _volume,
+    'longest_side': lambda i: (max(i.dims.x, i.dims.y, i.dims.z), _volume(i)),
+    'footprint': lambda i: (i.dims.x * i.dims.z, i.dims.y),
+    'height': lambda i: (i.dims.y, i.dims.x * i.dims.z),
+    # Keeps each group together, groups in ascending id order, largest first within a group
+    'group': lambda i: (-_group_rank(i.group_id), _volume(i)),
+}
+
+
+def _group_rank(group_id: str) -> float:
+    try:
+        return float(group_id)
+    except (TypeError, ValueError):
+        return float(sum(ord(c) for c in str(group_id)))
+
+
+def _packed_volume(placements: Sequence[Placement], used_volume: float,
+                   item_volumes: Optional[Dict[str, float]]) -> float:
+    """Packed volume, from item_volumes (input units) when the run used scaled coordinates"""
+    if item_volumes is None:
+        return used_volume
+    return sum(item_volumes[p.item_id] for p in placements)
+
+
+def _score_order(items: Sequence[Item], solution, container_bounds: Box3, resolution: float,
+                 packer_options: dict, item_volumes: Optional[Dict[str, float]]) -> Tuple[float, float]:
+    """Fitness of one order: packed volume first, then lower stack height"""
+    placements, _, used_volume = decode(items, solution, container_bounds, resolution, **packer_options)
+    top = max((p.pose.max.y for p in placements), default=0.0)
+    return _packed_volume(placements, used_volume, item_volumes), -top
+
+
+def _score_order_task(args) -> Tuple[float, float]:
+    """Process-pool worker entry point"""
+    return _score_order(*args)
+
+
+def strategy_orders(items: Sequence[Item], strategies: Sequence[str],
+                    seeds: int) -> List[Tuple[str, Tuple[int, ...]]]:
+    """(name, item index order) for every named strategy plus `seeds` randomized volume orders"""
+    unknown = [name for name in strategies if name not in SORT_STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown sort strategies {unknown}. Available: {sorted(SORT_STRATEGIES)}")
+
+    indices = range(len(items))
+    orders = [
+        (name, tuple(sorted(indices, key=lambda k: SORT_STRATEGIES[name](items[k]), reverse=True)))
+        for name in strategies
+    ]
+    for seed in range(seeds):
+        rng = random.Random(seed)
+        noise = [rng.uniform(0.7, 1.3) for _ in indices]
+        orders.append((f"random_{seed}", tuple(sorted(indices, key=lambda k: _volume(items[k]) * noise[k], reverse=True))))
+    return orders
+
+
+def iter_pack_items_multistart(items: List[Item], container_bounds: Box3,
+                               strategies: Optional[Sequence[str]] = None,
+                               seeds: int = 2,
+                               workers: Optional[int] = None,
+                               time_budget_s: Optional[float] = None,
+                               resolution: Optional[float] = None,
+                               cancel_token: Optional[CancellationToken] = None,
+                               stats: Optional[Dict[str, Any]] = None,
+                               item_volumes: Optional[Dict[str, float]] = None,
+                               container_volume: Optional[float] = None,
+                               **packer_options) -> Generator[Placement, None, List[str]]:
+    """
+    Decode several item orders and keep the densest.
+
+    Strategy:
+    1. Build one order per sort strategy plus `seeds` randomized volume orders
+    2. Decode them with the heightmap packer in the shared process pool,
+       keeping at most `workers` runs in flight
+    3. Stop collecting at the deadline (time_budget_s or the cancel token's)
+    4. Re-decode the best order in-process and yield its placements
+
+    Args:
+        items: List of items to pack
+        container_bounds: Container bounding box
+        strategies: Names from SORT_STRATEGIES (default: all)
+        seeds: Number of randomized volume orders to add
+        workers: Runs in flight at once; 1 evaluates in-process (default: pool size)
+        time_budget_s: Deadline for collecting runs (None: wait for all)
+        resolution: Heightmap cell size (auto when None), shared by all runs
+        cancel_token: Optional deadline/cancel signal
+        stats: Filled with the winning strategy and every strategy's utilization
+        item_volumes: Real volume per item id, when items/bounds are scaled (fixed-point
+                      mode); runs are ranked and reported on these instead
+        container_volume: Real container volume to go with item_volumes
+        packer_options: Forwarded to HeightmapPacker (min_support, weight_aware, ...)
+
+    Yields:
+        Placement for every packed item of the best order
+
+    Returns:
+        List of unplaced item ids (as the generator's StopIteration value)
+    """
+    if not items:
+        return []
+
+    from .parallel import get_process_pool, worker_count
+
+    start = time.perf_counter()
+    if resolution is None or resolution <= 0:
+        resolution = auto_resolution(items, container_bounds)
+    orders = strategy_orders(items, list(strategies or SORT_STRATEGIES), max(0, int(seeds)))
+    genes = tuple(FREE for _ in items)
+
+    deadline = None if time_budget_s is None else start + max(0.0, float(time_budget_s))
+    if cancel_token is not None and cancel_token.remaining() is not None:
+        token_deadline = start + cancel_token.remaining()
+        deadline = token_deadline if deadline is None else min(deadline, token_deadline)
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.perf_counter())
+
+    workers = worker_count() if workers is None else max(1, int(workers))
+    scores: Dict[str, Tuple[float, float]] = {}
+
+    if workers == 1 or len(orders) == 1:
+        for name, order in orders:
+            if remaining() == 0.0 or stop_requested(cancel_token):
+                break
+            scores[name] = _score_order(items, (order, genes), container_bounds, resolution, packer_options, item_volumes)
+    else:
+        pool = get_process_pool()
+        queue = list(orders)
+        running = {}
+        while queue or running:
+            while queue and len(running) < workers:
+                name, order = queue.pop(0)
+                future = pool.submit(_score_order_task, (items, (order, genes), container_bounds, resolution,
+                                                         packer_options, item_volumes))
+                running[future] = name
+            done, _ = wait(running, timeout=remaining(), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if future.exception() is None:
+                    scores[name] = future.result()
+            if not done or stop_requested(cancel_token):
+                break  # Deadline or cancellation: drop pending runs
+        for future in running:
+            future.cancel()
+
+    by_name = dict(orders)
+    if scores:
+        winner = max(scores, key=lambda name: scores[name])
+    else:
+        # Nothing finished in time: fall back to the first order so the result stays valid
+        winner = orders[0][0]
+    stop_requested(cancel_token)
+    placements, unplaced_ids, used_volume = decode(items, (by_name[winner], genes), container_bounds,
+                                                   resolution, **packer_options)
+
+    used_volume = _packed_volume(placements, used_volume, item_volumes)
+    container_volume = (container_volume if item_volumes is not None else get_box_volume(container_bounds)) or 1.0
+    if stats is not None:
+        stats['strategy'] = winner
+        stats['strategies'] = {
+            name: (scores[name][0] / container_volume if name in scores else None)
+            for name, _ in orders
+        }
+    print(f"Multi-start complete: {len(scores)}/{len(orders)} orders evaluated in "
+          f"{(time.perf_counter() - start):.2f}s; best '{winner}' at {used_volume / container_volume * 100:.2f}%")
+
+    for placement in placements:
+        yield placement
+    return unplaced_ids
@@ -0,0 +1,217 @@
+"""
+Time-budgeted local search over item sequence and orientation.
+Simulated annealing on top of the heightmap placement decoder: each round
+evaluates a batch of neighbour solutions in parallel across worker processes
+and the best solution found is returned when the wall-clock budget runs out.
+"""
+import math
+import random
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from dataclasses import replace
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple
+
+from .types import Item, Box3, Placement
+from .utils import get_box_volume, EPS
+from .heightmap import HeightmapPacker, auto_resolution, sort_for_heightmap
+from .cancellation import CancellationToken, stop_requested
+
+# Orientation genes: 0 = packer chooses, 1 = as given, 2 = rotated 90° around Y
+FREE, AS_GIVEN, ROTATED = 0, 1, 2
+
+# (item order as indices into the item list, orientation gene per item)
+Solution = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+
+def _oriented(item: Item, gene: int) -> Item:
+    if gene == AS_GIVEN:
+        return replace(item, rotatable=False)
+    if gene == ROTATED:
+        return replace(item, dims=replace(item.dims, x=item.dims.z, z=item.dims.x), rotatable=False)
+    return item
+
+
+def decode(items: Sequence[Item], solution: Solution, container_bounds: Box3,
+           resolution: float, **packer_options) -> Tuple[List[Placement], List[str], float]:
+    """Place items in the solution's order/orientations; returns (placements, unplaced_ids, used_volume)"""
+    order, genes = solution
+    packer = HeightmapPacker(container_bounds, resolution, **packer_options)
+    placements, unplaced_ids = [], []
+    for index in order:
+        item = items[index]
+        placement = packer.try_place(_oriented(item, genes[index]))
+        if placement is None:
+            unplaced_ids.append(item.id)
+        else:
+            placements.append(placement)
+    return placements, unplaced_ids, packer.used_volume
+
+
+def score(items: Sequence[Item], solution: Solution, container_bounds: Box3,
+          resolution: float, packer_options: dict) -> Tuple[float, float]:
+    """Fitness: packed volume first, then lower stack height (more compact)"""
+    placements, _, used_volume = decode(items, solution, container_bounds, resolution, **packer_options)
+    top = max((p.pose.max.y for p in placements), default=0.0)
+    return used_volume, -top
+
+
+def _score_task(args) -> Tuple[float, float]:
+    """Process-pool worker entry point"""
+    return score(*args)
+
+
+def _neighbour(solution: Solution, rng: random.Random, rotatable: Sequence[bool]) -> Solution:
+    order, genes = list(solution[0]), list(solution[1])
+    n = len(order)
+    move = rng.random()
+    if n > 1 and move < 0.4:
+        a, b = rng.sample(range(n), 2)
+        order[a], order[b] = order[b], order[a]
+    elif n > 1 and move < 0.8:
+        a, b = rng.sample(range(n), 2)
+        order.insert(b, order.pop(a))
+    else:
+        candidates = [i for i in range(n) if rotatable[i]]
+        if candidates:
+            index = rng.choice(candidates)
+            genes[index] = (genes[index] + 1) % 3
+    return tuple(order), tuple(genes)
+
+
+def _evaluate_batch(batch, items, container_bounds, resolution, packer_options, pool, deadline, workers=1):
+    """
+    Scores for a batch of solutions; entries not finished by the deadline are None.
+    At most `workers` evaluations are in the shared pool at once and none is submitted
+    after the deadline, so a run that times out leaves at most that many tasks behind.
+    """
+    if pool is None:
+        scores = []
+        for solution in batch:
+            if time.perf_counter() >= deadline:
+                scores.append(None)
+                continue
+            scores.append(score(items, solution, container_bounds, resolution, packer_options))
+        return scores
+
+    scores = [None] * len(batch)
+    queue = list(enumerate(batch))
+    running = {}
+    while queue or running:
+        remaining = deadline - time.perf_counter()
+        while queue and len(running) < workers and remaining > 0:
+            index, solution = queue.pop(0)
+            running[pool.submit(_score_task, (items, solution, container_bounds, resolution, packer_options))] = index
+        if not running:
+            break  # Deadline reached before the rest could be submitted
+        done, _ = wait(running, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+        for future in done:
+            index = running.pop(future)
+            if future.exception() is None:
+                scores[index] = future.result()
+        if not done:
+            break  # Deadline: leave the (at most `workers`) running tasks to finish on their own
+    for future in running:
+        future.cancel()
+    return scores
+
+
+def iter_pack_items_optimized(items: List[Item], container_bounds: Box3,
+                              time_budget_s: float = 2.0,
+                              batch_size: Optional[int] = None,
+                              workers: Optional[int] = None,
+                              seed: Optional[int] = None,
+                              resolution: Optional[float] = None,
+                              cancel_token: Optional[CancellationToken] = None,
+                              stats: Optional[Dict[str, Any]] = None,
+                              **packer_options) -> Generator[Placement, None, List[str]]:
+    """
+    Simulated annealing over item order and orientation with a hard time budget.
+
+    Strategy:
+    1. Start from the heightmap greedy solution (volume-descending order)
+    2. Each round, evaluate `batch_size` neighbours (swap / insert / rotate) in parallel
+    3. Move to the best neighbour if it improves, or with Boltzmann probability
+    4. When the budget is spent, decode and yield the best solution seen
+
+    Args:
+        items: List of items to pack
+        container_bounds: Container bounding box
+        time_budget_s: Wall-clock budget for the search (the final decode is extra)
+        batch_size: Neighbours per round (default: 2 per worker)
+        workers: 1 evaluates in-process; otherwise the shared process pool is used
+        seed: Random seed for reproducible runs
+        resolution: Heightmap cell size (auto when None)
+        cancel_token: Optional deadline/cancel signal; ends the search early, after which
+                      the best solution so far is still decoded and yielded
+        stats: Filled with the number of rounds and candidates evaluated
+        packer_options: Forwarded to HeightmapPacker (min_support, weight_aware, ...)
+
+    Yields:
+        Placement for every packed item of the best solution
+
+    Returns:
+        List of unplaced item ids (as the generator's StopIteration value)
+    """
+    if not items:
+        return []
+
+    from .parallel import get_process_pool, worker_count
+
+    start = time.perf_counter()
+    deadline = start + max(0.0, float(time_budget_s))
+    if cancel_token is not None and cancel_token.remaining() is not None:
+        deadline = min(deadline, start + cancel_token.remaining())
+    if resolution is None or resolution <= 0:
+        resolution = auto_resolution(items, container_bounds)
+
+    workers = worker_count() if workers is None else max(1, int(workers))
+    pool = get_process_pool() if workers > 1 else None
+    batch_size = max(1, int(batch_size or workers * 2))
+    rng = random.Random(seed)
+
+    index_of = {id(item): index for index, item in enumerate(items)}
+    greedy_order = tuple(index_of[id(item)] for item in sort_for_heightmap(items, packer_options.get('weight_aware', False)))
+    rotatable = [item.rotatable and abs(item.dims.x - item.dims.z) > EPS for item in items]
+
+    current = (greedy_order, tuple(FREE for _ in items))
+    current_score = score(items, current, container_bounds, resolution, packer_options)
+    best, best_score = current, current_score
+
+    # Temperature in units of container volume, cooled geometrically over the budget
+    scale = get_box_volume(container_bounds) or 1.0
+    t_start, t_end = 0.02 * scale, 0.0005 * scale
+    rounds = evaluated = 0
+
+    while time.perf_counter() < deadline and not (cancel_token is not None and cancel_token.cancelled):
+        batch = [_neighbour(current, rng, rotatable) for _ in range(batch_size)]
+        scores = _evaluate_batch(batch, items, container_bounds, resolution, packer_options, pool, deadline, workers)
+        rounds += 1
+
+        scored = [(s, solution) for s, solution in zip(scores, batch) if s is not None]
+        evaluated += len(scored)
+        if not scored:
+            break
+        candidate_score, candidate = max(scored, key=lambda entry: entry[0])
+
+        if candidate_score > best_score:
+            best, best_score = candidate, candidate_score
+
+        progress = min(1.0, (time.perf_counter() - start) / max(time_budget_s, EPS))
+        temperature = t_start * (t_end / t_start) ** progress
+        delta = candidate_score[0] - current_score[0]
+        if candidate_score >= current_score or rng.random() < math.exp(delta / temperature):
+            current, current_score = candidate, candidate_score
+
+    # A cut-short search is still decoded in full: one greedy pass over the best solution
+    stop_requested(cancel_token)
+    placements, unplaced_ids, used_volume = decode(items, best, container_bounds, resolution, **packer_options)
+    print(f"Optimize complete: {rounds} rounds, {evaluated} candidates in "
+          f"{(time.perf_counter() - start):.2f}s; packed volume {used_volume:.0f} "
+          f"({len(placements)} placed, {len(unplaced_ids)} unplaced)")
+
+    if stats is not None:
+        stats.update(rounds=rounds, candidates=evaluated)
+
+    for placement in placements:
+        yield placement
+    return unplaced_ids
@@ -2,85 +2,138 @@
 Simplified packing algorithm using grid-based stacking.
 High CP value: fast, simple, maintainable.
 """
-from typing import List, Tuple
+from typing import Generator, List, Optional, Tuple
 from .types import Item, Box3, Placement, Vec3
-from .utils import vec3, box3, get_box_volume, box_fits_in, boxes_intersect, EPS
+from .utils import vec3, box3, get_box_dims, get_box_volume, EPS
+from .cancellation import CancellationToken, stop_requested
 
 
-def pack_items_simple(items: List[Item], container_bounds: Box3) -> Tuple[List[Placement], List[str]]:
+def pack_items_simple(items: List[Item], container_bounds: Box3,
+                      cancel_token: Optional[CancellationToken] = None) -> Tuple[List[Placement], List[str]]:
     """
     Pack items into container using a simple grid-based stacking algorithm.
+    Collects the output of iter_pack_items_simple() into a list.
+
+    Args:
+        items: List of items to pack (already sorted by user-defined order)
+        container_bounds: Container bounding box
+        cancel_token: Optional deadline/cancel signal; stops early with a partial result
+
+    Returns:
+        Tuple of (placements, unplaced_item_ids)
+    """
+    return drain_placements(iter_pack_items_simple(items, container_bounds, cancel_token))
+
+
+def drain_placements(placement_iter: Generator[Placement, None, List[str]]) -> Tuple[List[Placement], List[str]]:
+    """
+    Run a placement generator to completion.
+
+    Returns:
+        Tuple of (placements, unplaced_item_ids) where the unplaced ids are
+        the generator's return value
+    """
+    placements: List[Placement] = []
+    while True:
+        try:
+            placements.append(next(placement_iter))
+        except StopIteration as stop:
+            return placements, stop.value or []
+
+
+def iter_pack_items_simple(items: List[Item], container_bounds: Box3,
+                           cancel_token: Optional[CancellationToken] = None) -> Generator[Placement, None, List[str]]:
+    """
+    Grid-based stacking that yields each placement as soon as it is made.
     
     Strategy:
     1. Sort items by volume (largest first)
     2. Calculate grid slot size based on largest item dimensions
-    3. Try to place each item in grid positions (Y->Z->X order)
-    4. Skip positions that cause overlaps
+    3. Fill grid positions (Y->Z->X order) with the largest remaining item
+    4. Stop as soon as the items or the slots run out; items larger than the
+       container are set aside up front
+    5. Stop at the next grid position once cancel_token expires; the rest is unplaced
     
     Args:
         items: List of items to pack (already sorted by user-defined order)
         container_bounds: Container bounding box
+        cancel_token: Optional deadline/cancel signal, checked once per grid position
         
+    Yields:
+        Placement for every packed item, in placement order
+
     Returns:
-        Tuple of (placements, unplaced_item_ids)
+        List of unplaced item ids (as the generator's StopIteration value)
     """
     if not items:
-        return [], []
+        return []
     
     # Sort by volume (largest first) for better space utilization
     # But preserve original order information in metadata
     sorted_items = sorted(items, key=lambda i: get_box_volume(Box3(min=Vec3(), max=i.dims)), reverse=True)
     
+    # Items larger than the empty container along some axis can never be placed;
+    # setting them aside keeps them from inflating the slot size for everyone else
+    container_dims = get_box_dims(container_bounds)
+    fitting_items = [
+        item for item in sorted_items
+        if item.dims.x <= container_dims.x + EPS
+        and item.dims.y <= container_dims.y + EPS
+        and item.dims.z <= container_dims.z + EPS
+    ]
+    
     # Calculate slot dimensions based on largest item
-    max_w = max((item.dims.x for item in sorted_items), default=0)
-    max_h = max((item.dims.y for item in sorted_items), default=0)
-    max_d = max((item.dims.z for item in sorted_items), default=0)
+    max_w = max((item.dims.x for item in fitting_items), default=0)
+    max_h = max((item.dims.y for item in fitting_items), default=0)
+    max_d = max((item.dims.z for item in fitting_items), default=0)
     slot_dims = vec3(max_w, max_h, max_d)
     
     # Validate slot dimensions
     if slot_dims.x < EPS or slot_dims.y < EPS or slot_dims.z < EPS:
         print(f"Warning: Invalid slot dimensions {slot_dims}, cannot pack items")
-        return [], [item.id for item in sorted_items]
+        return [item.id for item in sorted_items]
+    
+    # Capacity bound: every fitting item fits inside one slot, so at most one item per slot
+    slot_count = 1
+    for extent, slot in ((container_dims.x, slot_dims.x), (container_dims.y, slot_dims.y), (container_dims.z, slot_dims.z)):
+        slot_count *= int(extent / slot + EPS)
+    print(f"Grid capacity: {slot_count} slots for {len(fitting_items)} items "
+          f"({len(sorted_items) - len(fitting_items)} larger than the container)")
     
     placements: List[Placement] = []
     placed_item_ids = set()
     
     # Grid-based placement loop: Z(外層) → X(中層) → Y(內層)
     # 這樣實現「先填滿 XY 平面，再往 Z 軸堆疊」
+    # Slots never overlap and each remaining item fits any slot, so every position takes the
+    # largest remaining item outright (no overlap scan) and the loop ends as soon as the items
+    # or the slots run out.
     
+    next_index = 0
+    stopped = False
     current_z = container_bounds.min.z
-    while current_z + slot_dims.z <= container_bounds.max.z + EPS:
+    while not stopped and next_index < len(fitting_items) and current_z + slot_dims.z <= container_bounds.max.z + EPS:
         
         current_x = container_bounds.min.x
-        while current_x + slot_dims.x <= container_bounds.max.x + EPS:
+        while not stopped and next_index < len(fitting_items) and current_x + slot_dims.x <= container_bounds.max.x + EPS:
             
             current_y = container_bounds.min.y
-            while current_y + slot_dims.y <= container_bounds.max.y + EPS:
+            while next_index < len(fitting_items) and current_y + slot_dims.y <= container_bounds.max.y + EPS:
+                
+                if stop_requested(cancel_token):
+                    stopped = True
+                    break
                 
-                # Try to place an item at this grid position
-                for item in sorted_items:
-                    if item.id in placed_item_ids:
-                        continue
-                    
-                    # Calculate item pose at current position
-                    item_pose = box3(
-                        min_vec=vec3(current_x, current_y, current_z),
-                        max_vec=vec3(current_x + item.dims.x, current_y + item.dims.y, current_z + item.dims.z)
-                    )
-                    
-                    # Check if item fits in container
-                    if not box_fits_in(item_pose, container_bounds):
-                        continue
-                    
-                    # Check for overlaps with already placed items
-                    is_overlapping = any(boxes_intersect(item_pose, p.pose) for p in placements)
-                    
-                    if not is_overlapping:
-                        # Successfully place the item
-                        placement = Placement(item_id=item.id, pose=item_pose)
-                        placements.append(placement)
-                        placed_item_ids.add(item.id)
-                        break  # Move to next grid position
+                item = fitting_items[next_index]
+                item_pose = box3(
+                    min_vec=vec3(current_x, current_y, current_z),
+                    max_vec=vec3(current_x + item.dims.x, current_y + item.dims.y, current_z + item.dims.z)
+                )
+                placement = Placement(item_id=item.id, pose=item_pose)
+                placements.append(placement)
+                placed_item_ids.add(item.id)
+                next_index += 1
+                yield placement
                 
                 current_y += slot_dims.y
             current_x += slot_dims.x
@@ -90,5 +143,5 @@ def pack_items_simple(items: List[Item], container_bounds: Box3) -> Tuple[List[P
     # Collect unplaced items
     unplaced_ids = [item.id for item in sorted_items if item.id not in placed_item_ids]
     
-    print(f"Packing complete: {len(placements)} placed, {len(unplaced_ids)} unplaced")
-    return placements, unplaced_ids
+    print(f"Packing {'stopped early' if stopped else 'complete'}: {len(placements)} placed, {len(unplaced_ids)} unplaced")
+    return unplaced_ids
@@ -0,0 +1,43 @@
+"""
+Shared process pool for CPU-bound packing work.
+One pool per server process, created on first use and sized by PACKING_WORKERS
+(default: CPU count), so concurrent requests share cores instead of each
+spawning their own workers.
+"""
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """Configured number of packing worker processes"""
+    configured = os.getenv('PACKING_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    return max(1, os.cpu_count() or 1)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count())
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared pool (registered at exit)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+atexit.register(shutdown_process_pool)
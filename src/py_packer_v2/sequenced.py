@@ -0,0 +1,175 @@
+"""
+Sequence-respecting packing for dock loading.
+Items are placed strictly in their user-defined order (Item.order) and each one
+must be reachable from the door when it is loaded: no earlier item may stand in
+the corridor between its footprint and the door. The corridor test is answered
+for every candidate position at once from a running max of the height map
+toward the door (the accessibility index), so the mode costs about the same as
+plain heightmap packing.
+"""
+from typing import Generator, List, Optional, Tuple
+
+import numpy as np
+
+from .types import Item, Box3, Placement
+from .utils import vec3, box3, EPS
+from .heightmap import HeightMap, auto_resolution, window_max, _running_max, _cells
+from .cancellation import CancellationToken, stop_requested
+
+# Door wall of the zone: the side items are loaded through
+DOORS = ('+x', '-x', '+z', '-z')
+
+
+def corridor_max(heights: np.ndarray, wx: int, wz: int, door: str) -> np.ndarray:
+    """
+    Tallest stack between every wx*wz footprint and the door.
+    Result[i, j] covers the cells from the footprint with min corner (i, j) to the
+    door wall, across the footprint's width; 0 when the footprint touches the door.
+    Same shape as window_max(heights, wx, wz).
+    """
+    if door in ('+z', '-z'):
+        return corridor_max(heights.T, wz, wx, '+x' if door == '+z' else '-x').T
+
+    nx = heights.shape[0]
+    zeros = np.zeros((1, heights.shape[1]), dtype=heights.dtype)
+    if door == '+x':
+        # toward_door[i] = max of rows i.. nx-1; footprint (i, wx) needs rows i+wx..
+        toward_door = np.concatenate([np.maximum.accumulate(heights[::-1], axis=0)[::-1], zeros])
+        lines = toward_door[wx:wx + nx - wx + 1]
+    else:
+        # toward_door[i] = max of rows 0..i-1
+        toward_door = np.concatenate([zeros, np.maximum.accumulate(heights, axis=0)])
+        lines = toward_door[:nx - wx + 1]
+    return _running_max(lines, wz, 1)
+
+
+def _depth_key(i: int, j: int, door: str) -> int:
+    """Smaller is farther from the door (loaded first)"""
+    return {'+x': i, '-x': -i, '+z': j, '-z': -j}[door]
+
+
+def _find_accessible(height_map: HeightMap, dx: float, dy: float, dz: float, door: str,
+                     min_support: float, require_access: bool) -> Optional[Tuple[int, int, float]]:
+    """Deepest, then lowest feasible position whose door corridor is clear (when required)"""
+    wx = _cells(dx, height_map.resolution)
+    wz = _cells(dz, height_map.resolution)
+    if wx > height_map.nx or wz > height_map.nz:
+        return None
+
+    bases = window_max(height_map.heights, wx, wz)
+    feasible = bases + dy <= height_map.max_height + height_map.tol
+    if require_access:
+        feasible &= corridor_max(height_map.heights, wx, wz, door) <= bases + height_map.tol
+    if not feasible.any():
+        return None
+
+    candidates = np.nonzero(feasible)
+    candidate_bases = bases[candidates]
+    depth = {'+x': candidates[0], '-x': -candidates[0], '+z': candidates[1], '-z': -candidates[1]}[door]
+    lateral = candidates[1] if door in ('+x', '-x') else candidates[0]
+    order = np.lexsort((lateral, candidate_bases, depth))
+
+    for k in order:
+        i, j = int(candidates[0][k]), int(candidates[1][k])
+        base = candidate_bases[k].item()
+        if min_support > 0 and base > height_map.tol:
+            footprint = height_map.heights[i:i + wx, j:j + wz]
+            support = np.count_nonzero(footprint >= base - height_map.tol) / footprint.size
+            if support + EPS < min_support:
+                continue
+        return i, j, base
+    return None
+
+
+def iter_pack_items_sequenced(items: List[Item], container_bounds: Box3,
+                              door: str = '+x',
+                              strict: bool = True,
+                              resolution: Optional[float] = None,
+                              min_support: float = 0.0,
+                              cancel_token: Optional[CancellationToken] = None,
+                              exact: bool = False) -> Generator[Placement, None, List[str]]:
+    """
+    Load items in their user-defined order, back of the zone first.
+
+    Strategy:
+    1. Keep items in Item.order (the loading sequence); never re-sort by size
+    2. For each item (and its Y-axis rotation), find positions resting on the
+       height map whose corridor to the door is clear of earlier items
+    3. Take the deepest such position, then the lowest, then the leftmost
+       (builds walls from the back toward the door)
+
+    Args:
+        items: List of items to pack, in loading order
+        container_bounds: Container bounding box (Y is up)
+        door: Door wall: '+x' (default), '-x', '+z' or '-z'
+        strict: True makes door access a hard constraint (an item without an
+                accessible position is unplaced); False falls back to any
+                position and counts the violation
+        resolution: Grid cell size in container units (auto when None)
+        min_support: Minimum supported fraction of the footprint (0 disables)
+        cancel_token: Optional deadline/cancel signal, checked before each item
+        exact: Integer (fixed-point) inputs; see fixedpoint.iter_pack_fixed_point
+
+    Yields:
+        Placement for every packed item, in loading order
+
+    Returns:
+        List of unplaced item ids (as the generator's StopIteration value)
+    """
+    if door not in DOORS:
+        raise ValueError(f"Unknown door '{door}'. Available: {list(DOORS)}")
+    if not items:
+        return []
+
+    if resolution is None or resolution <= 0:
+        resolution = auto_resolution(items, container_bounds)
+
+    height_map = HeightMap(container_bounds, resolution, exact)
+    resolution = height_map.resolution
+    sequence = sorted(items, key=lambda item: item.order)
+    unplaced_ids = []
+    violations = 0
+
+    for position, item in enumerate(sequence):
+        if stop_requested(cancel_token):
+            unplaced_ids.extend(i.id for i in sequence[position:])
+            break
+
+        orientations = [(item.dims.x, item.dims.z)]
+        if item.rotatable and abs(item.dims.x - item.dims.z) > EPS:
+            orientations.append((item.dims.z, item.dims.x))
+
+        best = None
+        for require_access in ((True,) if strict else (True, False)):
+            for dx, dz in orientations:
+                found = _find_accessible(height_map, dx, item.dims.y, dz, door, min_support, require_access)
+                if found is None:
+                    continue
+                i, j, base = found
+                key = (_depth_key(i, j, door), base, j if door in ('+x', '-x') else i)
+                if best is None or key < best[0]:
+                    best = (key, i, j, base, dx, dz)
+            if best is not None:
+                violations += not require_access
+                break
+
+        if best is None:
+            unplaced_ids.append(item.id)
+            continue
+
+        _, i, j, base, dx, dz = best
+        min_x = height_map.origin.x + i * resolution
+        min_z = height_map.origin.z + j * resolution
+        min_y = height_map.origin.y + base
+        height_map.place(i, j, dx, dz, base + item.dims.y)
+        yield Placement(
+            item_id=item.id,
+            pose=box3(
+                min_vec=vec3(min_x, min_y, min_z),
+                max_vec=vec3(min_x + dx, min_y + item.dims.y, min_z + dz)
+            )
+        )
+
+    print(f"Sequenced packing complete: {len(sequence) - len(unplaced_ids)} placed, "
+          f"{len(unplaced_ids)} unplaced, {violations} door-access violations (door {door})")
+    return unplaced_ids
@@ -0,0 +1,265 @@
+"""
+Shared-memory transfer of packing inputs and outputs.
+Items and placements are laid out as NumPy structured arrays in
+multiprocessing.shared_memory blocks; workers receive only the block names
+(a few bytes), read items and write placements in place, so nothing per item
+is pickled in either direction. A shared one-byte flag carries cancellation.
+"""
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .types import Item, Box3, Placement
+from .utils import vec3, box3
+from .cancellation import CancellationToken
+
+# One row per item; string ids and group ids stay in the parent (rows are referenced by index)
+ITEM_DTYPE = np.dtype([
+    ('dims', '<f8', (3,)),
+    ('weight', '<f8'),
+    ('max_load', '<f8'),   # NaN = unlimited
+    ('order', '<i8'),
+    ('group', '<i8'),      # Index into the parent's group id list
+    ('rotatable', '?'),
+])
+
+# One row per item, written by the worker at the item's row index
+PLACEMENT_DTYPE = np.dtype([
+    ('placed', '?'),
+    ('sequence', '<i8'),   # Placement order (unplaced rows: order in the engine's unplaced list)
+    ('min', '<f8', (3,)),
+    ('max', '<f8', (3,)),
+])
+
+# (shared memory block name, shape, dtype description)
+Handle = Tuple[str, Tuple[int, ...], Any]
+
+
+class SharedArray:
+    """A NumPy array backed by a shared memory block; pass `handle` to other processes"""
+
+    def __init__(self, block: shared_memory.SharedMemory, shape: Tuple[int, ...], dtype: np.dtype, owner: bool):
+        self.block = block
+        self.owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], dtype: np.dtype) -> 'SharedArray':
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, owner=True)
+        shared.array[...] = np.zeros((), dtype=dtype)
+        return shared
+
+    @classmethod
+    def attach(cls, handle: Handle) -> 'SharedArray':
+        name, shape, descr = handle
+        # Pool workers share the parent's resource tracker, so attaching needs no unregistering;
+        # the creating process alone unlinks
+        block = shared_memory.SharedMemory(name=name)
+        return cls(block, shape, np.dtype(descr), owner=False)
+
+    @property
+    def handle(self) -> Handle:
+        dtype = self.array.dtype
+        return self.block.name, self.array.shape, dtype.descr if dtype.names else dtype.str
+
+    def close(self) -> None:
+        """Release this process's view; the owner also frees the block"""
+        self.array = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SharedCancellationToken(CancellationToken):
+    """CancellationToken that also honours a cancel flag set from another process"""
+
+    def __init__(self, flag: np.ndarray, time_limit_s: Optional[float] = None):
+        super().__init__(time_limit_s)
+        self.flag = flag
+
+    def expired(self) -> bool:
+        if not self.truncated and self.flag[0]:
+            self.cancel()
+        return super().expired()
+
+
+def items_to_array(items: Sequence[Item], out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[str], List[str]]:
+    """Write items into a structured array; returns (array, item ids, group ids by group index)"""
+    groups = sorted({item.group_id for item in items})
+    group_index = {group: index for index, group in enumerate(groups)}
+    array = np.zeros(len(items), dtype=ITEM_DTYPE) if out is None else out
+    array['dims'] = [(i.dims.x, i.dims.y, i.dims.z) for i in items]
+    array['weight'] = [i.weight for i in items]
+    array['max_load'] = [np.nan if i.max_load is None else i.max_load for i in items]
+    array['order'] = [i.order for i in items]
+    array['group'] = [group_index[i.group_id] for i in items]
+    array['rotatable'] = [i.rotatable for i in items]
+    return array, [item.id for item in items], groups
+
+
+def array_to_items(array: np.ndarray, ids: Optional[Sequence[str]] = None,
+                   groups: Optional[Sequence[str]] = None) -> List[Item]:
+    """Items from a structured array; without ids, each item's id is its row index"""
+    items = []
+    for row, record in enumerate(array.tolist()):
+        dims, weight, max_load, order, group, rotatable = record
+        items.append(Item(
+            id=ids[row] if ids is not None else str(row),
+            group_id=groups[group] if groups is not None else str(group),
+            dims=vec3(*dims),
+            rotatable=bool(rotatable),
+            weight=weight,
+            order=order,
+            max_load=None if max_load != max_load else max_load  # NaN check
+        ))
+    return items
+
+
+def array_to_placements(array: np.ndarray, ids: Sequence[str]) -> Tuple[List[Placement], List[str]]:
+    """(placements in placement order, unplaced ids) from a placement array"""
+    placed_rows = np.nonzero(array['placed'])[0]
+    placed_rows = placed_rows[np.argsort(array['sequence'][placed_rows], kind='stable')]
+    placements = [
+        Placement(item_id=ids[row], pose=box3(min_vec=vec3(*low), max_vec=vec3(*high)))
+        for row, (_, _, low, high) in zip(placed_rows.tolist(), array[placed_rows].tolist())
+    ]
+    unplaced_rows = np.nonzero(~array['placed'])[0]
+    unplaced_rows = unplaced_rows[np.argsort(array['sequence'][unplaced_rows], kind='stable')]
+    unplaced_ids = [ids[row] for row in unplaced_rows.tolist()]
+    return placements, unplaced_ids
+
+
+def _bounds_tuple(bounds: Box3) -> Tuple[float, ...]:
+    return (bounds.min.x, bounds.min.y, bounds.min.z, bounds.max.x, bounds.max.y, bounds.max.z)
+
+
+def pack_shared_task(args) -> Dict[str, Any]:
+    """
+    Process-pool worker: pack the items in a shared array and write placements in place.
+    Arguments and return value are small (handles, options, counters).
+    """
+    from .main import resolve_engine, _engine_stats
+
+    mode, options, items_handle, out_handle, cancel_handle, groups, bounds, time_limit_s = args
+    start = time.perf_counter()
+    items_shared = SharedArray.attach(items_handle)
+    out_shared = SharedArray.attach(out_handle)
+    cancel_shared = SharedArray.attach(cancel_handle)
+    try:
+        engine, engine_options = resolve_engine(mode, options)
+        stats = _engine_stats(engine, engine_options)
+        token = SharedCancellationToken(cancel_shared.array, time_limit_s)
+        container_bounds = box3(min_vec=vec3(*bounds[:3]), max_vec=vec3(*bounds[3:]))
+        # Row indices stand in for item ids; group ids are few and travel with the task
+        items = array_to_items(items_shared.array, groups=groups)
+
+        out = out_shared.array
+        placement_iter = engine(items, container_bounds, cancel_token=token, **engine_options)
+        placed = 0
+        while True:
+            try:
+                placement = next(placement_iter)
+            except StopIteration as stop:
+                unplaced_rows = [int(item_id) for item_id in (stop.value or [])]
+                break
+            pose = placement.pose
+            out[int(placement.item_id)] = (True, placed, (pose.min.x, pose.min.y, pose.min.z), (pose.max.x, pose.max.y, pose.max.z))
+            placed += 1
+        # Keep the engine's unplaced order too
+        out['sequence'][unplaced_rows] = np.arange(len(unplaced_rows))
+        return {'placed': placed, 'truncated': token.truncated, 'stats': stats or {},
+                'elapsed_s': time.perf_counter() - start}
+    finally:
+        out_shared.close()
+        items_shared.close()
+        cancel_shared.close()
+
+
+def pack_in_shared_memory(jobs: Sequence[Tuple[List[Item], Box3, Optional[Dict[str, Any]]]], mode: str,
+                          workers: Optional[int] = None,
+                          cancel_token: Optional[CancellationToken] = None) -> List[Dict[str, Any]]:
+    """
+    Pack several independent (items, bounds) jobs in parallel through shared memory.
+
+    Args:
+        jobs: One (items, container bounds, engine options) triple per zone;
+              pool-using engines run single-process inside workers
+        mode: Placement engine name (see PACKING_MODES)
+        workers: Jobs in flight at once (default: pool size)
+        cancel_token: Cancelling it sets the shared flag every worker polls;
+                      its deadline is passed on as each job's time limit
+
+    Returns:
+        Per job: {'placements', 'unplaced_ids', 'truncated', 'stats', 'elapsed_s'}
+    """
+    from concurrent.futures import wait, FIRST_COMPLETED
+    from concurrent.futures.process import BrokenProcessPool
+    from .parallel import get_process_pool, shutdown_process_pool, worker_count
+
+    workers = worker_count() if workers is None else max(1, int(workers))
+
+    cancel_flag = SharedArray.create((1,), np.dtype('?'))
+    shared = []
+    try:
+        tasks = []
+        for items, bounds, options in jobs:
+            options = dict(options or {})
+            if mode in ('optimize', 'multistart'):
+                options['workers'] = 1  # Workers cannot use the shared pool themselves
+            items_shared = SharedArray.create((len(items),), ITEM_DTYPE)
+            out_shared = SharedArray.create((len(items),), PLACEMENT_DTYPE)
+            shared.extend([items_shared, out_shared])
+            _, ids, groups = items_to_array(items, items_shared.array)
+            tasks.append((ids, items_shared, out_shared, groups, bounds, options))
+
+        pool = get_process_pool()
+        pending = list(range(len(tasks)))
+        running = {}
+        outcomes: Dict[int, Dict[str, Any]] = {}
+        while pending or running:
+            while pending and len(running) < workers:
+                index = pending.pop(0)
+                _, items_shared, out_shared, groups, bounds, options = tasks[index]
+                time_limit_s = cancel_token.remaining() if cancel_token is not None else None
+                future = pool.submit(pack_shared_task, (
+                    mode, options, items_shared.handle, out_shared.handle, cancel_flag.handle,
+                    groups, _bounds_tuple(bounds), time_limit_s
+                ))
+                running[future] = index
+            done, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+            if cancel_token is not None and cancel_token.cancelled:
+                cancel_flag.array[0] = True
+            for future in done:
+                outcomes[running.pop(future)] = future.result()
+    except BrokenProcessPool:
+        shutdown_process_pool()  # Next call starts a fresh pool
+        raise
+    else:
+        results = []
+        for index, (ids, _, out_shared, *_) in enumerate(tasks):
+            placements, unplaced_ids = array_to_placements(out_shared.array, ids)
+            outcome = outcomes[index]
+            results.append({
+                'placements': placements,
+                'unplaced_ids': unplaced_ids,
+                'truncated': outcome['truncated'],
+                'stats': outcome['stats'],
+                'elapsed_s': outcome['elapsed_s']
+            })
+        if cancel_token is not None and any(r['truncated'] for r in results) and not cancel_token.expired():
+            # A worker hit the deadline a moment before this process did
+            cancel_token.truncated, cancel_token.reason = True, 'deadline'
+        return results
+    finally:
+        for block in shared:
+            block.close()
+        cancel_flag.close()
@@ -0,0 +1,121 @@
+"""
+Support graph for load-bearing checks.
+Each placed item is a node; edges point to the items it rests on, weighted by
+the fraction of its contact area on each (one item's fractions sum to at most 1).
+Loads are maintained incrementally, together with each node's floor: the least
+headroom of the node and everything below it. As no more than a new item's
+weight can reach any node underneath, most checks only read the direct
+supporters; the full walk down the stack runs only near a load limit.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from .utils import EPS
+
+# (supporter node index, fraction of the weight it carries)
+Support = Tuple[int, float]
+
+
+class SupportGraph:
+    """Directed acyclic graph of 'rests on' relations with per-node load tracking"""
+
+    def __init__(self):
+        self.weights: List[float] = []
+        self.max_loads: List[Optional[float]] = []
+        self.loads: List[float] = []
+        self.supporters: List[List[Support]] = []
+        self.supported: List[List[int]] = []  # nodes resting on each node
+        self.floors: List[float] = []  # least headroom of the node and all nodes below
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def headroom(self, node: int) -> float:
+        """Additional weight a node can carry (inf when it has no max_load)"""
+        max_load = self.max_loads[node]
+        if max_load is None:
+            return float('inf')
+        return max_load - self.loads[node]
+
+    def _flows(self, supports: List[Support], weight: float, check: bool = True) -> Optional[Dict[int, float]]:
+        """
+        Weight that every node below a new item would receive.
+        Supporters always have smaller indices than the items resting on them,
+        so nodes are resolved highest-index first; flows from different paths
+        merge before a node is checked. With `check`, returns None on the first overload.
+        """
+        pending: Dict[int, float] = {}
+        heap: List[int] = []
+        for node, fraction in supports:
+            if node not in pending:
+                heapq.heappush(heap, -node)
+                pending[node] = 0.0
+            pending[node] += weight * fraction
+
+        flows: Dict[int, float] = {}
+        while heap:
+            node = -heapq.heappop(heap)
+            flow = pending.pop(node)
+            if check and flow > self.headroom(node) + EPS:
+                return None
+            flows[node] = flow
+            for below, fraction in self.supporters[node]:
+                if below not in pending:
+                    heapq.heappush(heap, -below)
+                    pending[below] = 0.0
+                pending[below] += flow * fraction
+        return flows
+
+    def can_carry(self, supports: List[Support], weight: float) -> bool:
+        """Whether placing `weight` on `supports` keeps every node below within its max_load"""
+        if weight <= 0 or not supports:
+            return True
+        # Cheap first pass on the direct neighbours before walking further down
+        for node, fraction in supports:
+            if weight * fraction > self.headroom(node) + EPS:
+                return False
+        # Any node below receives at most `weight`, so clearing every floor settles it
+        if all(weight <= self.floors[node] + EPS for node, _ in supports):
+            return True
+        return self._flows(supports, weight) is not None
+
+    def _update_floors(self, changed: List[int]) -> None:
+        """
+        Recompute the floors of `changed` and of the nodes above them, lowest index
+        first (every node's supporters are final before it is visited), going up
+        only from floors that actually moved.
+        """
+        heap = list(changed)
+        heapq.heapify(heap)
+        visited = set()
+        while heap:
+            node = heapq.heappop(heap)
+            if node in visited:
+                continue
+            visited.add(node)
+            floor = min([self.headroom(node)] + [self.floors[below] for below, _ in self.supporters[node]])
+            if floor != self.floors[node]:
+                self.floors[node] = floor
+                for above in self.supported[node]:
+                    heapq.heappush(heap, above)
+
+    def add(self, weight: float, max_load: Optional[float], supports: List[Support]) -> int:
+        """Insert a node resting on `supports` and push its weight down the graph"""
+        node = len(self.weights)
+        self.weights.append(weight)
+        self.max_loads.append(max_load)
+        self.loads.append(0.0)
+        self.supporters.append(list(supports))
+        self.supported.append([])
+        self.floors.append(float('nan'))  # differs from any value, so it is always computed
+        for below in {below for below, _ in supports}:
+            self.supported[below].append(node)
+
+        changed = [node]
+        if weight > 0 and supports:
+            flows = self._flows(supports, weight, check=False)
+            for below, flow in flows.items():
+                self.loads[below] += flow
+            changed.extend(flows)
+        self._update_floors(changed)
+        return node
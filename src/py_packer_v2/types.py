@@ -33,8 +33,9 @@ class Item:
     group_id: str
     dims: Vec3
     rotatable: bool = True
-    weight: int = 0
+    weight: float = 0
     order: int = 0
+    max_load: Optional[float] = None  # Max weight that may rest on top (None = unlimited)
     meta: Dict[str, any] = field(default_factory=dict)
 
 
@@ -92,3 +93,8 @@ class PackingResult:
     packed_count: int
     unpacked_count: int
     items: List[Union[PackedObject, UnpackedObject]]
+    truncated: bool = False  # Stopped early by a deadline or cancellation (partial result)
+    # Lower bounds (containers needed, packable volume) and the gap of this result to them
+    bounds: Dict[str, float] = field(default_factory=dict)
+    # Engine-reported run details (e.g. the winning multi-start strategy)
+    stats: Dict[str, any] = field(default_factory=dict)
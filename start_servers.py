@@ -1,194 +1,301 @@
 """
 統一啟動腳本 - 同時啟動前端和後端服務器
 Unified Server Startup Script - Start both frontend and backend servers
+
+Usage: python start_servers.py [--reset-db] [--workers N] [--production]
+  --reset-db    清空資料庫後啟動 (clear all data on startup; default keeps it)
+  --workers N   後端工作進程數 (backend worker processes; worker i listens on 8888 + i)
+  --production  以正式模式啟動後端 (src.api_server_v2.serve: the N workers share port 8888)
+
+The script supervises its children: their output is streamed as it arrives,
+readiness is checked against each server's URL instead of a fixed wait, and a
+crashed backend worker is restarted (with backoff) without touching the data.
 """
+import argparse
 import subprocess
 import sys
+import threading
 import time
 import os
+import urllib.error
+import urllib.request
 from pathlib import Path
 
+BACKEND_PORT = 8888
+FRONTEND_PORT = 5173
+READY_TIMEOUT_S = 30
+MAX_RESTART_DELAY_S = 30
+STABLE_AFTER_S = 60  # a worker up this long gets its restart backoff reset
+
+_print_lock = threading.Lock()
+
+
+def log(*lines):
+    """Print whole lines from any thread without interleaving"""
+    with _print_lock:
+        for line in lines:
+            print(line)
+        sys.stdout.flush()
+
+
+class ManagedProcess:
+    """One supervised child process with its output pumped by reader threads"""
+
+    def __init__(self, name, command, cwd, env=None, ready_url=None, shell=False, restart=False):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.ready_url = ready_url
+        self.shell = shell
+        self.restart = restart
+        self.process = None
+        self.started_at = None
+        self.restart_delay_s = 1
+        self.next_restart_at = None
+
+    def start(self, extra_env=None):
+        env = self.env if extra_env is None else {**(self.env or os.environ), **extra_env}
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=self.cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            shell=self.shell
+        )
+        self.started_at = time.monotonic()
+        self.next_restart_at = None
+        # Drain both pipes continuously so a chatty child never blocks on a full pipe
+        for stream in (self.process.stdout, self.process.stderr):
+            threading.Thread(target=self._pump, args=(stream,), daemon=True).start()
+
+    def _pump(self, stream):
+        for line in iter(stream.readline, ''):
+            log(f"[{self.name}] {line.rstrip()}")
+        stream.close()
+
+    def exited(self):
+        return self.process is not None and self.process.poll() is not None
+
+    def wait_until_ready(self, timeout_s=READY_TIMEOUT_S):
+        """Poll ready_url until it answers; False if the process exits or time runs out"""
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if self.exited():
+                return False
+            if self.ready_url is None:
+                return True
+            try:
+                with urllib.request.urlopen(self.ready_url, timeout=1) as response:
+                    if response.status < 500:
+                        return True
+            except (urllib.error.URLError, OSError):
+                pass
+            time.sleep(0.2)
+        return False
+
+    def schedule_restart(self):
+        """Exponential backoff, reset once the worker had been running for a while"""
+        if time.monotonic() - self.started_at >= STABLE_AFTER_S:
+            self.restart_delay_s = 1
+        self.next_restart_at = time.monotonic() + self.restart_delay_s
+        delay = self.restart_delay_s
+        self.restart_delay_s = min(self.restart_delay_s * 2, MAX_RESTART_DELAY_S)
+        return delay
+
+    def stop(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        log(f"   停止 {self.name}...")
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+            log(f"   ✓ {self.name} 已停止")
+        except subprocess.TimeoutExpired:
+            log(f"   ⚠️ {self.name} 強制終止")
+            self.process.kill()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="3D Packing System - unified startup")
+    parser.add_argument('--reset-db', action='store_true', help="clear all data on startup")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('BACKEND_WORKERS') or 1),
+                        help="number of backend worker processes (default 1)")
+    parser.add_argument('--production', action='store_true',
+                        help="serve the backend with src.api_server_v2.serve instead of the dev server")
+    args = parser.parse_args()
+    args.reset_db = args.reset_db or os.getenv('RESET_DB') == '1'
+    args.workers = max(1, args.workers)
+    return args
+
+
 def main():
+    args = parse_args()
+
     print("=" * 70)
     print("  3D Packing System - 統一啟動程序")
     print("  3D Packing System - Unified Startup")
     print("=" * 70)
     print()
     sys.stdout.flush()  # 強制立即輸出
-    
+
     # Get project root directory
     project_root = Path(__file__).parent
     backend_dir = project_root / "src" / "api_server_v2"
-    
+
     # Check if backend directory exists
     if not backend_dir.exists():
         print(f"❌ 錯誤：找不到後端目錄 {backend_dir}")
         print(f"❌ Error: Backend directory not found at {backend_dir}")
         sys.stdout.flush()
         sys.exit(1)
-    
+
     processes = []
-    
+
     try:
-        # Start Flask backend server
+        # Start Flask backend workers
         print("🔧 啟動後端服務器 (Flask)...")
         print("🔧 Starting backend server (Flask)...")
         print(f"   目錄: {backend_dir}")
-        print(f"   端口: 8888")
+        # The production server runs its workers behind one port; dev servers get a port each
+        instances = 1 if args.production else args.workers
+        print(f"   端口: {BACKEND_PORT}" + (f"-{BACKEND_PORT + instances - 1}" if instances > 1 else ""))
+        print(f"   工作進程: {args.workers}" + (" (production)" if args.production else ""))
         print()
         sys.stdout.flush()
-        
-        # Copy environment and set RESET_DB=1 to clear database on startup  
+
+        # Copy environment; data is kept across restarts unless --reset-db is given
         env = os.environ.copy()
+        env.pop('RESET_DB', None)  # only the first start of worker 1 may reset
         env['PYTHONPATH'] = str(project_root)
         env['PYTHONIOENCODING'] = 'utf-8'  # Fix Unicode issues on Windows
-        env['RESET_DB'] = '1'  # 🔴 清空資料庫（只在 start_servers.py 啟動時）
-        
-        print("   ⚠️  RESET_DB=1 - 資料庫將被清空")
+        env['BACKEND_RELOADER'] = '0'  # restarts are handled here, not by the debug reloader
+        if args.reset_db:
+            print("   ⚠️  RESET_DB=1 - 資料庫將被清空")
+        else:
+            print("   ✓ 保留現有資料 (使用 --reset-db 清空資料庫)")
         print()
         sys.stdout.flush()
-        
-        print("   正在啟動後端進程...")
-        sys.stdout.flush()
-        
-        backend_process = subprocess.Popen(
-            [sys.executable, "-m", "src.api_server_v2.app"],
-            cwd=str(project_root),  # Run from project root
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
-        )
-        processes.append(("Backend", backend_process))
-        
-        # Wait and check if backend started successfully
-        print("   等待後端啟動...")
-        sys.stdout.flush()
-        
-        for i in range(3):
-            time.sleep(1)
-            print(f"   ... {i+1}秒")
-            sys.stdout.flush()
-            if backend_process.poll() is not None:
-                break
-        
-        if backend_process.poll() is not None:
-            # Backend crashed, show error
-            stdout, stderr = backend_process.communicate()
-            print("\n❌ 後端啟動失敗！錯誤信息：")
-            print("=" * 70)
-            if stdout:
-                print("STDOUT:")
-                print(stdout)
-            if stderr:
-                print("STDERR:")
-                print(stderr)
-            print("=" * 70)
-            print("\n請檢查後端配置和依賴是否正確安裝。")
-            print("您可以單獨運行後端查看詳細錯誤：")
-            print(f"  cd {project_root}")
-            print(f"  python -m src.api_server_v2.app")
-            sys.stdout.flush()
-            sys.exit(1)
-        
-        print("   ✓ 後端啟動成功")
+
+        # Workers start one after another so only the first one migrates (or resets) the schema
+        if args.production:
+            command = [sys.executable, "-m", "src.api_server_v2.serve", "--workers", str(args.workers)]
+        else:
+            command = [sys.executable, "-m", "src.api_server_v2.app"]
+        for index in range(instances):
+            port = BACKEND_PORT + index
+            worker = ManagedProcess(
+                f"Backend-{index + 1}" if instances > 1 else "Backend",
+                command,
+                cwd=str(project_root),  # Run from project root
+                env={**env, 'BACKEND_PORT': str(port)},
+                ready_url=f"http://127.0.0.1:{port}/health",
+                restart=True
+            )
+            log(f"   正在啟動 {worker.name} (port {port})...")
+            worker.start({'RESET_DB': '1'} if args.reset_db and index == 0 else None)
+            processes.append(worker)
+
+            if not worker.wait_until_ready():
+                log("",
+                    f"❌ {worker.name} 啟動失敗！(輸出見上方 / see output above)",
+                    "=" * 70,
+                    "請檢查後端配置和依賴是否正確安裝。",
+                    "您可以單獨運行後端查看詳細錯誤：",
+                    f"  cd {project_root}",
+                    f"  python -m src.api_server_v2.app")
+                raise SystemExit(1)
+            log(f"   ✓ {worker.name} 啟動成功 ({time.monotonic() - worker.started_at:.1f}s)")
         print()
-        sys.stdout.flush()
-        
+
         # Start Vite frontend server
         print("🎨 啟動前端服務器 (Vite)...")
         print("🎨 Starting frontend server (Vite)...")
         print(f"   目錄: {project_root}")
-        print(f"   端口: 5173")
+        print(f"   端口: {FRONTEND_PORT}")
         print()
-        
+        sys.stdout.flush()
+
         # On Windows, npm needs to be run through shell
-        frontend_process = subprocess.Popen(
+        frontend = ManagedProcess(
+            "Frontend",
             "npm run dev",
             cwd=str(project_root),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
+            ready_url=f"http://localhost:{FRONTEND_PORT}/",
             shell=True
         )
-        processes.append(("Frontend", frontend_process))
-        
+        frontend.start()
+        processes.append(frontend)
+
         # Wait and check if frontend started successfully
-        print("   等待前端啟動...")
-        time.sleep(3)
-        
-        if frontend_process.poll() is not None:
-            # Frontend crashed, show error
-            stdout, stderr = frontend_process.communicate()
-            print("\n❌ 前端啟動失敗！錯誤信息：")
-            print("=" * 70)
-            if stdout:
-                print("STDOUT:")
-                print(stdout)
-            if stderr:
-                print("STDERR:")
-                print(stderr)
-            print("=" * 70)
-            print("\n請檢查前端配置。")
-            print("您可以單獨運行前端查看詳細錯誤：")
-            print(f"  cd {project_root}")
-            print(f"  npm run dev")
-            sys.exit(1)
-        
-        print("   ✓ 前端啟動成功")
-        print()
-        
-        print("=" * 70)
-        print("✅ 所有服務器已啟動！")
-        print("✅ All servers started successfully!")
-        print()
-        print("📍 訪問地址:")
-        print("   前端 (Frontend):  http://localhost:5173")
-        print("   後端 (Backend):   http://localhost:8888")
-        print()
-        print("⚠️  按 Ctrl+C 停止所有服務器")
-        print("⚠️  Press Ctrl+C to stop all servers")
-        print("=" * 70)
-        print()
-        
-        # Simplified monitoring - just wait for Ctrl+C
-        try:
-            while True:
-                # Check if any process has stopped
-                for name, process in processes:
-                    if process.poll() is not None:
-                        print(f"\n❌ {name} 服務器已停止 (exit code: {process.returncode})")
-                        print(f"❌ {name} server stopped (exit code: {process.returncode})")
-                        raise KeyboardInterrupt
-                
-                time.sleep(1)  # Check every second
-        except KeyboardInterrupt:
-            pass  # Continue to cleanup
-    
-    except KeyboardInterrupt:
-        print("\n")
-        print("=" * 70)
-        print("🛑 正在停止所有服務器...")
-        print("🛑 Stopping all servers...")
-        print("=" * 70)
-        
-        for name, process in processes:
-            if process.poll() is None:
-                print(f"   停止 {name}...")
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                    print(f"   ✓ {name} 已停止")
-                except subprocess.TimeoutExpired:
-                    print(f"   ⚠️ {name} 強制終止")
-                    process.kill()
-        
-        print()
-        print("✅ 所有服務器已停止")
-        print("✅ All servers stopped")
-        print("=" * 70)
+        log("   等待前端啟動...")
+        if not frontend.wait_until_ready() and not frontend.exited():
+            log(f"   ⚠️  前端未在 {READY_TIMEOUT_S}s 內回應 {frontend.ready_url}（可能使用了其他端口），繼續執行")
+        elif frontend.exited():
+            log("",
+                "❌ 前端啟動失敗！(輸出見上方 / see output above)",
+                "=" * 70,
+                "請檢查前端配置。",
+                "您可以單獨運行前端查看詳細錯誤：",
+                f"  cd {project_root}",
+                f"  npm run dev")
+            raise SystemExit(1)
+
+        log("   ✓ 前端啟動成功",
+            "",
+            "=" * 70,
+            "✅ 所有服務器已啟動！",
+            "✅ All servers started successfully!",
+            "",
+            "📍 訪問地址:",
+            f"   前端 (Frontend):  http://localhost:{FRONTEND_PORT}",
+            f"   後端 (Backend):   http://localhost:{BACKEND_PORT}"
+            + (f" (+ {', '.join(str(BACKEND_PORT + i) for i in range(1, instances))})" if instances > 1 else ""),
+            "",
+            "⚠️  按 Ctrl+C 停止所有服務器",
+            "⚠️  Press Ctrl+C to stop all servers",
+            "=" * 70,
+            "")
+
+        # Supervise: restart crashed backend workers, stop everything if the frontend dies
+        while True:
+            for worker in processes:
+                if not worker.exited():
+                    continue
+                if not worker.restart:
+                    log(f"\n❌ {worker.name} 服務器已停止 (exit code: {worker.process.returncode})",
+                        f"❌ {worker.name} server stopped (exit code: {worker.process.returncode})")
+                    raise KeyboardInterrupt
+                if worker.next_restart_at is None:
+                    delay = worker.schedule_restart()
+                    log(f"\n⚠️  {worker.name} 已停止 (exit code: {worker.process.returncode})，{delay}s 後重新啟動",
+                        f"⚠️  {worker.name} crashed (exit code: {worker.process.returncode}); restarting in {delay}s")
+                elif time.monotonic() >= worker.next_restart_at:
+                    log(f"🔄 重新啟動 {worker.name}...")
+                    worker.start()
+            time.sleep(0.5)
+
+    except (KeyboardInterrupt, SystemExit) as e:
+        log("",
+            "=" * 70,
+            "🛑 正在停止所有服務器...",
+            "🛑 Stopping all servers...",
+            "=" * 70)
+
+        for worker in reversed(processes):
+            worker.stop()
+
+        log("",
+            "✅ 所有服務器已停止",
+            "✅ All servers stopped",
+            "=" * 70)
+        if isinstance(e, SystemExit):
+            raise
 
 if __name__ == "__main__":
     main()
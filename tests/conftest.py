@@ -0,0 +1,36 @@
+import pytest
+
+from src.api_server_v2 import db_config
+from src.api_server_v2.init_db import init_all_tables
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    """Connection to a freshly migrated session DB in a temp directory"""
+    monkeypatch.setattr(db_config, 'DB_PATH', str(tmp_path / 'session_data.db'))
+    monkeypatch.delenv('RESET_DB', raising=False)
+    init_all_tables()
+    connection = db_config.get_db_connection()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def client(conn):
+    """Test client for an app with the API blueprints, on the temp DB of `conn`"""
+    from flask import Flask
+    from src.api_server_v2.sequence.sequence import sequence_api_blueprint
+    from src.api_server_v2.groups_items.groups_items import groups_items_api_blueprint
+    from src.api_server_v2.containers_zones.containers_zones import containers_zones_api_blueprint
+    from src.api_server_v2.metrics.metrics import metrics_api_blueprint, install_request_metrics
+    from src.api_server_v2.revisions.revisions import revisions_api_blueprint
+
+    # app.py itself is not imported: it initializes the DB under src/db_v2 at import
+    app = Flask(__name__)
+    install_request_metrics(app)
+    app.register_blueprint(sequence_api_blueprint, url_prefix='/api/sequence')
+    app.register_blueprint(groups_items_api_blueprint, url_prefix='/api')
+    app.register_blueprint(containers_zones_api_blueprint, url_prefix='/api')
+    app.register_blueprint(revisions_api_blueprint, url_prefix='/api')
+    app.register_blueprint(metrics_api_blueprint)
+    return app.test_client()
@@ -0,0 +1,52 @@
+"""Container lower bounds never exceed the containers a packing actually needs"""
+import random
+
+import pytest
+
+from src.py_packer_v2.bounds import container_lower_bounds
+from src.py_packer_v2.main import build_items, execute_multibin_packing
+from src.py_packer_v2.utils import vec3, box3
+
+CONTAINER = {'shape': 'rect', 'widthX': 20, 'heightY': 20, 'depthZ': 20}
+BOUNDS = box3(vec3(0, 0, 0), vec3(20, 20, 20))
+
+
+def _items_data(rng, count, low, high):
+    # length -> x, height -> y, width -> z (see build_items)
+    return [
+        {'id': i, 'group_id': 1, 'item_order': i,
+         'length': rng.uniform(low, high), 'height': rng.uniform(low, high), 'width': rng.uniform(low, high)}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('low, high', [(2, 8), (6, 14), (9, 19), (3, 19)])
+def test_bounds_do_not_exceed_bins_used(low, high):
+    for seed in range(4):
+        items_data = _items_data(random.Random(seed), 25, low, high)
+        packed = execute_multibin_packing(items_data, [CONTAINER], max_bins=100,
+                                          options={'resolution': 1})
+        assert packed['unpacked_count'] == 0
+        bounds = container_lower_bounds(build_items(items_data), BOUNDS)
+        for name in ('l0', 'l1', 'l2', 'containers_lower_bound'):
+            assert bounds[name] <= packed['bins_used'], (low, high, seed, name, bounds, packed['bins_used'])
+        assert packed['bins_lower_bound'] == bounds['containers_lower_bound']
+
+
+def test_large_items_need_a_container_each():
+    # Over half the container on every axis: no two share a container, and L1 sees it
+    items_data = [{'id': i, 'group_id': 1, 'length': 11, 'height': 12, 'width': 13} for i in range(5)]
+    bounds = container_lower_bounds(build_items(items_data), BOUNDS)
+    assert bounds['l0'] == 2  # volume alone: 8580 / 8000
+    assert bounds['l1'] == 5 and bounds['containers_lower_bound'] == 5
+    packed = execute_multibin_packing(items_data, [CONTAINER], max_bins=10)
+    assert packed['bins_used'] == 5
+
+
+def test_oversized_items_are_excluded():
+    items_data = [{'id': 1, 'group_id': 1, 'length': 25, 'height': 5, 'width': 5},
+                  {'id': 2, 'group_id': 1, 'length': 5, 'height': 5, 'width': 5}]
+    bounds = container_lower_bounds(build_items(items_data), BOUNDS)
+    assert bounds['oversized'] == 1
+    assert bounds['containers_lower_bound'] == 1
+    assert bounds['volume_upper_bound'] == pytest.approx(125)
@@ -0,0 +1,34 @@
+"""EMS free-space model: placements stay disjoint and inside the container"""
+import random
+
+from src.py_packer_v2.ems import iter_pack_items_ems
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3, box_fits_in, boxes_intersect
+
+
+def _run(engine, *args, **kwargs):
+    generator = engine(*args, **kwargs)
+    placements = []
+    while True:
+        try:
+            placements.append(next(generator))
+        except StopIteration as stop:
+            return placements, stop.value
+
+
+def test_fractional_dims_do_not_overlap_in_integer_container():
+    # Bounds built from ints: split planes like x=14.8 must not be truncated to 14
+    container = box3(vec3(0, 0, 0), vec3(60, 40, 50))
+    for seed in range(40):
+        rng = random.Random(seed)
+        items = [
+            Item(id=str(i), group_id='g',
+                 dims=vec3(rng.uniform(3, 15), rng.uniform(3, 15), rng.uniform(3, 15)))
+            for i in range(40)
+        ]
+        placements, unplaced = _run(iter_pack_items_ems, items, container)
+        assert len(placements) + len(unplaced) == len(items)
+        for a, placement in enumerate(placements):
+            assert box_fits_in(placement.pose, container)
+            for other in placements[a + 1:]:
+                assert not boxes_intersect(placement.pose, other.pose), (seed, placement, other)
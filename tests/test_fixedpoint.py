@@ -0,0 +1,52 @@
+"""Input digests: the exact cache key behind single-flight packing runs"""
+import dataclasses
+
+from src.api_server_v2.sequence.sequence import _input_revision
+from src.py_packer_v2.fixedpoint import input_digest
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3
+
+CONTAINER = box3(vec3(0, 0, 0), vec3(100, 50, 80))
+
+
+def _items():
+    return [Item(id=str(i), group_id='g', dims=vec3(10 + i, 5, 0.3), weight=2.0, order=i) for i in range(4)]
+
+
+def test_digest_ignores_float_noise():
+    noisy = [dataclasses.replace(item, dims=vec3(item.dims.x, item.dims.y, 0.1 + 0.2)) for item in _items()]
+    assert input_digest(noisy, CONTAINER, 10) == input_digest(_items(), CONTAINER, 10)
+
+
+def test_digest_changes_with_every_packing_input():
+    digest = input_digest(_items(), CONTAINER)
+    first = _items()[0]
+    for changed in (
+        dataclasses.replace(first, dims=vec3(11.5, 5, 0.3)),
+        dataclasses.replace(first, rotatable=False),
+        dataclasses.replace(first, order=9),
+        dataclasses.replace(first, weight=3.0),
+        dataclasses.replace(first, max_load=1.0),
+        dataclasses.replace(first, group_id='h'),
+        dataclasses.replace(first, id='x'),
+    ):
+        assert input_digest([changed] + _items()[1:], CONTAINER) != digest, changed
+    assert input_digest(_items(), box3(vec3(0, 0, 0), vec3(100, 50, 79))) != digest
+    assert input_digest(_items()[::-1], CONTAINER) != digest
+
+
+def _zones(**item_changes):
+    zone = {'id': 1, 'label': 'A', 'length': 100, 'width': 80, 'height': 50, 'x': 0, 'y': 0, 'max_payload': None}
+    item = {'id': 7, 'group_id': 1, 'length': 10, 'width': 10, 'height': 10, 'weight': 1, 'item_order': 0,
+            **item_changes}
+    return [(zone, [item])]
+
+
+def test_flight_key_follows_the_items_digest():
+    key = _input_revision('heightmap', {}, None, _zones())
+    assert _input_revision('heightmap', {}, None, _zones()) == key
+    # Float noise: 3.3 * 3 + 0.1 == 9.999999999999998
+    assert _input_revision('heightmap', {}, None, _zones(length=3.3 * 3 + 0.1)) == key
+    assert _input_revision('heightmap', {}, None, _zones(weight=2)) != key
+    assert _input_revision('heightmap', {}, None, _zones(length=10.01)) != key
+    assert _input_revision('weighted', {}, None, _zones()) != key
@@ -0,0 +1,62 @@
+"""Trigger-maintained group_aggregates stay equal to a fresh GROUP BY over items"""
+import pytest
+
+
+def _truth(conn):
+    rows = conn.execute("""
+        SELECT group_id, COUNT(*), SUM(length * width * height), SUM(COALESCE(weight, 0))
+        FROM items GROUP BY group_id
+    """).fetchall()
+    return {row[0]: (row[1], pytest.approx(row[2]), pytest.approx(row[3])) for row in rows}
+
+
+def _aggregates(conn):
+    rows = conn.execute(
+        "SELECT group_id, item_count, total_volume, total_weight FROM group_aggregates WHERE item_count > 0"
+    ).fetchall()
+    return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+
+def _insert(conn, item_id, group_id, size, weight):
+    conn.execute(
+        "INSERT INTO items (item_id, group_id, length, width, height, weight) VALUES (?, ?, ?, ?, ?, ?)",
+        (item_id, group_id, size, size + 1, size + 2, weight)
+    )
+
+
+def test_aggregates_follow_insert_update_and_delete(conn):
+    conn.executemany("INSERT INTO groups (name) VALUES (?)", [('A',), ('B',)])
+    for k in range(6):
+        _insert(conn, f"i{k}", 1 + k % 2, 1 + k, 0.5 * k)
+    conn.execute("INSERT INTO items (item_id, group_id, length, width, height) VALUES ('no_weight', 1, 2, 2, 2)")
+    assert _aggregates(conn) == _truth(conn)
+
+    # Resize, reweigh, move between groups, and a weight set to NULL
+    conn.execute("UPDATE items SET length = 10, weight = 7 WHERE item_id = 'i0'")
+    conn.execute("UPDATE items SET group_id = 2 WHERE item_id = 'i2'")
+    conn.execute("UPDATE items SET weight = NULL WHERE item_id = 'i4'")
+    assert _aggregates(conn) == _truth(conn)
+
+    conn.execute("DELETE FROM items WHERE item_id IN ('i1', 'i3')")
+    assert _aggregates(conn) == _truth(conn)
+
+    # A group emptied of items reports nothing
+    conn.execute("DELETE FROM items WHERE group_id = 2")
+    assert _aggregates(conn) == _truth(conn)
+    assert 2 not in _aggregates(conn)
+
+
+def test_deleting_a_group_drops_its_aggregate(conn):
+    conn.execute("INSERT INTO groups (name) VALUES ('A')")
+    _insert(conn, 'i0', 1, 3, 1)
+    conn.execute("DELETE FROM groups WHERE id = 1")
+    assert conn.execute("SELECT COUNT(*) FROM group_aggregates WHERE group_id = 1").fetchone()[0] == 0
+
+
+def test_aggregates_endpoint_matches_items(client, conn):
+    group = client.post('/api/groups', json={'name': 'A'}).get_json()['id']
+    for k in range(3):
+        client.post('/api/items', json={'item_id': f"i{k}", 'group_id': group,
+                                         'length': 2, 'width': 3, 'height': 4, 'weight': k})
+    [row] = client.get('/api/groups/aggregates').get_json()
+    assert (row['item_count'], row['total_volume'], row['total_weight']) == (3, 72, 3)
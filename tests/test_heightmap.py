@@ -0,0 +1,29 @@
+"""Heightmap grid sizing"""
+from src.py_packer_v2.heightmap import auto_resolution, iter_pack_items_heightmap
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3
+
+
+def _placed(items, container):
+    generator = iter_pack_items_heightmap(items, container)
+    placements = []
+    while True:
+        try:
+            placements.append(next(generator))
+        except StopIteration:
+            return placements
+
+
+def test_auto_resolution_keeps_items_that_fit():
+    # The smallest side (11) as cell size leaves one 11-wide cell per axis; 13 needs two
+    container = box3(vec3(0, 0, 0), vec3(20, 20, 20))
+    items = [Item(id=str(i), group_id='g', dims=vec3(11, 12, 13)) for i in range(3)]
+    resolution = auto_resolution(items, container)
+    assert resolution < 11
+    assert len(_placed(items, container)) == 1
+
+
+def test_auto_resolution_uses_smallest_side_when_it_loses_nothing():
+    container = box3(vec3(0, 0, 0), vec3(100, 50, 100))
+    items = [Item(id=str(i), group_id='g', dims=vec3(10, 10, 20)) for i in range(4)]
+    assert auto_resolution(items, container) == 10
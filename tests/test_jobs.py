@@ -0,0 +1,94 @@
+"""Running packing jobs are shared through the DB across server processes"""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.api_server_v2 import db_config
+from src.api_server_v2.sequence import jobs
+
+
+def test_job_ids_are_unique():
+    ids = {jobs.new_job_id() for _ in range(100)}
+    assert len(ids) == 100
+
+
+def test_requested_id_cannot_run_twice(conn):
+    job_id, _ = jobs.start_job('mine', None)
+    try:
+        with pytest.raises(KeyError):
+            jobs.start_job('mine', None)
+    finally:
+        jobs.finish_job(job_id)
+    jobs.finish_job(jobs.start_job('mine', None)[0])
+
+
+def test_jobs_are_listed_and_cancelled_through_the_db(client, conn, monkeypatch):
+    monkeypatch.setattr(jobs, 'JOB_POLL_S', 0.05)
+    job_id, token = jobs.start_job(None, 30)
+    try:
+        listed = client.get('/api/sequence/jobs').get_json()['jobs']
+        assert [job['job_id'] for job in listed] == [job_id]
+        assert 0 < listed[0]['remaining_s'] <= 30
+        assert client.post('/api/sequence/jobs/nope/cancel').status_code == 404
+        row = conn.execute('SELECT cancel_requested FROM running_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        assert row[0] == 0
+        # A cancel made by another process only reaches this one through the row
+        conn.execute('UPDATE running_jobs SET cancel_requested = 1 WHERE job_id = ?', (job_id,))
+        conn.commit()
+        deadline = time.monotonic() + 5
+        while not token.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert token.cancelled
+        assert client.get('/api/sequence/jobs').get_json()['jobs'][0]['cancelled'] is True
+    finally:
+        jobs.finish_job(job_id)
+    assert client.get('/api/sequence/jobs').get_json()['jobs'] == []
+
+
+def test_cancel_endpoint_flags_the_row(client, conn):
+    job_id, token = jobs.start_job(None, None)
+    try:
+        assert client.post(f'/api/sequence/jobs/{job_id}/cancel').status_code == 202
+        assert token.cancelled
+        row = conn.execute('SELECT cancel_requested FROM running_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        assert row[0] == 1
+    finally:
+        jobs.finish_job(job_id)
+
+
+def test_rows_of_dead_workers_expire(client, conn, monkeypatch):
+    conn.execute("INSERT INTO running_jobs (job_id, pid, started_at, heartbeat_at) VALUES ('ghost', 1, 0, 0)")
+    conn.commit()
+    assert client.get('/api/sequence/jobs').get_json()['jobs'] == []
+    # Its id is free again
+    jobs.finish_job(jobs.start_job('ghost', None)[0])
+
+
+CHILD = '''
+import sys, time
+from src.api_server_v2 import db_config
+db_config.DB_PATH = sys.argv[1]
+from src.api_server_v2.sequence import jobs
+jobs.JOB_POLL_S = 0.05
+job_id, token = jobs.start_job('child_job', 30)
+print(job_id, flush=True)
+deadline = time.monotonic() + 10
+while not token.cancelled and time.monotonic() < deadline:
+    time.sleep(0.01)
+jobs.finish_job(job_id)
+sys.exit(0 if token.cancelled else 1)
+'''
+
+
+def test_cancel_reaches_a_job_in_another_process(client, conn):
+    child = subprocess.Popen([sys.executable, '-c', CHILD, db_config.DB_PATH], stdout=subprocess.PIPE, text=True)
+    try:
+        assert child.stdout.readline().strip() == 'child_job'
+        assert [job['job_id'] for job in client.get('/api/sequence/jobs').get_json()['jobs']] == ['child_job']
+        assert client.post('/api/sequence/jobs/child_job/cancel').status_code == 202
+        assert child.wait(15) == 0
+    finally:
+        child.kill()
+    assert client.get('/api/sequence/jobs').get_json()['jobs'] == []
@@ -0,0 +1,15 @@
+"""GET /api/sequence/latest-result, polled by the viewer"""
+
+
+def test_latest_result_poll_is_quiet(client, conn, capsys):
+    conn.execute("INSERT INTO containers (parameters) VALUES ('{\"shape\": \"rect\"}')")
+    conn.commit()
+    body = client.get('/api/sequence/latest-result').get_json()
+    assert body['job_id'] is None
+    conn.execute("INSERT INTO packing_results (job_id, zone_id, result_json, success, packed_count, unpacked_count, "
+                 "volume_utilization, execution_time_ms) VALUES ('j', 1, '{}', 1, 0, 0, 0, 0)")
+    conn.commit()
+    capsys.readouterr()
+    body = client.get('/api/sequence/latest-result').get_json()
+    assert body['container'] == {'shape': 'rect'}
+    assert capsys.readouterr().out == ''
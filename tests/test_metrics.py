@@ -0,0 +1,29 @@
+"""Cache hit metrics fed by ETag revalidation and single-flight joins"""
+from src.api_server_v2.metrics.metrics import CACHE_REQUESTS
+from src.api_server_v2.sequence.sequence import _join_flight, _land_flight
+
+
+def _count(cache, result):
+    with CACHE_REQUESTS._lock:
+        return CACHE_REQUESTS._values.get((cache, result), 0)
+
+
+def test_etag_revalidation_counts_hits_and_misses(client):
+    hits, misses = _count('http_etag', 'hit'), _count('http_etag', 'miss')
+    first = client.get('/api/zones')
+    assert first.status_code == 200
+    again = client.get('/api/zones', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert _count('http_etag', 'miss') == misses + 1
+    assert _count('http_etag', 'hit') == hits + 1
+    assert 'cache_hit_ratio{cache="http_etag"}' in client.get('/metrics').get_data(as_text=True)
+
+
+def test_single_flight_join_is_a_hit():
+    hits, misses = _count('packing_single_flight', 'hit'), _count('packing_single_flight', 'miss')
+    flight, leader = _join_flight('test-revision')
+    follower, follower_leads = _join_flight('test-revision')
+    assert leader and not follower_leads and follower is flight
+    _land_flight('test-revision', flight, ({}, 200, {}))
+    assert _count('packing_single_flight', 'miss') == misses + 1
+    assert _count('packing_single_flight', 'hit') == hits + 1
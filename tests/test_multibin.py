@@ -0,0 +1,43 @@
+"""Multi-bin packing: failure-index shortcut and per-type grid sizing"""
+from src.py_packer_v2.multibin import BinType, pack_items_multibin, _open_bin, _try_bin, _orientations
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3
+
+
+def _item(name, x, y, z, rotatable=False):
+    return Item(id=name, group_id='g', dims=vec3(x, y, z), rotatable=rotatable)
+
+
+def _offer(open_bin, item):
+    return _try_bin(open_bin, item, _orientations(item))
+
+
+def test_support_minimum_disables_failure_shortcut():
+    # Column heights [5, 4, 5]: a 2-cell item gets 1/2 support, a 3-cell item 2/3
+    bin_type = BinType(id='t', bounds=box3(vec3(0, 0, 0), vec3(3, 10, 1)))
+    open_bin = _open_bin(0, bin_type, 1, {'min_support': 0.6})
+    assert open_bin.failed is None
+    for name, height in (('a', 5), ('b', 4), ('c', 5)):
+        assert _offer(open_bin, _item(name, 1, height, 1)) is not None
+    assert _offer(open_bin, _item('two', 2, 1, 1)) is None
+    assert _offer(open_bin, _item('three', 3, 1, 1)) is not None
+
+
+def test_plain_mode_skips_items_dominated_by_a_failure():
+    bin_type = BinType(id='t', bounds=box3(vec3(0, 0, 0), vec3(3, 10, 1)))
+    open_bin = _open_bin(0, bin_type, 1, {})
+    assert _offer(open_bin, _item('a', 3, 9, 1)) is not None
+    assert _offer(open_bin, _item('b', 1, 2, 1)) is None
+    assert len(open_bin.failed) == 1
+    assert open_bin.failed.dominated(_orientations(_item('c', 2, 2, 1)), 0)
+
+
+def test_auto_resolution_is_sized_per_catalog_type():
+    # The flat first type would set a grid coarser than the whole small second type
+    flat = BinType(id='flat', bounds=box3(vec3(0, 0, 0), vec3(6000, 1, 6000)))
+    small = BinType(id='small', bounds=box3(vec3(0, 0, 0), vec3(10, 10, 10)))
+    items = [_item(str(i), 3, 5, 3) for i in range(4)]
+    bins, unplaced = pack_items_multibin(items, [flat, small])
+    assert unplaced == []
+    assert [b.bin_type.id for b in bins] == ['small']
+    assert sum(len(b.placements) for b in bins) == 4
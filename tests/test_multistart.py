@@ -0,0 +1,23 @@
+"""Multi-start strategy stats"""
+import random
+
+import pytest
+
+from src.py_packer_v2.main import execute_packing
+
+
+@pytest.mark.parametrize('fixed_point', [False, True])
+def test_strategy_utilization_matches_result(fixed_point):
+    rng = random.Random(3)
+    items = [
+        {'id': i, 'group_id': 1, 'item_order': i,
+         'length': rng.uniform(5, 20), 'width': rng.uniform(5, 20), 'height': rng.uniform(5, 20)}
+        for i in range(12)
+    ]
+    container = {'parameters': {'shape': 'rect', 'widthX': 100.5, 'heightY': 80.3, 'depthZ': 90.7}}
+    result = execute_packing(items, [{'id': 1, 'name': 'A'}], container, mode='multistart',
+                             options={'fixed_point': fixed_point, 'workers': 1})
+    stats = result['stats']
+    # Scored on real volumes, so the winner's number is the result's utilization
+    assert stats['strategies'][stats['strategy']] == pytest.approx(result['volume_utilization'])
+    assert all(value <= result['volume_utilization'] + 1e-9 for value in stats['strategies'].values())
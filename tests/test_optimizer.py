@@ -0,0 +1,52 @@
+"""Annealing search: batch evaluation in the shared pool"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.py_packer_v2.optimizer import FREE, _evaluate_batch
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3
+
+
+class CountingPool:
+    """Executor recording the most tasks it ever held unfinished"""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.pending = set()
+        self.peak = 0
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.pending = {f for f in self.pending if not f.done()}
+        future = self.executor.submit(fn, *args)
+        self.pending.add(future)
+        self.submitted += 1
+        self.peak = max(self.peak, len(self.pending))
+        return future
+
+
+def _batch(size):
+    items = [Item(id=str(i), group_id='g', dims=vec3(4, 3, 2)) for i in range(20)]
+    solution = (tuple(range(len(items))), tuple(FREE for _ in items))
+    return items, [solution] * size
+
+
+def test_batch_keeps_at_most_workers_in_flight():
+    items, batch = _batch(12)
+    container = box3(vec3(0, 0, 0), vec3(20, 20, 20))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pool = CountingPool(executor)
+        scores = _evaluate_batch(batch, items, container, 1.0, {}, pool, time.perf_counter() + 60, workers=2)
+    assert all(s is not None for s in scores)
+    assert pool.submitted == len(batch)
+    assert pool.peak <= 2
+
+
+def test_batch_submits_nothing_after_the_deadline():
+    items, batch = _batch(12)
+    container = box3(vec3(0, 0, 0), vec3(20, 20, 20))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pool = CountingPool(executor)
+        scores = _evaluate_batch(batch, items, container, 1.0, {}, pool, time.perf_counter() - 1, workers=2)
+    assert scores == [None] * len(batch)
+    assert pool.submitted == 0
@@ -0,0 +1,62 @@
+"""Every packing mode yields disjoint, in-bounds placements, with and without fixed-point coordinates"""
+import random
+
+import pytest
+
+from src.py_packer_v2.main import PACKING_MODES, resolve_engine
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3, box_fits_in, boxes_intersect, EPS
+
+# Keep the search modes short and in-process
+MODE_OPTIONS = {
+    'optimize': {'time_budget_s': 0.2, 'workers': 1, 'seed': 1},
+    'multistart': {'workers': 1, 'seeds': 1},
+}
+
+
+def _items(seed, count=30):
+    rng = random.Random(seed)
+    return [
+        Item(id=str(i), group_id=str(i % 3), order=i, weight=rng.uniform(1, 20),
+             dims=vec3(rng.uniform(4, 14), rng.uniform(4, 14), rng.uniform(4, 14)),
+             rotatable=rng.random() < 0.8)
+        for i in range(count)
+    ]
+
+
+def _run(engine, items, container, options):
+    generator = engine(items, container, **options)
+    placements = []
+    while True:
+        try:
+            placements.append(next(generator))
+        except StopIteration as stop:
+            return placements, list(stop.value or [])
+
+
+@pytest.mark.parametrize('fixed_point', [False, True])
+@pytest.mark.parametrize('mode', sorted(PACKING_MODES))
+def test_placements_are_disjoint_and_inside(mode, fixed_point):
+    container = box3(vec3(0, 0, 0), vec3(40.5, 30.3, 35.7))
+    for seed in range(3):
+        items = _items(seed)
+        engine, options = resolve_engine(mode, {**MODE_OPTIONS.get(mode, {}), 'fixed_point': fixed_point})
+        placements, unplaced = _run(engine, items, container, options)
+
+        # Every item is accounted for exactly once
+        placed_ids = [p.item_id for p in placements]
+        assert sorted(placed_ids + unplaced) == sorted(item.id for item in items)
+        assert placements, f"{mode} placed nothing"
+
+        by_id = {item.id: item for item in items}
+        for index, placement in enumerate(placements):
+            pose = placement.pose
+            assert box_fits_in(pose, container), (mode, seed, placement)
+            # Placed at the item's real size, turned (if at all) only around Y
+            item = by_id[placement.item_id]
+            size = (pose.max.x - pose.min.x, pose.max.y - pose.min.y, pose.max.z - pose.min.z)
+            assert size[1] == pytest.approx(item.dims.y, abs=EPS)
+            expected = [(item.dims.x, item.dims.z)] + ([(item.dims.z, item.dims.x)] if item.rotatable else [])
+            assert any((size[0], size[2]) == pytest.approx(xz, abs=EPS) for xz in expected), (mode, placement, item)
+            for other in placements[index + 1:]:
+                assert not boxes_intersect(pose, other.pose), (mode, seed, placement, other)
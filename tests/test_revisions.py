@@ -0,0 +1,65 @@
+"""Revision counters behind ETags and the change feed"""
+from src.api_server_v2.db_config import get_revisions, revision_etag, REVISIONED_TABLES
+
+
+def _global(conn):
+    return max(get_revisions(conn, REVISIONED_TABLES).values())
+
+
+def test_every_write_raises_the_revision(conn):
+    writes = [
+        ("INSERT INTO groups (name) VALUES ('A')", 'groups'),
+        ("INSERT INTO items (item_id, group_id, length, width, height) VALUES ('i1', 1, 1, 1, 1)", 'items'),
+        ("UPDATE items SET length = 2 WHERE item_id = 'i1'", 'items'),
+        ("INSERT INTO zones (label, length, width, height) VALUES ('Z', 5, 5, 5)", 'zones'),
+        ("INSERT INTO zone_assignments (zone_id, group_id) VALUES (1, 1)", 'zone_assignments'),
+        ("INSERT INTO containers (parameters) VALUES ('{}')", 'containers'),
+        ("DELETE FROM zone_assignments", 'zone_assignments'),
+        ("DELETE FROM items WHERE item_id = 'i1'", 'items'),
+    ]
+    previous = _global(conn)
+    for sql, entity in writes:
+        before = get_revisions(conn, REVISIONED_TABLES)
+        conn.execute(sql)
+        after = get_revisions(conn, REVISIONED_TABLES)
+        # The written table moves to a new, globally highest revision; the others stay put
+        assert after[entity] > previous, sql
+        assert after[entity] == max(after.values())
+        assert {k: v for k, v in after.items() if k != entity} == {k: v for k, v in before.items() if k != entity}
+        previous = after[entity]
+
+
+def test_etag_changes_only_with_its_entities(conn):
+    zones_etag = revision_etag(conn, ('zones',))
+    conn.execute("INSERT INTO groups (name) VALUES ('A')")
+    assert revision_etag(conn, ('zones',)) == zones_etag
+    conn.execute("INSERT INTO zones (label, length, width, height) VALUES ('Z', 5, 5, 5)")
+    assert revision_etag(conn, ('zones',)) != zones_etag
+
+
+def test_change_feed_lists_entities_changed_since(client):
+    start = client.get('/api/changes').get_json()['revision']
+    client.post('/api/groups', json={'name': 'A'})
+    feed = client.get(f"/api/changes?since={start}").get_json()
+    assert feed['revision'] > start
+    assert list(feed['changed']) == ['groups']
+    assert client.get(f"/api/changes?since={feed['revision']}").get_json()['changed'] == {}
+
+
+def test_assignment_data_revalidates(client):
+    group = client.post('/api/groups', json={'name': 'A'}).get_json()['id']
+    client.post('/api/zones', json={'zones': [{'label': '1', 'length': 5, 'width': 5, 'height': 5}]})
+    zone = client.get('/api/zones').get_json()[0]['id']
+    client.post('/api/zone-assignments', json={'assignments': {str(zone): [group]}})
+
+    first = client.get('/api/assignment-data')
+    body = first.get_json()
+    assert [z['assigned_group_ids'] for z in body['zones']] == [str(group)]
+    assert [g['id'] for g in body['groups']] == [group]
+    etag = first.headers['ETag']
+    assert client.get('/api/assignment-data', headers={'If-None-Match': etag}).status_code == 304
+
+    client.post('/api/items', json={'item_id': 'i1', 'group_id': group, 'length': 1, 'width': 1, 'height': 1})
+    changed = client.get('/api/assignment-data', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert [i['item_id'] for i in changed.get_json()['items']] == ['i1']
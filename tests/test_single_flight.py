@@ -0,0 +1,70 @@
+"""Single-flight /execute: bounded waits and who may share a run"""
+import threading
+
+from src.api_server_v2.sequence import sequence
+
+
+def _seed(conn):
+    conn.execute("INSERT INTO groups (name) VALUES ('A')")
+    conn.execute("INSERT INTO zones (label, length, width, height) VALUES ('Z', 100, 100, 100)")
+    conn.execute("INSERT INTO zone_assignments (zone_id, group_id) VALUES (1, 1)")
+    conn.executemany(
+        "INSERT INTO items (item_id, group_id, length, width, height, item_order) VALUES (?, 1, 20, 20, 20, ?)",
+        [(f"i{k}", k) for k in range(5)]
+    )
+    conn.commit()
+
+
+def test_stalled_run_is_left_behind(client, conn, monkeypatch):
+    _seed(conn)
+    stalled = sequence._Flight()  # never lands
+    monkeypatch.setattr(sequence, '_join_flight', lambda revision: (stalled, False))
+    monkeypatch.setattr(sequence, 'FLIGHT_WAIT_MARGIN_S', 0.1)
+    response = client.post('/api/sequence/execute', json={'mode': 'heightmap', 'time_limit_ms': 100})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['packed_count'] == 5 and 'coalesced' not in body
+
+
+def test_identical_requests_share_a_run(client, conn, monkeypatch):
+    _seed(conn)
+    started, joined, release = threading.Event(), threading.Event(), threading.Event()
+    run_zones, join_flight = sequence._run_zones, sequence._join_flight
+
+    def slow_run_zones(*args):
+        started.set()
+        release.wait(5)
+        return run_zones(*args)
+
+    def spy_join_flight(revision):
+        flight, leader = join_flight(revision)
+        if not leader:
+            joined.set()
+        return flight, leader
+
+    monkeypatch.setattr(sequence, '_run_zones', slow_run_zones)
+    monkeypatch.setattr(sequence, '_join_flight', spy_join_flight)
+    responses = {}
+    leader = threading.Thread(target=lambda: responses.setdefault(
+        'leader', client.post('/api/sequence/execute', json={'mode': 'heightmap'}).get_json()))
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=lambda: responses.setdefault(
+        'follower', client.post('/api/sequence/execute', json={'mode': 'heightmap'}).get_json()))
+    follower.start()
+    assert joined.wait(5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert responses['follower']['coalesced'] is True
+    assert responses['follower']['job_id'] == responses['leader']['job_id']
+
+
+def test_job_id_and_priority_are_part_of_the_key():
+    zones = [({'id': 1, 'label': 'A', 'length': 10, 'width': 10, 'height': 10, 'max_payload': None},
+              [{'id': 1, 'group_id': 1, 'length': 1, 'width': 1, 'height': 1}])]
+    key = sequence._input_revision('heightmap', {}, None, zones)
+    assert sequence._input_revision('heightmap', {}, None, zones, 'job_a') != key
+    assert sequence._input_revision('heightmap', {}, None, zones, 'job_a') != \
+        sequence._input_revision('heightmap', {}, None, zones, 'job_b')
+    assert sequence._input_revision('heightmap', {}, None, zones, priority='batch') != key
@@ -0,0 +1,135 @@
+"""Support graph load propagation and the weight-aware heightmap mode"""
+import random
+
+import pytest
+
+from src.py_packer_v2.main import resolve_engine
+from src.py_packer_v2.support import SupportGraph
+from src.py_packer_v2.types import Item
+from src.py_packer_v2.utils import vec3, box3, EPS
+
+
+def test_loads_flow_down_through_shared_supporters():
+    graph = SupportGraph()
+    base = graph.add(10, 30, [])
+    left = graph.add(4, None, [(base, 1.0)])
+    right = graph.add(4, None, [(base, 1.0)])
+    graph.add(6, None, [(left, 0.5), (right, 0.5)])
+    assert graph.loads[left] == pytest.approx(3)
+    assert graph.loads[right] == pytest.approx(3)
+    # Both paths of the diamond reach the base: 4 + 4 + 6
+    assert graph.loads[base] == pytest.approx(14)
+    assert graph.headroom(base) == pytest.approx(16)
+
+
+def test_can_carry_checks_every_node_below():
+    graph = SupportGraph()
+    base = graph.add(10, 5, [])
+    middle = graph.add(2, None, [(base, 1.0)])  # base now carries 2 of 5
+    assert graph.can_carry([(middle, 1.0)], 3)
+    # Middle has no limit, but the weight reaches the base
+    assert not graph.can_carry([(middle, 1.0)], 3.5)
+    assert graph.can_carry([], 100)
+
+
+def _random_graph(rng, size):
+    graph = SupportGraph()
+    for node in range(size):
+        below = rng.sample(range(node), min(node, rng.randint(0, 3)))
+        shares = [rng.random() + 0.1 for _ in below]
+        supports = [(b, share / sum(shares)) for b, share in zip(below, shares)]
+        max_load = rng.choice([None, rng.uniform(5, 40)])
+        if graph.can_carry(supports, 2):
+            graph.add(2, max_load, supports)
+        else:
+            graph.add(0, max_load, supports)
+    return graph
+
+
+def _below(graph, node):
+    seen, stack = set(), [node]
+    while stack:
+        for below, _ in graph.supporters[stack.pop()]:
+            if below not in seen:
+                seen.add(below)
+                stack.append(below)
+    return seen
+
+
+def test_floors_are_least_headroom_below():
+    rng = random.Random(3)
+    graph = _random_graph(rng, 60)
+    for node in range(len(graph)):
+        expected = min(graph.headroom(n) for n in _below(graph, node) | {node})
+        assert graph.floors[node] == pytest.approx(expected)
+
+
+def test_can_carry_matches_the_full_walk():
+    rng = random.Random(4)
+    graph = _random_graph(rng, 60)
+    for _ in range(300):
+        below = rng.sample(range(len(graph)), rng.randint(1, 3))
+        supports = [(b, 1 / len(below)) for b in below]
+        weight = rng.uniform(0, 30)
+        exact = all(weight * f <= graph.headroom(n) + EPS for n, f in supports) and \
+            graph._flows(supports, weight) is not None
+        assert graph.can_carry(supports, weight) == exact
+
+
+def test_can_carry_reads_only_supporters_far_from_limits(monkeypatch):
+    graph = SupportGraph()
+    node = graph.add(1, 1000, [])
+    for _ in range(50):
+        node = graph.add(1, None, [(node, 1.0)])
+    monkeypatch.setattr(graph, '_flows', None)  # any walk down the stack would fail
+    assert graph.can_carry([(node, 1.0)], 10)
+
+
+def _run(engine, items, container, options):
+    generator = engine(items, container, **options)
+    placements = []
+    while True:
+        try:
+            placements.append(next(generator))
+        except StopIteration:
+            return placements
+
+
+def _overlap(a, b):
+    dx = min(a.max.x, b.max.x) - max(a.min.x, b.min.x)
+    dz = min(a.max.z, b.max.z) - max(a.min.z, b.min.z)
+    return max(dx, 0) * max(dz, 0)
+
+
+def test_weighted_mode_respects_max_load():
+    container = box3(vec3(0, 0, 0), vec3(20, 40, 20))
+    for seed in range(5):
+        rng = random.Random(seed)
+        items = [
+            Item(id=str(i), group_id='g', weight=rng.uniform(1, 10),
+                 max_load=rng.choice([None, rng.uniform(0, 15)]),
+                 dims=vec3(rng.randint(3, 9), rng.randint(3, 9), rng.randint(3, 9)))
+            for i in range(40)
+        ]
+        by_id = {item.id: item for item in items}
+        engine, options = resolve_engine('weighted', {'resolution': 1})
+        poses = {p.item_id: p.pose for p in _run(engine, items, container, options)}
+
+        # Recompute every load from geometry: top-down, weight split by contact area
+        loads = dict.fromkeys(poses, 0.0)
+        for item_id in sorted(poses, key=lambda k: -poses[k].min.y):
+            pose = poses[item_id]
+            below = {
+                other: _overlap(pose, poses[other]) for other in poses
+                if other != item_id and abs(poses[other].max.y - pose.min.y) <= EPS
+            }
+            below = {other: area for other, area in below.items() if area > EPS}
+            total = sum(below.values())
+            carried = by_id[item_id].weight + loads[item_id]
+            for other, area in below.items():
+                loads[other] += carried * area / total
+
+        for item_id, load in loads.items():
+            max_load = by_id[item_id].max_load
+            if max_load is not None:
+                assert load <= max_load + 1e-6, (seed, item_id, load, max_load)
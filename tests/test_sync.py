@@ -0,0 +1,79 @@
+"""Delta saves of zones and zone assignments"""
+from src.api_server_v2.db_config import sync_zones, sync_zone_assignments
+
+
+def _zone(label, size=10, **extra):
+    return {'label': label, 'length': size, 'width': size, 'height': size, **extra}
+
+
+def _zones(conn):
+    return {row['label']: dict(row) for row in conn.execute('SELECT * FROM zones')}
+
+
+def test_sync_zones_keeps_ids_and_reports_changes(conn):
+    first = sync_zones(conn, [_zone('A'), _zone('B'), _zone('C')])
+    conn.commit()
+    assert len(first['inserted']) == 3
+    assert first['updated'] == [] and first['deleted'] == []
+    ids = {label: row['id'] for label, row in _zones(conn).items()}
+
+    # B resized, C dropped, D new; A matched by label, B by id
+    changes = sync_zones(conn, [_zone('A'), _zone('B2', size=20, id=ids['B']), _zone('D')])
+    conn.commit()
+    zones = _zones(conn)
+    assert changes['updated'] == [ids['B']]
+    assert changes['deleted'] == [ids['C']]
+    assert changes['inserted'] == [zones['D']['id']]
+    assert changes['unchanged'] == 1
+    assert zones['A']['id'] == ids['A']
+    assert zones['B2']['id'] == ids['B'] and zones['B2']['length'] == 20
+
+    again = sync_zones(conn, [_zone('A'), _zone('B2', size=20), _zone('D')])
+    assert again == {'inserted': [], 'updated': [], 'deleted': [], 'unchanged': 3}
+
+
+def test_sync_zones_leaves_absent_fields_alone(conn):
+    sync_zones(conn, [_zone('A', max_payload=500)])
+    conn.commit()
+    # The cut UI never sends max_payload: not a change, and the stored value survives
+    changes = sync_zones(conn, [_zone('A')])
+    conn.commit()
+    assert changes['updated'] == [] and changes['unchanged'] == 1
+    assert _zones(conn)['A']['max_payload'] == 500
+
+    changes = sync_zones(conn, [_zone('A', size=12)])
+    conn.commit()
+    assert len(changes['updated']) == 1
+    assert _zones(conn)['A']['max_payload'] == 500
+
+
+def test_sync_zones_deletes_assignments_of_removed_zones(conn):
+    sync_zones(conn, [_zone('A'), _zone('B')])
+    ids = {label: row['id'] for label, row in _zones(conn).items()}
+    sync_zone_assignments(conn, [(ids['A'], 1), (ids['B'], 2)])
+    sync_zones(conn, [_zone('A')])
+    conn.commit()
+    assert [tuple(r) for r in conn.execute('SELECT zone_id, group_id FROM zone_assignments')] == [(ids['A'], 1)]
+
+
+def test_sync_zone_assignments_keeps_surviving_rows(conn):
+    first = sync_zone_assignments(conn, [(1, 1), (1, 2), (2, 3)])
+    conn.commit()
+    assert first == {'added': [[1, 1], [1, 2], [2, 3]], 'removed': [], 'unchanged': 0}
+    before = {(r['zone_id'], r['group_id']): r['id'] for r in conn.execute('SELECT * FROM zone_assignments')}
+
+    # Duplicates in the input collapse; (1, 2) removed, (3, 2) added
+    changes = sync_zone_assignments(conn, [('1', '1'), (2, 3), (2, 3), (3, 2)])
+    conn.commit()
+    after = {(r['zone_id'], r['group_id']): r['id'] for r in conn.execute('SELECT * FROM zone_assignments')}
+    assert changes == {'added': [[3, 2]], 'removed': [[1, 2]], 'unchanged': 2}
+    assert after[(1, 1)] == before[(1, 1)] and after[(2, 3)] == before[(2, 3)]
+    assert set(after) == {(1, 1), (2, 3), (3, 2)}
+
+
+def test_sync_zone_assignments_removes_duplicate_rows(conn):
+    conn.executemany('INSERT INTO zone_assignments (zone_id, group_id) VALUES (?, ?)', [(1, 1), (1, 1)])
+    changes = sync_zone_assignments(conn, [(1, 1)])
+    conn.commit()
+    assert changes == {'added': [], 'removed': [], 'unchanged': 1}
+    assert conn.execute('SELECT COUNT(*) FROM zone_assignments').fetchone()[0] == 1